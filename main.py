@@ -5,10 +5,13 @@ Stellt REST API Endpoints für das Lead Dashboard bereit und integriert den Lang
 
 import os
 import sys
+import json
+from contextlib import nullcontext
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import uvicorn
 import asyncio
@@ -18,6 +21,15 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent / "src"))
 from src.graph import OutReachAutomation
 from src.state import GraphState, LeadData, CompanyData
+from src.lead_store import LeadStore, InvalidQueryError
+from src.lead_import import import_leads, detect_format, ImportResult, LeadImportRow, IMPORT_BATCH_SIZE
+from src.extraction import extract_fields, FIELDS as EXTRACTED_FIELDS
+from src.jobs import JobManager, WorkflowJob, serialize_report
+from src.deadline import resolve_deadline
+from src.llm_pool import llm_pool_stats
+from src.llm_cache import llm_cache_bypass, llm_cache_stats
+from src.batch import BatchEngine, BatchStatus, BATCH_MAX_CONCURRENCY
+from src.work_queue import WorkQueue, QueueWorker, WorkItem
 
 
 # Pydantic Models für API
@@ -65,6 +77,7 @@ class ProcessLeadRequest(BaseModel):
     """Request Model für Lead-Processing mit LangGraph"""
     lead_id: int
     run_automation: bool = True
+    force_refresh: bool = False  # gecachtes Ergebnis verwerfen und neu recherchieren
 
 
 class GraphStateRequest(BaseModel):
@@ -79,6 +92,9 @@ class GraphStateRequest(BaseModel):
     personalized_email: str = ""
     interview_script: str = ""
     number_leads: int = 1
+    force_refresh: bool = False  # gecachtes Ergebnis verwerfen und neu recherchieren
+    known_fields: List[str] = []  # bereits bekannte Lead-Felder, Säulen dafür werden übersprungen
+    deadline_seconds: Optional[float] = None  # Zeitbudget des Laufs ab Request-Eingang (Standard: RUN_DEADLINE_SECONDS)
 
 
 class APIResponse(BaseModel):
@@ -93,6 +109,7 @@ class GraphResult(BaseModel):
     success: bool
     reports: List[Dict[str, Any]]
     extracted_data: Optional[Dict[str, Any]] = None  # Strukturierte Daten für Frontend
+    trimmed: List[str] = []  # wegen des Zeitbudgets ausgelassene Schritte (Best-Effort-Ergebnis)
     error: Optional[str] = None
 
 
@@ -117,21 +134,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# In-Memory Lead Storage (für Development)
-# TODO: In Production durch echte Datenbank ersetzen
-leads_db: List[Lead] = []
-next_lead_id = 1
+# Persistenter Lead Storage (SQLite, Pfad per ENV LEADS_DB_PATH überschreibbar)
+lead_store = LeadStore(Lead, os.environ.get("LEADS_DB_PATH"))
 
 # LangGraph Automation Instance
 automation = OutReachAutomation()
 
+# Begrenzter Executor für Graph-Workflows (blockiert den Event-Loop nicht)
+job_manager = JobManager(automation)
 
 def initialize_mock_leads():
-    """Initialisiert Mock-Leads für Development"""
-    global leads_db, next_lead_id
-    
+    """Initialisiert Mock-Leads für Development (nur bei leerer Datenbank)"""
     mock_leads = [
         Lead(id=1, company_name='Torsten Thiemann', lead='Torsten Thiemann', location='Westertimke', 
              postal_code='27412', country='DE', email='torsten.thiemann@thorsten-thiemann.de', 
@@ -155,90 +171,40 @@ def initialize_mock_leads():
              created_at=datetime.now().isoformat()),
     ]
     
-    leads_db.extend(mock_leads)
-    next_lead_id = len(mock_leads) + 1
+    # Prüfen und Einfügen in einer Transaktion - mehrere Server-Prozesse starten gleichzeitig
+    with lead_store.db.transaction():
+        if lead_store.count() == 0:
+            lead_store.add_many(mock_leads)
 
 
 def extract_structured_data_from_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Extrahiert strukturierte Daten aus den Reports für Frontend-Spalten"""
-    extracted_data = {
-        "employee_count": None,
-        "revenue": None,
-        "linkedin": None
+    """Extrahiert strukturierte Daten (alle Lead-Felder inkl. Konfidenz) aus den Reports für Frontend-Spalten"""
+    return extract_fields(reports)
+
+
+def request_to_graph_state(graph_state_request: GraphStateRequest) -> GraphState:
+    """Erstellt den GraphState aus einem Frontend-Request"""
+    return {
+        "leads_ids": graph_state_request.leads_ids,
+        "leads_data": graph_state_request.leads_data,
+        "current_lead": LeadData(**graph_state_request.current_lead),
+        "company_data": CompanyData(**graph_state_request.company_data),
+        "reports": [{"title": r.get("title", ""), "content": r.get("content", ""), "is_markdown": r.get("is_markdown", False)} for r in graph_state_request.reports],
+        "reports_folder_link": graph_state_request.reports_folder_link,
+        "custom_outreach_report_link": graph_state_request.custom_outreach_report_link,
+        "personalized_email": graph_state_request.personalized_email,
+        "interview_script": graph_state_request.interview_script,
+        "number_leads": graph_state_request.number_leads,
+        "known_fields": graph_state_request.known_fields,
+        "deadline": resolve_deadline(graph_state_request.deadline_seconds)
     }
-    
-    for report in reports:
-        title = report.get("title", "").lower()
-        content = report.get("content", "")
-        
-        # Unternehmensinformationen -> Mitarbeiteranzahl
-        if "unternehmensinformationen" in title or "unternehmens" in title:
-            # Versuche Mitarbeiteranzahl aus dem Content zu extrahieren
-            import re
-            # Suche nach Zahlen mit "Mitarbeiter", "Angestellte", "Beschäftigte" etc.
-            employee_patterns = [
-                r'(\d+)\s*(?:Mitarbeiter|Angestellte|Beschäftigte|Personal)',
-                r'(?:Mitarbeiter|Angestellte|Beschäftigte|Personal)[:\s]*(\d+)',
-                r'(\d+)\s*(?:Mitarbeiter|Angestellte|Beschäftigte|Personal)',
-                r'Personalstärke[:\s]*(\d+)',
-                r'Belegschaft[:\s]*(\d+)'
-            ]
-            
-            for pattern in employee_patterns:
-                match = re.search(pattern, content, re.IGNORECASE)
-                if match:
-                    try:
-                        extracted_data["employee_count"] = int(match.group(1))
-                        break
-                    except ValueError:
-                        continue
-        
-        # Finanzen -> Umsatz
-        elif "finanzen" in title or "finanz" in title:
-            # Versuche Umsatz aus dem Content zu extrahieren
-            revenue_patterns = [
-                r'Umsatz[:\s]*(\d+(?:[.,]\d+)?)\s*(?:Mio|Millionen|Million|Mio\.|€|EUR|Euro)',
-                r'(\d+(?:[.,]\d+)?)\s*(?:Mio|Millionen|Million|Mio\.|€|EUR|Euro)\s*Umsatz',
-                r'Jahresumsatz[:\s]*(\d+(?:[.,]\d+)?)\s*(?:Mio|Millionen|Million|Mio\.|€|EUR|Euro)',
-                r'Umsatz[:\s]*(\d+(?:[.,]\d+)?)\s*(?:Millionen|Million|Mio)',
-                r'(\d+(?:[.,]\d+)?)\s*(?:Millionen|Million|Mio)\s*Umsatz'
-            ]
-            
-            for pattern in revenue_patterns:
-                match = re.search(pattern, content, re.IGNORECASE)
-                if match:
-                    try:
-                        revenue_str = match.group(1).replace(',', '.')
-                        revenue_value = float(revenue_str)
-                        # Konvertiere zu Millionen Euro
-                        if 'mio' in match.group(0).lower() or 'millionen' in match.group(0).lower():
-                            extracted_data["revenue"] = int(revenue_value * 1_000_000)
-                        else:
-                            extracted_data["revenue"] = int(revenue_value)
-                        break
-                    except ValueError:
-                        continue
-        
-        # LinkedIn -> LinkedIn URL
-        elif "linkedin" in title:
-            # Versuche LinkedIn URL aus dem Content zu extrahieren
-            linkedin_patterns = [
-                r'https?://(?:www\.)?linkedin\.com/in/[a-zA-Z0-9\-_]+/?',
-                r'linkedin\.com/in/[a-zA-Z0-9\-_]+/?',
-                r'https?://(?:www\.)?linkedin\.com/company/[a-zA-Z0-9\-_]+/?',
-                r'linkedin\.com/company/[a-zA-Z0-9\-_]+/?'
-            ]
-            
-            for pattern in linkedin_patterns:
-                match = re.search(pattern, content, re.IGNORECASE)
-                if match:
-                    url = match.group(0)
-                    if not url.startswith('http'):
-                        url = 'https://' + url
-                    extracted_data["linkedin"] = url
-                    break
-    
-    return extracted_data
+
+
+def invalidate_cached_result(graph_state: GraphState) -> None:
+    """Verwirft das gecachte Graph-Ergebnis für Firma + PLZ dieses States (force_refresh)"""
+    company_name, plz, _ = automation.cache_identity(graph_state)
+    if automation.result_cache.invalidate(company_name, plz):
+        print(f"🧹 Cache für {company_name} ({plz}) verworfen")
 
 
 def lead_to_graph_state(lead: Lead) -> GraphState:
@@ -272,30 +238,39 @@ def lead_to_graph_state(lead: Lead) -> GraphState:
         "custom_outreach_report_link": "",
         "personalized_email": "",
         "interview_script": "",
-        "number_leads": 1
+        "number_leads": 1,
+        # Säulen für bereits gepflegte Felder entfallen (siehe graph.plan_pillars)
+        "known_fields": [field for field in EXTRACTED_FIELDS if getattr(lead, field) not in (None, "")]
     }
     
     return initial_state
 
 
-async def process_lead_with_automation(lead: Lead) -> Dict[str, Any]:
-    """Führt LangGraph Automation für einen Lead aus"""
+def run_lead_automation(lead: Lead, on_node=None) -> Dict[str, Any]:
+    """Führt LangGraph Automation für einen Lead aus (blockierend, für Worker-Threads)"""
     try:
         # Lead zu GraphState konvertieren
         graph_state = lead_to_graph_state(lead)
         
         # LangGraph Workflow ausführen
         print(f"🚀 Starte Automation für Lead: {lead.company_name}")
-        final_state = automation.run_workflow(graph_state)
+        final_state = automation.run_workflow(graph_state, on_node=on_node)
         
         # Ergebnisse verarbeiten
         reports = final_state.get('reports', [])
         score = len(reports)  # Einfaches Scoring basierend auf Report-Anzahl
         
+        # Extrahierte Felder übernehmen, sofern der Lead sie noch nicht hat
+        extracted = extract_structured_data_from_reports([serialize_report(r) for r in reports])
+        for field in EXTRACTED_FIELDS:
+            if extracted[field] is not None and getattr(lead, field) in (None, ""):
+                setattr(lead, field, extracted[field])
+        
         # Lead Score und Status aktualisieren
         lead.score = min(score, 10)  # Max Score von 10
         lead.status = 'processed' if score > 0 else 'failed'
         lead.updated_at = datetime.now().isoformat()
+        lead_store.update(lead)
         
         return {
             'success': True,
@@ -308,6 +283,7 @@ async def process_lead_with_automation(lead: Lead) -> Dict[str, Any]:
         print(f"❌ Fehler bei Lead Automation: {str(e)}")
         lead.status = 'error'
         lead.updated_at = datetime.now().isoformat()
+        lead_store.update(lead)
         return {
             'success': False,
             'error': str(e),
@@ -315,6 +291,47 @@ async def process_lead_with_automation(lead: Lead) -> Dict[str, Any]:
         }
 
 
+def handle_work_item(item: WorkItem, on_node=None) -> Dict[str, Any]:
+    """Verarbeitet einen Queue-Eintrag (läuft in einem Queue-Worker, auch in separaten Worker-Prozessen)"""
+    lead = lead_store.get(item.lead_id)
+    if not lead:
+        return {'success': True, 'skipped': f"Lead {item.lead_id} existiert nicht mehr"}
+    
+    # Lead wurde nach dem Einreihen bereits erfolgreich verarbeitet (z.B. Absturz vor der Quittierung)
+    if lead.status == 'processed' and lead.updated_at and lead.updated_at >= datetime.fromtimestamp(item.created_at).isoformat():
+        return {'success': True, 'skipped': 'bereits verarbeitet', 'score': lead.score}
+    
+    if lead.status != 'processing':
+        lead.status = 'processing'
+        lead.updated_at = datetime.now().isoformat()
+        lead_store.update(lead)
+    
+    result = run_lead_automation(lead, on_node=on_node)
+    print(f"✅ Automation abgeschlossen für Lead {item.lead_id}: {result}")
+    return result
+
+
+def handle_dead_letter(item: WorkItem) -> None:
+    """Queue-Eintrag endgültig fehlgeschlagen (z.B. Lease ohne verbleibende Versuche abgelaufen):
+    Lead nicht in 'processing' belassen, sonst würde er bei jedem Neustart erneut eingereiht"""
+    lead = lead_store.get(item.lead_id)
+    if lead and lead.status == 'processing':
+        lead.status = 'failed'
+        lead.updated_at = datetime.now().isoformat()
+        lead_store.update(lead)
+
+
+# Persistente Arbeits-Queue: überlebt Neustarts, Worker laufen im Server und/oder als eigene Prozesse (worker.py)
+work_queue = WorkQueue(os.environ.get("QUEUE_DB_PATH"))
+queue_worker = QueueWorker(work_queue, handle_work_item, concurrency=int(os.environ.get("QUEUE_WORKERS", str(BATCH_MAX_CONCURRENCY))),
+                           on_dead_letter=handle_dead_letter)
+EMBEDDED_QUEUE_WORKERS = os.environ.get("EMBEDDED_QUEUE_WORKERS", "1") != "0"
+
+# Batch-Engine: N Leads parallel (BATCH_MAX_CONCURRENCY, pro Request über max_concurrency überschreibbar,
+# wirksam höchstens QUEUE_WORKERS; mit nur externen Workern unbekannt)
+batch_engine = BatchEngine(work_queue, worker_concurrency=queue_worker.concurrency if EMBEDDED_QUEUE_WORKERS else None)
+
+
 # API Endpoints
 
 @app.get("/")
@@ -323,16 +340,49 @@ async def root():
     return {"message": "Lead Agent API läuft", "version": "1.0.0", "status": "active"}
 
 
-@app.get("/leads", response_model=List[Lead])
-async def get_leads():
-    """Alle Leads abrufen"""
-    return leads_db
+@app.get("/leads", response_model=List[Lead], response_model_exclude_unset=True)
+async def get_leads(
+    response: Response,
+    status: Optional[List[str]] = Query(None, description="Status-Filter, mehrfach angebbar"),
+    min_score: Optional[int] = None,
+    max_score: Optional[int] = None,
+    industry: Optional[str] = None,
+    city: Optional[str] = None,
+    created_from: Optional[str] = Query(None, description="ISO-Zeitpunkt, inklusive"),
+    created_to: Optional[str] = Query(None, description="ISO-Zeitpunkt, inklusive"),
+    sort: str = Query("id", description="Sortierschlüssel, '-' für absteigend (z.B. -score)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Seitengröße; ohne Angabe alle Leads"),
+    cursor: Optional[str] = Query(None, description="Wert aus dem Header X-Next-Cursor der vorherigen Seite"),
+    fields: Optional[str] = Query(None, description="Kommagetrennte Feldliste, z.B. id,company_name,score"),
+):
+    """Leads abrufen - gefiltert, sortiert und seitenweise (Cursor im Header X-Next-Cursor)"""
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        rows, next_cursor = lead_store.query(
+            statuses=status,
+            min_score=min_score,
+            max_score=max_score,
+            industry=industry,
+            city=city,
+            created_from=created_from,
+            created_to=created_to,
+            sort=sort,
+            limit=limit,
+            cursor=cursor,
+            fields=field_list,
+        )
+    except InvalidQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [Lead(**row) for row in rows]
 
 
 @app.get("/leads/{lead_id}", response_model=Lead)
 async def get_lead(lead_id: int):
     """Einzelnen Lead abrufen"""
-    lead = next((l for l in leads_db if l.id == lead_id), None)
+    lead = lead_store.get(lead_id)
     if not lead:
         raise HTTPException(status_code=404, detail="Lead nicht gefunden")
     return lead
@@ -341,10 +391,7 @@ async def get_lead(lead_id: int):
 @app.post("/leads", response_model=Lead)
 async def create_lead(request: CreateLeadRequest):
     """Neuen Lead erstellen"""
-    global next_lead_id
-    
     new_lead = Lead(
-        id=next_lead_id,
         company_name=request.company_name,
         website=request.website,
         email=request.email,
@@ -361,16 +408,32 @@ async def create_lead(request: CreateLeadRequest):
         updated_at=datetime.now().isoformat()
     )
     
-    leads_db.append(new_lead)
-    next_lead_id += 1
+    return lead_store.add(new_lead)
+
+
+def lead_from_import_row(row: LeadImportRow) -> Lead:
+    now = datetime.now().isoformat()
+    return Lead(**row.model_dump(), score=0, status='new', created_at=now, updated_at=now)
+
+
+@app.post("/leads/import", response_model=ImportResult)
+async def import_leads_file(file: UploadFile = File(...), format: Optional[str] = None, batch_size: int = IMPORT_BATCH_SIZE):
+    """Leads aus CSV- oder JSONL-Datei importieren (Stream-Verarbeitung, Duplikate über Domain bzw. Firmenname + PLZ)"""
+    fmt = (format or detect_format(file.filename, file.content_type)).lower()
+    if fmt not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail="Format muss 'csv' oder 'jsonl' sein")
     
-    return new_lead
+    print(f"📥 Importiere Leads aus {file.filename} ({fmt})")
+    # Parsing und Inserts blockieren -> im Thread-Pool ausführen
+    return await asyncio.to_thread(
+        import_leads, file.file, fmt, lead_store, lead_from_import_row, batch_size=max(1, batch_size)
+    )
 
 
 @app.post("/leads/{lead_id}/process", response_model=APIResponse)
-async def process_lead(lead_id: int, background_tasks: BackgroundTasks, request: ProcessLeadRequest = ProcessLeadRequest(lead_id=0)):
+async def process_lead(lead_id: int, request: ProcessLeadRequest = ProcessLeadRequest(lead_id=0)):
     """Lead mit LangGraph Automation verarbeiten"""
-    lead = next((l for l in leads_db if l.id == lead_id), None)
+    lead = lead_store.get(lead_id)
     if not lead:
         raise HTTPException(status_code=404, detail="Lead nicht gefunden")
     
@@ -381,27 +444,25 @@ async def process_lead(lead_id: int, background_tasks: BackgroundTasks, request:
             data={"lead_id": lead_id, "status": lead.status}
         )
     
-    # Automation im Hintergrund ausführen
+    # Automation über die persistente Queue ausführen
     lead.status = 'processing'
     lead.updated_at = datetime.now().isoformat()
-    
-    async def run_automation():
-        result = await process_lead_with_automation(lead)
-        print(f"✅ Automation abgeschlossen für Lead {lead_id}: {result}")
-    
-    background_tasks.add_task(run_automation)
+    lead_store.update(lead)
+    if request.force_refresh:
+        invalidate_cached_result(lead_to_graph_state(lead))
+    item = work_queue.enqueue(lead_id)
     
     return APIResponse(
         success=True,
         message="Lead-Processing gestartet",
-        data={"lead_id": lead_id, "status": "processing"}
+        data={"lead_id": lead_id, "status": "processing", "work_item_id": item.id}
     )
 
 
 @app.put("/leads/{lead_id}", response_model=Lead)
 async def update_lead(lead_id: int, updated_lead: CreateLeadRequest):
     """Lead aktualisieren"""
-    lead = next((l for l in leads_db if l.id == lead_id), None)
+    lead = lead_store.get(lead_id)
     if not lead:
         raise HTTPException(status_code=404, detail="Lead nicht gefunden")
     
@@ -418,19 +479,15 @@ async def update_lead(lead_id: int, updated_lead: CreateLeadRequest):
     lead.revenue = updated_lead.revenue
     lead.updated_at = datetime.now().isoformat()
     
-    return lead
+    return lead_store.update(lead)
 
 
 @app.delete("/leads/{lead_id}", response_model=APIResponse)
 async def delete_lead(lead_id: int):
     """Lead löschen"""
-    global leads_db
-    lead = next((l for l in leads_db if l.id == lead_id), None)
-    if not lead:
+    if not lead_store.delete(lead_id):
         raise HTTPException(status_code=404, detail="Lead nicht gefunden")
     
-    leads_db = [l for l in leads_db if l.id != lead_id]
-    
     return APIResponse(
         success=True,
         message="Lead erfolgreich gelöscht",
@@ -440,57 +497,30 @@ async def delete_lead(lead_id: int):
 
 @app.post("/api/run-workflow", response_model=GraphResult)
 async def run_graph_workflow(graph_state_request: GraphStateRequest):
-    """Führt den LangGraph-Workflow direkt mit GraphState aus"""
+    """Führt den LangGraph-Workflow direkt mit GraphState aus (async Säulen, blockiert den Event-Loop nicht)"""
     try:
         # GraphState aus Request erstellen
-        graph_state: GraphState = {
-            "leads_ids": graph_state_request.leads_ids,
-            "leads_data": graph_state_request.leads_data,
-            "current_lead": LeadData(**graph_state_request.current_lead),
-            "company_data": CompanyData(**graph_state_request.company_data),
-            "reports": [{"title": r.get("title", ""), "content": r.get("content", ""), "is_markdown": r.get("is_markdown", False)} for r in graph_state_request.reports],
-            "reports_folder_link": graph_state_request.reports_folder_link,
-            "custom_outreach_report_link": graph_state_request.custom_outreach_report_link,
-            "personalized_email": graph_state_request.personalized_email,
-            "interview_script": graph_state_request.interview_script,
-            "number_leads": graph_state_request.number_leads
-        }
+        graph_state = request_to_graph_state(graph_state_request)
+        if graph_state_request.force_refresh:
+            invalidate_cached_result(graph_state)
         
         print(f"🚀 Starte Graph-Workflow für: {graph_state['current_lead'].name} bei {graph_state['company_data'].name}")
         
-        # LangGraph Workflow ausführen
-        final_state = automation.run_workflow(graph_state)
-        
-        # Ergebnisse extrahieren
-        reports = final_state.get('reports', [])
-        
-        # Reports in serializable Format konvertieren
-        serializable_reports = []
-        for report in reports:
-            if hasattr(report, 'model_dump'):  # Pydantic model
-                serializable_reports.append(report.model_dump())
-            elif hasattr(report, 'dict'):  # Pydantic model (old version)
-                serializable_reports.append(report.dict())
-            elif isinstance(report, dict):  # Already a dict
-                serializable_reports.append(report)
-            else:
-                # Fallback for other types
-                serializable_reports.append({
-                    "title": str(getattr(report, 'title', 'Unnamed Report')),
-                    "content": str(getattr(report, 'content', 'No content')),
-                    "is_markdown": bool(getattr(report, 'is_markdown', False))
-                })
+        # LangGraph Workflow direkt im Event-Loop ausführen (async Säulen); force_refresh liest auch
+        # keine gecachten LLM-Antworten
+        with llm_cache_bypass() if graph_state_request.force_refresh else nullcontext():
+            final_state = await automation.arun_workflow(graph_state)
+        reports = [serialize_report(r) for r in final_state.get("reports", [])]
+        extracted_data = await asyncio.to_thread(extract_structured_data_from_reports, reports)
         
-        print(f"✅ Graph-Workflow abgeschlossen. {len(serializable_reports)} Berichte generiert.")
-        
-        # Strukturierte Daten aus Reports extrahieren
-        extracted_data = extract_structured_data_from_reports(serializable_reports)
+        print(f"✅ Graph-Workflow abgeschlossen. {len(reports)} Berichte generiert.")
         print(f"📊 Extrahierte Daten: {extracted_data}")
         
         return GraphResult(
             success=True,
-            reports=serializable_reports,
-            extracted_data=extracted_data
+            reports=reports,
+            extracted_data=extracted_data,
+            trimmed=final_state.get("trimmed", [])
         )
         
     except Exception as e:
@@ -503,11 +533,94 @@ async def run_graph_workflow(graph_state_request: GraphStateRequest):
         )
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Formatiert ein Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/run-workflow/stream")
+async def stream_graph_workflow(graph_state_request: GraphStateRequest):
+    """Führt den Graph-Workflow aus und streamt die Reports jedes Knotens als Server-Sent Events, sobald der Knoten fertig ist"""
+    try:
+        graph_state = request_to_graph_state(graph_state_request)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Ungültiger GraphState: {e}")
+    if graph_state_request.force_refresh:
+        invalidate_cached_result(graph_state)
+    
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def on_node(node_name: str, update: Dict[str, Any]) -> None:
+        # Wird im Worker-Thread aufgerufen -> thread-sicher an den Event-Loop übergeben
+        if node_name == "merge":
+            return
+        payload = {"node": node_name, "reports": [serialize_report(r) for r in update.get("reports", [])]}
+        loop.call_soon_threadsafe(events.put_nowait, ("node", payload))
+    
+    job = job_manager.submit(graph_state, postprocess=extract_structured_data_from_reports, listener=on_node)
+    job_manager.future(job.id).add_done_callback(lambda _: loop.call_soon_threadsafe(events.put_nowait, None))
+    print(f"📡 Streame Graph-Workflow {job.id} für: {graph_state['company_data'].name}")
+    
+    async def event_stream():
+        yield _sse_event("started", {"job_id": job.id})
+        while True:
+            item = await events.get()
+            if item is None:
+                break
+            yield _sse_event(*item)
+        
+        final_job = job_manager.get(job.id)
+        if final_job.status == "completed":
+            yield _sse_event("completed", {
+                "job_id": job.id,
+                "reports": final_job.reports,
+                "extracted_data": final_job.extracted_data,
+            })
+        else:
+            yield _sse_event("error", {"job_id": job.id, "error": final_job.error})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/jobs", response_model=APIResponse)
+async def submit_workflow_job(graph_state_request: GraphStateRequest):
+    """Startet den Graph-Workflow als Job und gibt sofort die Job-ID zurück"""
+    try:
+        graph_state = request_to_graph_state(graph_state_request)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Ungültiger GraphState: {e}")
+    if graph_state_request.force_refresh:
+        invalidate_cached_result(graph_state)
+    
+    job = job_manager.submit(graph_state, postprocess=extract_structured_data_from_reports)
+    print(f"📥 Job {job.id} eingereiht für: {graph_state['company_data'].name}")
+    
+    return APIResponse(
+        success=True,
+        message="Workflow-Job gestartet",
+        data={"job_id": job.id, "status": job.status}
+    )
+
+
+@app.get("/jobs/{job_id}", response_model=WorkflowJob)
+async def get_workflow_job(job_id: str):
+    """Status und (Teil-)Ergebnisse eines Workflow-Jobs abrufen"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job nicht gefunden")
+    return job
+
+
 @app.post("/leads/batch-process", response_model=APIResponse)
-async def batch_process_leads(background_tasks: BackgroundTasks, lead_ids: List[int] = None):
-    """Mehrere Leads gleichzeitig verarbeiten"""
+async def batch_process_leads(lead_ids: List[int] = None, max_concurrency: Optional[int] = None, force_refresh: bool = False):
+    """Mehrere Leads gleichzeitig verarbeiten (max_concurrency Leads parallel)"""
     if not lead_ids:
-        lead_ids = [l.id for l in leads_db if l.status == 'new']
+        lead_ids = lead_store.ids_by_status('new')
     
     if not lead_ids:
         return APIResponse(
@@ -515,29 +628,66 @@ async def batch_process_leads(background_tasks: BackgroundTasks, lead_ids: List[
             message="Keine Leads zum Verarbeiten gefunden"
         )
     
-    # Alle Leads auf processing setzen
-    for lead_id in lead_ids:
-        lead = next((l for l in leads_db if l.id == lead_id), None)
-        if lead:
-            lead.status = 'processing'
-            lead.updated_at = datetime.now().isoformat()
-    
-    async def run_batch_automation():
+    if force_refresh:
         for lead_id in lead_ids:
-            lead = next((l for l in leads_db if l.id == lead_id), None)
+            lead = lead_store.get(lead_id)
             if lead:
-                result = await process_lead_with_automation(lead)
-                print(f"✅ Batch-Automation abgeschlossen für Lead {lead_id}: {result}")
+                invalidate_cached_result(lead_to_graph_state(lead))
+    
+    # Alle Leads auf processing setzen
+    lead_store.update_status(lead_ids, 'processing', datetime.now().isoformat())
     
-    background_tasks.add_task(run_batch_automation)
+    batch = batch_engine.start(lead_ids, max_concurrency=max_concurrency)
     
     return APIResponse(
         success=True,
         message=f"Batch-Processing für {len(lead_ids)} Leads gestartet",
-        data={"lead_ids": lead_ids, "status": "processing"}
+        data={"batch_id": batch.id, "lead_ids": lead_ids, "status": "processing", "max_concurrency": batch.max_concurrency,
+              "effective_max_concurrency": batch.effective_max_concurrency}
+    )
+
+
+@app.delete("/cache/results", response_model=APIResponse)
+async def invalidate_result_cache(company_name: Optional[str] = None, postal_code: Optional[str] = None):
+    """Gecachte Graph-Ergebnisse verwerfen - für ein Unternehmen (Firmenname + PLZ) oder ohne Parameter komplett"""
+    removed = automation.result_cache.invalidate(company_name, postal_code)
+    return APIResponse(
+        success=True,
+        message=f"{removed} Cache-Einträge entfernt",
+        data={"removed": removed, "pipeline_version": automation.result_cache.pipeline_version}
     )
 
 
+@app.get("/queue/items/{item_id}", response_model=WorkItem)
+async def get_work_item(item_id: str):
+    """Status eines Queue-Eintrags (Versuche, Lease, aktueller Knoten, Ergebnis) abrufen"""
+    item = work_queue.get(item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Queue-Eintrag nicht gefunden")
+    return item
+
+
+@app.get("/queue/stats", response_model=APIResponse)
+async def get_queue_stats():
+    """Anzahl der Queue-Einträge je Status"""
+    return APIResponse(success=True, message="Queue-Status", data=work_queue.stats())
+
+
+@app.get("/llm/stats", response_model=APIResponse)
+async def get_llm_stats():
+    """Wiederverwendung gepoolter LLM-Clients (eingesparte Konstruktionen, HTTP-Verbindungen) und LLM-Cache"""
+    return APIResponse(success=True, message="LLM-Status", data={"pool": llm_pool_stats(), "cache": llm_cache_stats()})
+
+
+@app.get("/batches/{batch_id}", response_model=BatchStatus)
+async def get_batch_status(batch_id: str):
+    """Fortschritt pro Lead und Durchsatz (Leads/Minute) eines Batches abrufen"""
+    batch = batch_engine.status(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch nicht gefunden")
+    return batch
+
+
 # Startup Events
 @app.on_event("startup")
 async def startup_event():
@@ -545,17 +695,34 @@ async def startup_event():
     print("🚀 Lead Agent API startet...")
     print("📊 Initialisiere Mock-Leads...")
     initialize_mock_leads()
-    print(f"✅ {len(leads_db)} Mock-Leads geladen")
+    print(f"✅ {lead_store.count()} Leads geladen")
+    # Während des Stillstands endgültig fehlgeschlagene Einträge zuerst als 'failed' verbuchen,
+    # dann Leads, die vor einem Neustart in 'processing' hängen geblieben sind, erneut einreihen
+    for item in work_queue.dead_letter_expired():
+        handle_dead_letter(item)
+    requeued, _ = work_queue.enqueue_many(lead_store.ids_by_status('processing'))
+    if requeued:
+        print(f"♻️ {len(requeued)} hängengebliebene Leads erneut eingereiht")
+    if EMBEDDED_QUEUE_WORKERS:
+        queue_worker.start()
     print("🔗 LangGraph Automation bereit")
     print("✅ API Server bereit auf http://localhost:8000")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Queue-Worker beenden; nicht abgeschlossene Einträge werden nach Ablauf des Leases neu vergeben"""
+    queue_worker.stop(timeout=5)
+
+
 if __name__ == "__main__":
-    # Development Server starten
+    # Development Server starten; mit API_WORKERS > 1 mehrere Prozesse (ohne Auto-Reload)
+    workers = int(os.environ.get("API_WORKERS", "1"))
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=workers == 1,
+        workers=workers,
         log_level="info"
     )
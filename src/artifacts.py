@@ -0,0 +1,245 @@
+"""
+Lauf-bezogener Artefakt-Speicher (Suchergebnisse, gescrapte Seiten, Zusammenfassungen).
+Innerhalb eines Lead-Laufs (artifact_run) wird jede Ressource nur einmal abgerufen bzw.
+zusammengefasst - auch wenn mehrere Säulen oder Tools sie parallel anfragen. Schlüssel: (Art,
+normalisierte URL/Query). Außerhalb eines Laufs rufen die Tools wie bisher direkt ab.
+Der aktive Speicher hängt an einer ContextVar; eigene Thread-Pools müssen den Kontext mit
+contextvars.copy_context() weitergeben.
+Zusätzlich melden die Tools die Fingerprints ihrer Rohdaten (Suchergebnisse, Seiten-Hashes, Sitemaps)
+über record_source; bei Treffern im Speicher werden die Quellen des ersten Abrufs erneut gemeldet
+(Grundlage für die Wiederverwendung von Säulen-Ergebnissen, siehe fingerprints.py).
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+# Längere Schlüsselteile (z.B. Seiteninhalte für Zusammenfassungen) werden gehasht
+_MAX_PLAIN_KEY_LEN = 200
+
+
+def _normalize_part(part: Any) -> str:
+    text = " ".join(str(part).split())
+    if text.startswith(("http://", "https://")):
+        scheme, netloc, path, query, _ = urlsplit(text)
+        netloc = netloc.lower().removeprefix("www.")
+        text = urlunsplit(("https", netloc, path.rstrip("/") or "/", query, ""))
+    else:
+        text = text.casefold()
+    if len(text) > _MAX_PLAIN_KEY_LEN:
+        text = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return text
+
+
+def artifact_key(*parts: Any) -> str:
+    """Normalisierter Schlüssel: URLs ohne Fragment/www/abschließenden Slash, Queries ohne Groß-/Kleinschreibung."""
+    return "|".join(_normalize_part(p) for p in parts)
+
+
+def content_hash(content: Any) -> str:
+    """Stabiler Hash über Text, Bytes oder JSON-serialisierbare Daten."""
+    if isinstance(content, bytes):
+        data = content
+    elif isinstance(content, str):
+        data = content.encode("utf-8")
+    else:
+        data = json.dumps(content, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class SourceSet:
+    """Gesammelte Quellen-Fingerprints: (Art, Schlüssel) -> Inhalts-Hash."""
+
+    def __init__(self):
+        self.sources: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, key: str, digest: str) -> None:
+        with self._lock:
+            self.sources[f"{kind}:{key}"] = digest
+
+    def update(self, sources: Dict[str, str]) -> None:
+        with self._lock:
+            self.sources.update(sources)
+
+    def snapshot(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self.sources)
+
+    def __bool__(self) -> bool:
+        return bool(self.sources)
+
+
+_current_sources: ContextVar[Optional[SourceSet]] = ContextVar("artifact_sources", default=None)
+
+
+def record_source(kind: str, key: Any, content: Any) -> None:
+    """Meldet den Fingerprint einer abgerufenen Rohdatenquelle an den aktiven Sammler (falls vorhanden)."""
+    sources = _current_sources.get()
+    if sources is not None:
+        sources.add(kind, artifact_key(key), content_hash(content))
+
+
+@contextmanager
+def collect_sources() -> Iterator[SourceSet]:
+    """Sammelt alle innerhalb des Blocks gemeldeten Quellen; ein äußerer Sammler erhält sie anschließend ebenfalls."""
+    parent = _current_sources.get()
+    sources = SourceSet()
+    token = _current_sources.set(sources)
+    try:
+        yield sources
+    finally:
+        _current_sources.reset(token)
+        if parent is not None:
+            parent.update(sources.snapshot())
+
+
+def _replay_sources(sources: Optional[Dict[str, str]]) -> None:
+    current = _current_sources.get()
+    if current is not None and sources:
+        current.update(sources)
+
+
+class ArtifactStore:
+    """Artefakte eines Laufs inkl. Treffer-/Fehlzählung je Art."""
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, str], Any] = {}
+        self._sources: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._pending: Dict[Tuple[str, str], threading.Event] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, kind: str, outcome: str) -> None:
+        self._stats.setdefault(kind, {"hits": 0, "misses": 0})[outcome] += 1
+
+    def get_or_compute(self, kind: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Liefert das gespeicherte Artefakt oder berechnet es. Fragen mehrere Threads gleichzeitig
+        dasselbe Artefakt an, wartet der Rest auf das Ergebnis des ersten. Fehler werden nicht gespeichert."""
+        slot = (kind, key)
+        while True:
+            with self._lock:
+                if slot in self._values:
+                    self._count(kind, "hits")
+                    _replay_sources(self._sources.get(slot))
+                    return self._values[slot]
+                event = self._pending.get(slot)
+                if event is None:
+                    event = self._pending[slot] = threading.Event()
+                    self._count(kind, "misses")
+                    break
+            event.wait()
+
+        try:
+            with collect_sources() as sources:
+                value = compute()
+            with self._lock:
+                self._values[slot] = value
+                self._sources[slot] = sources.snapshot()
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(slot, None)
+            event.set()
+
+    async def aget_or_compute(self, kind: str, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Async-Variante; wartet auch auf Abrufe, die gerade in einem Thread laufen (und umgekehrt)."""
+        slot = (kind, key)
+        while True:
+            with self._lock:
+                if slot in self._values:
+                    self._count(kind, "hits")
+                    _replay_sources(self._sources.get(slot))
+                    return self._values[slot]
+                event = self._pending.get(slot)
+                if event is None:
+                    event = self._pending[slot] = threading.Event()
+                    self._count(kind, "misses")
+                    break
+            await asyncio.to_thread(event.wait)
+
+        try:
+            with collect_sources() as sources:
+                value = await compute()
+            with self._lock:
+                self._values[slot] = value
+                self._sources[slot] = sources.snapshot()
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(slot, None)
+            event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_kind = {kind: dict(counts) for kind, counts in self._stats.items()}
+        return {
+            "hits": sum(c["hits"] for c in by_kind.values()),
+            "misses": sum(c["misses"] for c in by_kind.values()),
+            "by_kind": by_kind,
+        }
+
+
+_current_store: ContextVar[Optional[ArtifactStore]] = ContextVar("artifact_store", default=None)
+
+
+def current_store() -> Optional[ArtifactStore]:
+    return _current_store.get()
+
+
+@contextmanager
+def artifact_run(label: str = "") -> Iterator[ArtifactStore]:
+    """Startet einen Lauf mit eigenem Speicher und gibt am Ende die Treffer-Statistik aus.
+    Innerhalb eines bereits aktiven Laufs wird dessen Speicher weiterverwendet."""
+    store = _current_store.get()
+    if store is not None:
+        yield store
+        return
+
+    store = ArtifactStore()
+    token = _current_store.set(store)
+    try:
+        yield store
+    finally:
+        _current_store.reset(token)
+        stats = store.stats()
+        if stats["hits"] or stats["misses"]:
+            details = ", ".join(f"{k}: {c['hits']}/{c['hits'] + c['misses']}" for k, c in sorted(stats["by_kind"].items()))
+            print(f"📦 Artefakte{f' ({label})' if label else ''}: {stats['hits']} Treffer, {stats['misses']} Abrufe ({details})")
+
+
+def cached_artifact(kind: str, key: str, compute: Callable[[], Any]) -> Any:
+    """Wie ArtifactStore.get_or_compute für den aktiven Lauf; ohne Lauf wird direkt berechnet."""
+    store = _current_store.get()
+    if store is None:
+        return compute()
+    return store.get_or_compute(kind, key, compute)
+
+
+async def acached_artifact(kind: str, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Async-Variante von cached_artifact (compute liefert eine Coroutine)."""
+    store = _current_store.get()
+    if store is None:
+        return await compute()
+    return await store.aget_or_compute(kind, key, compute)
+
+
+def run_cached(kind: str, key: Optional[Callable[..., str]] = None):
+    """Decorator: Ergebnis der Funktion je Lauf speichern. Ohne key-Funktion bilden alle
+    Argumente den Schlüssel."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            store = _current_store.get()
+            if store is None:
+                return fn(*args, **kwargs)
+            k = key(*args, **kwargs) if key else artifact_key(*args, *(f"{n}={v}" for n, v in sorted(kwargs.items())))
+            return store.get_or_compute(kind, k, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
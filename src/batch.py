@@ -0,0 +1,132 @@
+"""
+Batch-Engine für die Lead-Verarbeitung.
+Batches werden in die persistente Arbeits-Queue (src/work_queue.py) eingereiht; die Queue-Worker
+verarbeiten höchstens max_concurrency Leads eines Batches gleichzeitig. Fortschritt pro Lead und
+Durchsatz (Leads/Minute) werden aus der Queue gelesen und überleben damit Neustarts.
+Die Provider-Limits (LLM, Serper, Seitenabrufe) greifen zusätzlich prozessweit über src/concurrency.py.
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .concurrency import limits_status
+from .work_queue import WorkItem, WorkQueue
+
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "4"))
+
+# Queue-Status -> Batch-Status
+_STATUS_MAP = {"queued": "queued", "leased": "running", "completed": "completed", "failed": "failed"}
+
+
+class LeadProgress(BaseModel):
+    """Fortschritt eines einzelnen Leads innerhalb eines Batches"""
+    lead_id: int
+    status: str = "queued"  # queued | running | completed | failed
+    attempts: int = 0
+    current_node: Optional[str] = None
+    completed_nodes: List[str] = []
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchStatus(BaseModel):
+    """Aggregierter Status eines Batch-Laufs"""
+    id: str
+    status: str  # running | completed
+    max_concurrency: int
+    # Tatsächliche Parallelität: höchstens so viele Leads, wie Queue-Worker laufen (None = unbekannt)
+    effective_max_concurrency: Optional[int] = None
+    created_at: str
+    finished_at: Optional[str] = None
+    total: int
+    queued: int
+    running: int
+    completed: int
+    failed: int
+    elapsed_seconds: float
+    throughput_leads_per_minute: float
+    limits: Dict[str, Dict[str, int]] = {}
+    leads: List[LeadProgress] = []
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+def _progress(item: WorkItem) -> LeadProgress:
+    status = _STATUS_MAP.get(item.status, item.status)
+    finished = status in ("completed", "failed")
+    return LeadProgress(
+        lead_id=item.lead_id,
+        status=status,
+        attempts=item.attempts,
+        current_node=item.current_node,
+        completed_nodes=item.completed_nodes,
+        started_at=_iso(item.started_at),
+        finished_at=_iso(item.finished_at),
+        duration_seconds=round(item.finished_at - item.started_at, 2) if finished and item.started_at else None,
+        error=item.last_error if status == "failed" else None,
+    )
+
+
+class BatchEngine:
+    """Reiht Batches in die Arbeits-Queue ein und liefert deren Status.
+    worker_concurrency: Anzahl der Queue-Worker dieses Prozesses (None, wenn nur externe Worker laufen)."""
+
+    def __init__(self, queue: WorkQueue, max_concurrency: int = BATCH_MAX_CONCURRENCY,
+                 worker_concurrency: Optional[int] = None):
+        self.queue = queue
+        self.max_concurrency = max_concurrency
+        self.worker_concurrency = worker_concurrency
+
+    def start(self, lead_ids: List[int], max_concurrency: Optional[int] = None) -> BatchStatus:
+        """Legt den Batch an. Leads, die bereits aktiv in der Queue stehen, werden nicht doppelt eingereiht,
+        aber dem Batch zugeordnet (ihr Fortschritt zählt mit)."""
+        n = max(1, max_concurrency or self.max_concurrency)
+        batch_id = self.queue.create_batch(n)
+        created, existing = self.queue.enqueue_many(lead_ids, batch_id=batch_id)
+        effective = self._effective(n)
+        print(f"📦 Batch {batch_id} eingereiht: {len(created)} Leads, {n} parallel"
+              + (f" (wirksam {effective}, so viele Queue-Worker laufen)" if effective not in (None, n) else "")
+              + (f", {len(existing)} bereits in der Queue" if existing else ""))
+        return self.status(batch_id)
+
+    def _effective(self, max_concurrency: int) -> Optional[int]:
+        if self.worker_concurrency is None:
+            return None
+        return min(max_concurrency, self.worker_concurrency)
+
+    def status(self, batch_id: str) -> Optional[BatchStatus]:
+        info = self.queue.batch_info(batch_id)
+        if not info:
+            return None
+        items = self.queue.batch_items(batch_id)
+        leads = [_progress(item) for item in items]
+        counts = {s: sum(1 for p in leads if p.status == s) for s in ("queued", "running", "completed", "failed")}
+        done = counts["completed"] + counts["failed"]
+
+        # Ein Batch ohne Einträge ist sofort abgeschlossen
+        finished_ts = info["created_at"] if not items else None
+        if items and done == len(items):
+            finished_ts = max(item.finished_at or info["created_at"] for item in items)
+        elapsed = max((finished_ts or time.time()) - info["created_at"], 1e-6)
+        return BatchStatus(
+            id=batch_id,
+            status="completed" if finished_ts else "running",
+            max_concurrency=info["max_concurrency"],
+            effective_max_concurrency=self._effective(info["max_concurrency"]),
+            created_at=_iso(info["created_at"]),
+            finished_at=_iso(finished_ts),
+            total=len(leads),
+            elapsed_seconds=round(elapsed, 2),
+            throughput_leads_per_minute=round(done / elapsed * 60, 2),
+            limits=limits_status(),
+            leads=leads,
+            **counts,
+        )
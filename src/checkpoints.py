@@ -0,0 +1,130 @@
+"""
+Persistente LangGraph-Checkpoints (SQLite) je Lead.
+Schlägt ein Lauf fehl, setzt der nächste Lauf mit derselben Lead-ID nach dem letzten erfolgreichen
+Knoten fort, statt Website-Crawl und Zusammenfassungen zu wiederholen. Abgeschlossene Läufe werden
+sofort gelöscht, liegengebliebene nach CHECKPOINT_MAX_AGE_SECONDS.
+Ein Lease je Thread stellt sicher, dass nur ein Lauf (über alle Prozesse) den Checkpoint einer Lead-ID
+nutzt; gleichzeitige weitere Läufe bekommen einen eigenen Versuchs-Thread.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from .db import SQLiteDatabase, data_path
+
+CHECKPOINT_MAX_AGE_SECONDS = int(os.environ.get("CHECKPOINT_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+# Lease eines laufenden Threads; wird bei jedem Knoten verlängert, verfällt nach Absturz des Prozesses
+CHECKPOINT_LEASE_SECONDS = float(os.environ.get("CHECKPOINT_LEASE_SECONDS", "900"))
+
+# Alte Checkpoints werden höchstens so oft gesucht
+_PRUNE_INTERVAL_SECONDS = 600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint_threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoint_threads_updated ON checkpoint_threads(updated_at);
+CREATE TABLE IF NOT EXISTS checkpoint_leases (
+    thread_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class ThreadedSqliteSaver(SqliteSaver):
+    """SqliteSaver mit Async-Methoden (für astream/arun_workflow). Die synchronen Zugriffe laufen
+    in einem Worker-Thread; die Verbindung ist per Lock abgesichert."""
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[Any]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = ""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+class CheckpointStore:
+    """SqliteSaver für den Graphen plus Buchführung, wann ein Thread (Lead) zuletzt lief."""
+
+    def __init__(self, path: Optional[str] = None, max_age_seconds: int = CHECKPOINT_MAX_AGE_SECONDS):
+        self.path = path or data_path("checkpoints.db")
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_age_seconds = max_age_seconds
+        # SqliteSaver serialisiert Zugriffe auf seine Verbindung selbst (Lock)
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout=30000")
+        self.saver = ThreadedSqliteSaver(conn)
+        self.saver.setup()
+        self.db = SQLiteDatabase(self.path)
+        self.db.executescript(_SCHEMA)
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def touch(self, thread_id: str) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO checkpoint_threads (thread_id, updated_at) VALUES (?, ?)", (thread_id, time.time())
+        )
+
+    def acquire(self, thread_id: str, owner: str, lease_seconds: float = CHECKPOINT_LEASE_SECONDS) -> bool:
+        """Reserviert den Thread für einen Lauf. False, solange ein anderer Lauf ein gültiges Lease hält."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT owner, expires_at FROM checkpoint_leases WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+            if row and row["owner"] != owner and row["expires_at"] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoint_leases (thread_id, owner, expires_at) VALUES (?, ?, ?)",
+                (thread_id, owner, now + lease_seconds),
+            )
+        return True
+
+    def renew(self, thread_id: str, owner: str, lease_seconds: float = CHECKPOINT_LEASE_SECONDS) -> None:
+        self.db.execute(
+            "UPDATE checkpoint_leases SET expires_at = ? WHERE thread_id = ? AND owner = ?",
+            (time.time() + lease_seconds, thread_id, owner),
+        )
+
+    def release(self, thread_id: str, owner: str) -> None:
+        self.db.execute("DELETE FROM checkpoint_leases WHERE thread_id = ? AND owner = ?", (thread_id, owner))
+
+    def clear(self, thread_id: str) -> None:
+        """Löscht alle Checkpoints eines Threads (z.B. nach erfolgreichem Abschluss)."""
+        self.saver.delete_thread(thread_id)
+        self.db.execute("DELETE FROM checkpoint_threads WHERE thread_id = ?", (thread_id,))
+
+    def prune(self, force: bool = False) -> int:
+        """Entfernt Threads, die länger als max_age_seconds nicht gelaufen sind. Gibt deren Anzahl zurück."""
+        now = time.time()
+        with self._prune_lock:
+            if not force and now - self._last_prune < _PRUNE_INTERVAL_SECONDS:
+                return 0
+            self._last_prune = now
+        rows = self.db.execute(
+            "SELECT thread_id FROM checkpoint_threads WHERE updated_at < ?", (now - self.max_age_seconds,)
+        ).fetchall()
+        for row in rows:
+            self.clear(row["thread_id"])
+        if rows:
+            print(f"🧹 {len(rows)} veraltete Checkpoint-Threads gelöscht")
+        return len(rows)
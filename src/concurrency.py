@@ -0,0 +1,167 @@
+"""
+Prozessweite Concurrency-Limits für externe Ressourcen.
+Getrennte Obergrenzen für LLM-Aufrufe, Serper-Suchen und Seitenabrufe, damit parallele Leads
+die Provider nicht überlasten. Konfiguration per ENV oder configure_limits().
+Async-Code nutzt dieselben Obergrenzen über aslot() (wartet auf ein Future, das beim Freigeben geweckt wird).
+run_concurrently()/arun_concurrently() führen unabhängige Aufrufe (z.B. LLM-Prompts) gleichzeitig aus.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_LIMITS = {
+    "llm": int(os.environ.get("LLM_MAX_CONCURRENCY", "8")),
+    "serper": int(os.environ.get("SERPER_MAX_CONCURRENCY", "4")),
+    "fetch": int(os.environ.get("FETCH_MAX_CONCURRENCY", "16")),
+}
+# Höchstzahl gleichzeitiger Aufrufe je run_concurrently() (global begrenzen weiterhin die Slots)
+GATHER_MAX_CONCURRENCY = int(os.environ.get("GATHER_MAX_CONCURRENCY", "4"))
+
+
+class ResourceLimit:
+    """Zählender Semaphor, der pro Thread reentrant ist.
+    Die Reentranz gilt nur im selben Thread: Slots nie über Läufe halten, deren Tools in anderen
+    Threads selbst Slots anfordern (z.B. AgentExecutor) - sonst blockieren sich volle Slots gegenseitig."""
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Wartende Coroutinen (Loop, Future); jede Freigabe weckt alle, sie versuchen es erneut
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.in_use = 0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self._semaphore.acquire()
+            with self._lock:
+                self.in_use += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                self._release()
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """Wie slot(), teilt sich die Obergrenze mit den Threads, blockiert aber den Event-Loop nicht.
+        Nicht reentrant - innerhalb eines gehaltenen Slots keinen weiteren anfordern."""
+        while not self._semaphore.acquire(blocking=False):
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            with self._lock:
+                self._waiters.append(waiter)
+            # Freigabe zwischen erstem Versuch und Eintragen wäre sonst verpasst
+            if self._semaphore.acquire(blocking=False):
+                self._discard_waiter(waiter)
+                break
+            try:
+                await waiter[1]
+            finally:
+                self._discard_waiter(waiter)
+        with self._lock:
+            self.in_use += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+        self._semaphore.release()
+        # Erst nach dem Freigeben leeren: wer sich danach einträgt, sieht den freien Slot beim Nachprüfen
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                pass  # Loop bereits geschlossen
+
+    def _discard_waiter(self, waiter) -> None:
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_LIMITS: Dict[str, ResourceLimit] = {name: ResourceLimit(name, n) for name, n in DEFAULT_LIMITS.items()}
+
+
+def configure_limits(llm: Optional[int] = None, serper: Optional[int] = None, fetch: Optional[int] = None) -> None:
+    """Setzt neue Obergrenzen. Laufende Aufrufe behalten ihren alten Slot."""
+    for name, value in (("llm", llm), ("serper", serper), ("fetch", fetch)):
+        if value is not None:
+            _LIMITS[name] = ResourceLimit(name, value)
+
+
+def limits_status() -> Dict[str, Dict[str, int]]:
+    return {name: {"max": lim.max_concurrency, "in_use": lim.in_use} for name, lim in _LIMITS.items()}
+
+
+def llm_slot():
+    return _LIMITS["llm"].slot()
+
+
+def serper_slot():
+    return _LIMITS["serper"].slot()
+
+
+def fetch_slot():
+    return _LIMITS["fetch"].slot()
+
+
+def allm_slot():
+    return _LIMITS["llm"].aslot()
+
+
+def aserper_slot():
+    return _LIMITS["serper"].aslot()
+
+
+def afetch_slot():
+    return _LIMITS["fetch"].aslot()
+
+
+def run_concurrently(calls: Sequence[Callable[[], Any]], max_concurrency: int = GATHER_MAX_CONCURRENCY) -> List[Any]:
+    """Führt die Aufrufe in Threads (mit kopiertem Kontext: Deadline, Artefakt-Speicher, Cache-Bypass) aus.
+    Liefert die Ergebnisse in Eingabereihenfolge; fehlgeschlagene Aufrufe liefern ihre Exception."""
+    def run(call: Callable[[], Any]) -> Any:
+        try:
+            return call()
+        except Exception as e:
+            return e
+
+    if len(calls) <= 1 or max_concurrency <= 1:
+        return [run(call) for call in calls]
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(calls)), thread_name_prefix="gather") as ex:
+        futures = [ex.submit(contextvars.copy_context().run, run, call) for call in calls]
+        return [f.result() for f in futures]
+
+
+async def arun_concurrently(calls: Sequence[Callable[[], Awaitable[Any]]],
+                            max_concurrency: int = GATHER_MAX_CONCURRENCY) -> List[Any]:
+    """Async-Variante von run_concurrently (Coroutine-Fabriken, höchstens max_concurrency gleichzeitig)."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(call: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            return await call()
+
+    return list(await asyncio.gather(*(run(call) for call in calls), return_exceptions=True))
@@ -0,0 +1,61 @@
+"""
+SQLite-Hilfsschicht für die persistenten Stores (Leads, Jobs, Caches).
+Jeder Thread erhält eine eigene Verbindung; WAL-Modus erlaubt parallele Leser neben einem Schreiber.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Sequence, Any
+
+# Basisverzeichnis für alle lokalen Datenbanken (per ENV überschreibbar)
+DATA_DIR = os.environ.get("LEAD_AGENT_DATA_DIR", str(Path(__file__).resolve().parent.parent / "data"))
+
+
+def data_path(filename: str) -> str:
+    """Liefert den Pfad einer Datei im Datenverzeichnis."""
+    return str(Path(DATA_DIR) / filename)
+
+
+class SQLiteDatabase:
+    """Dünner Wrapper um sqlite3 mit thread-lokalen Verbindungen und expliziten Transaktionen."""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: Autocommit, Transaktionen werden explizit über transaction() gesteuert
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Schreibtransaktion (BEGIN IMMEDIATE); verschachtelte Aufrufe laufen in der äußeren Transaktion mit."""
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        return self.connection().execute(sql, params)
+
+    def executescript(self, script: str) -> None:
+        self.connection().executescript(script)
@@ -0,0 +1,147 @@
+"""
+Zeitbudget (Deadline) je Graph-Lauf.
+Die Deadline wird pro Lauf erzeugt (run_workflow(deadline_seconds=...), API-Feld deadline_seconds oder
+RUN_DEADLINE_SECONDS), steht im GraphState und ist während des Laufs über eine ContextVar aktiv.
+Tools begrenzen ihre Timeouts auf die Restzeit (clamp_timeout, clamp_llm) und lassen weitere Arbeit
+(Seiten, Chunk-Zusammenfassungen, zusätzliche Suchergebnisse) aus, sobald das Budget erschöpft ist.
+Der Lauf liefert dann rechtzeitig einen Best-Effort-Report; ausgelassene Arbeit wird in "trimmed" vermerkt.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple, Union
+
+try:
+    from .state import Deadline
+except ImportError:
+    from state import Deadline
+
+# Standard-Zeitbudget je Lauf in Sekunden (0 = kein Budget)
+RUN_DEADLINE_SECONDS = float(os.environ.get("RUN_DEADLINE_SECONDS", "0"))
+# Tools enden so viele Sekunden vor der Deadline, damit der abschließende LLM-Aufruf der Säule noch läuft
+# (höchstens die Hälfte der Restzeit)
+DEADLINE_TOOL_RESERVE_SECONDS = float(os.environ.get("DEADLINE_TOOL_RESERVE_SECONDS", "15"))
+# Kürzester Timeout, der einem Request noch gegeben wird
+MIN_TIMEOUT_SECONDS = 1.0
+
+Timeout = Union[None, float, Tuple[float, float]]
+
+
+class DeadlineExceeded(TimeoutError):
+    """Das Zeitbudget des Laufs ist erschöpft."""
+
+
+class _ActiveDeadline:
+    def __init__(self, deadline: Deadline, trimmed: List[str], lock: threading.Lock):
+        self.deadline = deadline
+        self.trimmed = trimmed
+        self.lock = lock
+
+
+_active: ContextVar[Optional[_ActiveDeadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    active = _active.get()
+    return active.deadline if active else None
+
+
+def resolve_deadline(deadline_seconds: Optional[float] = None) -> Optional[Deadline]:
+    """Deadline für einen neuen Lauf (Parameter bzw. RUN_DEADLINE_SECONDS; 0/None = ohne Budget)."""
+    seconds = RUN_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+    return Deadline.after(seconds) if seconds and seconds > 0 else None
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[List[str]]:
+    """Aktiviert die Deadline für den Block (inkl. Threads mit kopiertem Kontext) und liefert die Liste
+    der wegen des Budgets ausgelassenen Arbeitsschritte. Ohne Deadline bzw. innerhalb eines bereits
+    aktiven Laufs bleibt der aktuelle Zustand erhalten."""
+    active = _active.get()
+    if active is not None or deadline is None:
+        yield active.trimmed if active else []
+        return
+    token = _active.set(_ActiveDeadline(deadline, [], threading.Lock()))
+    try:
+        yield _active.get().trimmed
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def tool_deadline() -> Iterator[None]:
+    """Tools innerhalb des Blocks sehen eine um die Reserve vorgezogene Deadline."""
+    active = _active.get()
+    if active is None:
+        yield
+        return
+    reserve = min(DEADLINE_TOOL_RESERVE_SECONDS, active.deadline.remaining() / 2)
+    token = _active.set(_ActiveDeadline(active.deadline.earlier(reserve), active.trimmed, active.lock))
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def remaining_seconds() -> Optional[float]:
+    deadline = current_deadline()
+    return deadline.remaining() if deadline else None
+
+
+def deadline_expired() -> bool:
+    deadline = current_deadline()
+    return deadline.expired if deadline else False
+
+
+def note_trimmed(what: str) -> None:
+    """Vermerkt einen wegen des Zeitbudgets ausgelassenen Arbeitsschritt."""
+    active = _active.get()
+    if active is None:
+        return
+    with active.lock:
+        active.trimmed.append(what)
+    print(f"⏱️ Zeitbudget erschöpft - {what}")
+
+
+def trimmed_count() -> int:
+    active = _active.get()
+    return len(active.trimmed) if active else 0
+
+
+def check_deadline(what: str) -> None:
+    """Wirft DeadlineExceeded (und vermerkt den Schritt), wenn das Budget erschöpft ist."""
+    if deadline_expired():
+        note_trimmed(what)
+        raise DeadlineExceeded(f"Zeitbudget erschöpft: {what}")
+
+
+def clamp_timeout(timeout: Timeout) -> Timeout:
+    """Begrenzt einen Request-Timeout (Sekunden oder (connect, read)) auf die Restzeit des Laufs."""
+    remaining = remaining_seconds()
+    if remaining is None:
+        return timeout
+    limit = max(MIN_TIMEOUT_SECONDS, remaining)
+    if timeout is None:
+        return limit
+    if isinstance(timeout, tuple):
+        return tuple(min(t, limit) for t in timeout)
+    return min(timeout, limit)
+
+
+def clamp_llm(llm):
+    """OpenAI-Chatmodell mit auf die Restzeit begrenztem Request-Timeout (ohne Retries, die das Budget
+    sprengen würden), AgentExecutor mit begrenzter Laufzeit. Andere Modelle bzw. Läufe ohne Deadline
+    bleiben unverändert."""
+    timeout = clamp_timeout(None)
+    if timeout is None:
+        return llm
+    if hasattr(llm, "max_execution_time"):
+        return llm.model_copy(update={"max_execution_time": timeout})
+    if getattr(llm, "root_client", None) is None:
+        return llm
+    return llm.model_copy(update={
+        "client": llm.root_client.with_options(timeout=timeout, max_retries=0).chat.completions,
+        "async_client": llm.root_async_client.with_options(timeout=timeout, max_retries=0).chat.completions,
+    })
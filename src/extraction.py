@@ -0,0 +1,225 @@
+"""
+Extraktion strukturierter Lead-Felder aus den Markdown-Reports des Graph-Workflows.
+Alle Feld-Muster sind in einem einzigen vorkompilierten Regex zusammengefasst; jeder Report wird
+nach einem Schlüsselwort-Vorfilter genau einmal durchlaufen. Zu jedem Feld wird eine Konfidenz (0-1)
+geliefert. Batch-Modus: extract_batch(); Micro-Benchmark: python -m src.extraction --bench 5000
+"""
+
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+FIELDS = ("employee_count", "revenue", "linkedin", "industry", "materials", "company_type")
+
+# Günstiger Vorfilter: Reports ohne eines dieser Wörter werden nicht weiter untersucht
+_PREFILTER = re.compile(
+    r"mitarbeit|angestellt|beschäftigt|personal|belegschaft|employees|umsatz|linkedin|branche|industrie|"
+    r"sektor|wirtschaftszweig|material|werkstoff|unternehmens(?:art|typ)|geschäftsmodell|hersteller|"
+    r"händler|fertigung|produzent|großhandel|dienstleist",
+    re.IGNORECASE,
+)
+
+_NUM = r"\d{1,3}(?:[.\s]\d{3})+(?:,\d+)?|\d+(?:[.,]\d+)?"
+_APPROX = r"(?:ca\.?|circa|rund|etwa|über|mehr\s+als|knapp|ungefähr|~)?\s*"
+_UNIT = r"Mrd\.?|Milliarden|Mio\.?|Millionen|Million|Tsd\.?|Tausend|€|EUR|Euro"
+# Feldbezeichner im Markdown: "**Branche:** X", "- Branche: X", "| Branche | X |"
+_LABEL_SEP = r"\s*\**\s*(?::|\|)\s*\**\s*"
+
+
+def _label(names: str, group: str, max_len: int) -> str:
+    return rf"(?:{names}){_LABEL_SEP}(?P<{group}>[^\n|*]{{2,{max_len}}})"
+
+
+# Gruppenname -> (Feld, Basis-Konfidenz). Explizit beschriftete Werte sind verlässlicher als Fließtext.
+_GROUPS: Dict[str, Tuple[str, float]] = {
+    "emp_label": ("employee_count", 0.9),
+    "emp_text": ("employee_count", 0.75),
+    "rev_label": ("revenue", 0.9),
+    "rev_text": ("revenue", 0.75),
+    "li_company": ("linkedin", 0.9),
+    "li_person": ("linkedin", 0.8),
+    "ind_label": ("industry", 0.85),
+    "mat_label": ("materials", 0.85),
+    "ct_label": ("company_type", 0.85),
+    "ct_keyword": ("company_type", 0.5),
+}
+
+# Alle Alternativen beginnen an einer Wortgrenze mit einem dieser Zeichen. Die vorangestellte Prüfung
+# verwirft die meisten Textpositionen, bevor die Alternativen einzeln probiert werden (ca. 6x schneller).
+_FIRST_CHARS = r"(?=[\dmabpjulisvwgfhd])\b"
+
+_COMBINED = re.compile(
+    _FIRST_CHARS + "(?:" + "|".join([
+        rf"(?:Mitarbeiter(?:anzahl|zahl)?|Anzahl\s+(?:der\s+)?Mitarbeiter|Angestellte|Beschäftigte|Personalstärke|Belegschaft)"
+        rf"{_LABEL_SEP}{_APPROX}(?P<emp_label>{_NUM})",
+        rf"(?P<emp_text>{_NUM})\s*\+?\s*(?:Mitarbeiter|Angestellte|Beschäftigte|employees)",
+        rf"(?:Jahres)?umsatz(?:\s*\(\d{{4}}\))?{_LABEL_SEP}{_APPROX}(?P<rev_label>{_NUM})\s*(?P<rev_label_unit>{_UNIT})",
+        rf"(?P<rev_text>{_NUM})\s*(?P<rev_text_unit>{_UNIT})\s*(?:€|EUR|Euro)?\s*(?:Jahres)?umsatz",
+        r"(?P<li_company>linkedin\.com/company/[\w\-%]+)",
+        r"(?P<li_person>linkedin\.com/in/[\w\-%]+)",
+        _label(r"Branche|Industrie|Industry|Sektor|Wirtschaftszweig", "ind_label", 80),
+        _label(r"(?:Verarbeitete\s+)?Materialien|Werkstoffe|Material", "mat_label", 200),
+        _label(r"Unternehmensart|Unternehmenstyp|Art\s+des\s+Unternehmens|Geschäftsmodell", "ct_label", 80),
+        r"(?P<ct_keyword>Fertigungsunternehmen|Hersteller|Produzent|Großhändler|Großhandel|Händler|Dienstleister)\b",
+    ]) + ")",
+    re.IGNORECASE,
+)
+
+# Report-Titel, in denen ein Feld erwartet wird -> leicht höhere Konfidenz
+_SECTION_HINTS = {
+    "employee_count": ("unternehmens",),
+    "revenue": ("finanz",),
+    "linkedin": ("linkedin",),
+    "industry": ("unternehmens",),
+    "materials": ("materials", "unternehmens"),
+    "company_type": ("unternehmens",),
+}
+
+_UNIT_FACTORS = (
+    (("mrd", "milliarde"), 1_000_000_000),
+    (("mio", "million"), 1_000_000),
+    (("tsd", "tausend"), 1_000),
+)
+
+_COMPANY_TYPES = (
+    (("fertigung", "hersteller", "produzent", "produktion"), "Fertigungsunternehmen"),
+    (("händler", "handel"), "Händler"),
+    (("dienstleist",), "Dienstleister"),
+)
+
+# Platzhalter ohne Aussage (Vergleich nach dem Entfernen von Satzzeichen am Rand)
+_EMPTY_VALUES = {"", "n/a", "k.a", "k. a", "keine angabe", "keine angaben", "unbekannt", "nicht bekannt", "nicht gefunden"}
+
+
+def _parse_number(raw: str) -> Optional[float]:
+    """Deutsche und englische Zahlformate: '1.234', '1 234', '12,5', '1.234,5', '3.5'"""
+    s = raw.strip().replace(" ", "")
+    if "," in s:
+        s = s.replace(".", "").replace(",", ".")
+    elif re.fullmatch(r"\d{1,3}(?:\.\d{3})+", s):
+        s = s.replace(".", "")
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def _clean_text(raw: str) -> Optional[str]:
+    value = raw.strip().strip(".;,:-–").strip()
+    return None if value.lower() in _EMPTY_VALUES else value
+
+
+def _normalize_company_type(raw: str) -> Optional[str]:
+    value = _clean_text(raw)
+    if not value:
+        return None
+    lowered = value.lower()
+    for keywords, label in _COMPANY_TYPES:
+        if any(k in lowered for k in keywords):
+            return label
+    return value
+
+
+def _value(group: str, match: re.Match) -> Any:
+    raw = match.group(group)
+    if group.startswith("emp"):
+        number = _parse_number(raw)
+        return int(number) if number else None
+    if group.startswith("rev"):
+        number = _parse_number(raw)
+        if number is None:
+            return None
+        unit = match.group(f"{group}_unit").lower()
+        factor = next((f for keys, f in _UNIT_FACTORS if any(unit.startswith(k) for k in keys)), 1)
+        return int(number * factor)
+    if group.startswith("li"):
+        # Einheitliche URL unabhängig von Schreibweise/Länder-Subdomain im Report
+        return "https://www." + raw
+    if group.startswith("ct"):
+        return _normalize_company_type(raw)
+    return _clean_text(raw)
+
+
+def extract_fields(reports: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Extrahiert alle Lead-Felder aus den Reports eines Leads.
+    Rückgabe: {feld: wert, ..., "confidence": {feld: 0-1}} - nicht gefundene Felder sind None."""
+    best: Dict[str, Tuple[float, Any]] = {}
+    for report in reports:
+        content = report.get("content") or ""
+        if not content or not _PREFILTER.search(content):
+            continue
+        title = (report.get("title") or "").lower()
+
+        for match in _COMBINED.finditer(content):
+            group = match.lastgroup
+            if group not in _GROUPS:
+                # lastgroup kann die Einheit sein, wenn sie die letzte Gruppe der Alternative ist
+                group = next(g for g in _GROUPS if match.group(g) is not None)
+            field, confidence = _GROUPS[group]
+            value = _value(group, match)
+            if value is None:
+                continue
+            if any(hint in title for hint in _SECTION_HINTS[field]):
+                confidence += 0.05
+
+            current = best.get(field)
+            if current and current[1] == value:
+                # Übereinstimmende Fundstellen bestätigen den Wert
+                best[field] = (min(max(current[0], confidence) + 0.05, 0.99), value)
+            elif not current or confidence > current[0]:
+                best[field] = (confidence, value)
+
+    result: Dict[str, Any] = {field: best[field][1] if field in best else None for field in FIELDS}
+    result["confidence"] = {field: round(best[field][0], 2) for field in FIELDS if field in best}
+    return result
+
+
+def _extract_chunk(report_sets: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    return [extract_fields(reports) for reports in report_sets]
+
+
+def extract_batch(report_sets: Iterable[List[Dict[str, Any]]], workers: int = 1, chunk_size: int = 500) -> List[Dict[str, Any]]:
+    """Extrahiert die Felder für viele Leads (eine Report-Liste je Lead), Reihenfolge bleibt erhalten.
+    Mit workers > 1 werden Blöcke von chunk_size Leads auf mehrere Prozesse verteilt."""
+    report_sets = list(report_sets)
+    if workers <= 1 or len(report_sets) <= chunk_size:
+        return _extract_chunk(report_sets)
+    chunks = [report_sets[i:i + chunk_size] for i in range(0, len(report_sets), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [result for chunk in pool.map(_extract_chunk, chunks) for result in chunk]
+
+
+_SAMPLE_REPORTS = [
+    {"title": "Unternehmensinformationen_1", "content": (
+        "## Unternehmensprofil\n- **Branche:** Maschinenbau\n- **Mitarbeiteranzahl:** ca. 1.250\n"
+        "- **Unternehmensart:** Hersteller von Präzisionsteilen\nDas Unternehmen beschäftigt rund 1250 Mitarbeiter "
+        "an drei Standorten.\n" + "Weitere Informationen zur Firmengeschichte und zum Standort. " * 20)},
+    {"title": "Unternehmensinformationen_services_materials_1", "content": (
+        "### Dienstleistungen\nCNC-Fräsen, Drehen, Schweißen\n**Materialien:** Edelstahl, Aluminium, Titan\n"
+        + "Beschreibung der Produktpalette und Referenzen. " * 20)},
+    {"title": "Finanzen", "content": "| Kennzahl | Wert |\n|---|---|\n| Jahresumsatz | 85,4 Mio. € |\n" + "Bilanzdaten. " * 30},
+    {"title": "LinkedIn", "content": "Profil: https://www.linkedin.com/company/beispiel-gmbh/ " + "Beiträge. " * 30},
+    {"title": "News", "content": "Keine relevanten Neuigkeiten gefunden. " * 40},
+]
+
+
+def _benchmark(n_leads: int, workers: int) -> None:
+    report_sets = [_SAMPLE_REPORTS] * n_leads
+    n_reports = n_leads * len(_SAMPLE_REPORTS)
+    start = time.perf_counter()
+    results = extract_batch(report_sets, workers=workers)
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ {n_leads} Leads / {n_reports} Reports in {elapsed:.3f}s "
+          f"({n_reports / elapsed:,.0f} Reports/s, {elapsed / n_leads * 1e6:.1f} µs/Lead, {workers} Prozess(e))")
+    print(f"📋 Beispiel: {results[0]}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Micro-Benchmark der Report-Extraktion")
+    parser.add_argument("--bench", type=int, default=5000, help="Anzahl Leads (je 5 Beispiel-Reports)")
+    parser.add_argument("--workers", type=int, default=1, help="Anzahl Prozesse im Batch-Modus")
+    args = parser.parse_args()
+    _benchmark(args.bench, args.workers)
@@ -0,0 +1,238 @@
+"""
+Frische-basierte Wiederverwendung beim erneuten Recherchieren bestehender Leads.
+Jede Säule sammelt die Fingerprints ihrer Rohdaten (Suchergebnis-Mengen, Seiten-Hashes, Sitemap-lastmod,
+siehe artifacts.record_source). Sind alle Quellen unverändert, wird der Report des letzten Laufs
+übernommen, ohne das LLM erneut aufzurufen. Zusätzlich werden Seiten-Zusammenfassungen je Inhalts-Hash
+gespeichert: nur geänderte Seiten gehen erneut durchs LLM.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+try:
+    from .db import SQLiteDatabase, data_path
+    from .artifacts import acached_artifact, artifact_key, cached_artifact, collect_sources, content_hash
+    from .result_cache import PIPELINE_VERSION
+    from .state import Report
+    from .deadline import deadline_expired, trimmed_count
+except ImportError:
+    from db import SQLiteDatabase, data_path
+    from artifacts import acached_artifact, artifact_key, cached_artifact, collect_sources, content_hash
+    from result_cache import PIPELINE_VERSION
+    from state import Report
+    from deadline import deadline_expired, trimmed_count
+
+# 0 = jede Säule und jede Seiten-Zusammenfassung wird immer neu berechnet
+FRESHNESS_REUSE = os.environ.get("FRESHNESS_REUSE", "1") != "0"
+# Ältere Fingerprints/Zusammenfassungen werden nicht mehr verwendet (Standard: 90 Tage, monatliches Re-Scoring)
+FINGERPRINT_MAX_AGE_SECONDS = int(os.environ.get("FINGERPRINT_MAX_AGE_SECONDS", str(90 * 24 * 3600)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pillar_fingerprints (
+    pillar TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    sources TEXT NOT NULL,
+    result TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (pillar, subject)
+);
+CREATE TABLE IF NOT EXISTS page_summaries (
+    kind TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, content_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_page_summaries_updated ON page_summaries(updated_at);
+"""
+
+# Abgelaufene Einträge werden höchstens so oft gelöscht
+_PURGE_INTERVAL_SECONDS = 3600
+
+
+class FingerprintStore:
+    """Letzte Säulen-Ergebnisse samt Quellen-Fingerprint und Seiten-Zusammenfassungen je Inhalts-Hash."""
+
+    def __init__(self, path: Optional[str] = None, max_age_seconds: int = FINGERPRINT_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self.db = SQLiteDatabase(path or data_path("fingerprints.db"))
+        self.db.executescript(_SCHEMA)
+        self._last_purge = 0.0
+
+    def get_result(self, pillar: str, subject: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            "SELECT result FROM pillar_fingerprints WHERE pillar = ? AND subject = ? AND fingerprint = ? AND updated_at > ?",
+            (pillar, subject, fingerprint, time.time() - self.max_age_seconds),
+        ).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def put_result(self, pillar: str, subject: str, fingerprint: str, sources: Dict[str, str],
+                   result: Dict[str, Any]) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO pillar_fingerprints (pillar, subject, fingerprint, sources, result, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (pillar, subject, fingerprint, json.dumps(sources, sort_keys=True),
+             json.dumps(result, ensure_ascii=False, default=str), time.time()),
+        )
+        self._purge()
+
+    def get_summary(self, kind: str, digest: str) -> Optional[str]:
+        row = self.db.execute(
+            "SELECT summary FROM page_summaries WHERE kind = ? AND content_hash = ? AND updated_at > ?",
+            (kind, digest, time.time() - self.max_age_seconds),
+        ).fetchone()
+        return row["summary"] if row else None
+
+    def put_summary(self, kind: str, digest: str, summary: str) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO page_summaries (kind, content_hash, summary, updated_at) VALUES (?, ?, ?, ?)",
+            (kind, digest, summary, time.time()),
+        )
+        self._purge()
+
+    def invalidate(self, subject: Optional[str] = None) -> int:
+        """Entfernt die Säulen-Ergebnisse eines Subjekts (Query) bzw. ohne Subjekt alle Einträge."""
+        if subject is None:
+            removed = self.db.execute("DELETE FROM pillar_fingerprints").rowcount
+            return removed + self.db.execute("DELETE FROM page_summaries").rowcount
+        return self.db.execute("DELETE FROM pillar_fingerprints WHERE subject = ?", (artifact_key(subject),)).rowcount
+
+    def _purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        cutoff = now - self.max_age_seconds
+        self.db.execute("DELETE FROM pillar_fingerprints WHERE updated_at <= ?", (cutoff,))
+        self.db.execute("DELETE FROM page_summaries WHERE updated_at <= ?", (cutoff,))
+
+
+_store: Optional[FingerprintStore] = None
+_store_lock = threading.Lock()
+
+
+def get_fingerprint_store() -> Optional[FingerprintStore]:
+    """Prozessweite Instanz (None, wenn FRESHNESS_REUSE deaktiviert ist)."""
+    global _store
+    if not FRESHNESS_REUSE:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = FingerprintStore()
+        return _store
+
+
+# --- Säulen --------------------------------------------------------------------
+
+
+def _serialize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: ([r.model_dump() for r in v] if k == "reports" else v) for k, v in result.items()}
+
+
+def _deserialize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: ([Report(**r) for r in v] if k == "reports" else v) for k, v in result.items()}
+
+
+class PillarInputs:
+    """Quellen einer Säule für ein Subjekt (Query). previous_result() liefert das gespeicherte Ergebnis,
+    wenn sich keine Quelle geändert hat; save() speichert das neue Ergebnis samt Fingerprint - außer der
+    Lauf hat seit Beginn der Säule Schritte wegen des Zeitbudgets ausgelassen (gekürztes Ergebnis)."""
+
+    def __init__(self, pillar: str, subject: str, sources):
+        self.pillar = pillar
+        self.subject = artifact_key(subject)
+        self.sources = sources
+        self.trimmed_before = trimmed_count()
+
+    def fingerprint(self) -> str:
+        return content_hash([PIPELINE_VERSION, self.pillar, self.subject, sorted(self.sources.snapshot().items())])
+
+    def previous_result(self) -> Optional[Dict[str, Any]]:
+        store = get_fingerprint_store()
+        # Ohne gemeldete Quellen (z.B. Tool-Fehler) ist keine Aussage über Änderungen möglich
+        if store is None or not self.sources:
+            return None
+        result = store.get_result(self.pillar, self.subject, self.fingerprint())
+        if result is None:
+            return None
+        print(f"♻️ Säule {self.pillar}: {len(self.sources.snapshot())} Quellen unverändert - verwende vorherigen Report")
+        return _deserialize_result(result)
+
+    def save(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        store = get_fingerprint_store()
+        if store is not None and self.sources and _complete(self.trimmed_before):
+            store.put_result(self.pillar, self.subject, self.fingerprint(), self.sources.snapshot(),
+                             _serialize_result(result))
+        return result
+
+
+@contextmanager
+def pillar_inputs(pillar: str, subject: str) -> Iterator[PillarInputs]:
+    """Sammelt die Quellen aller Tool-Aufrufe innerhalb des Blocks für die Säule."""
+    with collect_sources() as sources:
+        yield PillarInputs(pillar, subject, sources)
+
+
+# --- Seiten-Zusammenfassungen ----------------------------------------------------
+
+
+class FallbackSummary(str):
+    """Ersatztext statt Zusammenfassung (z.B. Rohtext nach LLM-Fehler): gilt nur im laufenden Lauf und
+    wird nicht laufübergreifend gespeichert."""
+
+
+def _complete(trimmed_before: int) -> bool:
+    # Unter Zeitdruck gekürzte Zusammenfassungen nicht laufübergreifend speichern
+    return trimmed_count() == trimmed_before and not deadline_expired()
+
+
+def page_summary(kind: str, content: Any, compute: Callable[[], str]) -> str:
+    """Zusammenfassung je Inhalts-Hash: im Lauf über den Artefakt-Speicher, laufübergreifend über die
+    Datenbank. Unveränderte Seiten werden nicht erneut zusammengefasst."""
+    digest = content_hash(content)
+
+    def load_or_compute() -> str:
+        store = get_fingerprint_store()
+        summary = store.get_summary(kind, digest) if store else None
+        if summary is None:
+            trimmed_before = trimmed_count()
+            summary = compute()
+            if store and summary and not isinstance(summary, FallbackSummary) and _complete(trimmed_before):
+                store.put_summary(kind, digest, summary)
+        return summary
+
+    return cached_artifact(kind, digest, load_or_compute)
+
+
+async def apage_summary(kind: str, content: Any, compute: Callable[[], Awaitable[str]]) -> str:
+    """Async-Variante von page_summary (compute liefert eine Coroutine)."""
+    digest = content_hash(content)
+
+    async def load_or_compute() -> str:
+        store = get_fingerprint_store()
+        summary = await asyncio.to_thread(store.get_summary, kind, digest) if store else None
+        if summary is None:
+            trimmed_before = trimmed_count()
+            summary = await compute()
+            if store and summary and not isinstance(summary, FallbackSummary) and _complete(trimmed_before):
+                await asyncio.to_thread(store.put_summary, kind, digest, summary)
+        return summary
+
+    return await acached_artifact(kind, digest, load_or_compute)
+
+
+def cached_page_summary(kind: str):
+    """Decorator für Zusammenfassungs-Funktionen mit dem Seiteninhalt als einzigem Argument."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(text: str) -> str:
+            return page_summary(kind, text, lambda: fn(text))
+        return wrapper
+    return decorator
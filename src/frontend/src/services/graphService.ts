@@ -4,6 +4,7 @@ import { Lead } from '../types/lead';
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
 export interface GraphInput {
+  id?: number; // Gespeicherte Lead-ID (Checkpoint-Thread im Backend)
   company_name: string;
   lead: string;
   location: string;
@@ -16,9 +17,13 @@ export interface GraphResult {
   success: boolean;
   reports: Report[];
   extracted_data?: {
-    employee_count?: number;
-    revenue?: number;
-    linkedin?: string;
+    employee_count?: number | null;
+    revenue?: number | null;
+    linkedin?: string | null;
+    industry?: string | null;
+    materials?: string | null;
+    company_type?: string | null;
+    confidence?: Record<string, number>;
   };
   error?: string;
 }
@@ -65,7 +70,8 @@ function convertLeadToGraphState(input: GraphInput): GraphState {
   const leadAddress = `${input.postal_code} ${input.location}`;
   
   const leadData: LeadData = {
-    id: `LEAD-${Date.now()}`, // Temporäre ID generieren
+    // Wie lead_to_graph_state im Backend: gleiche Lead-ID -> abgebrochene Läufe werden fortgesetzt
+    id: input.id ? `LEAD-${String(input.id).padStart(3, '0')}` : `LEAD-${Date.now()}`,
     name: input.lead,
     address: leadAddress,
     email: input.email,
@@ -125,6 +131,7 @@ export async function startGraphAnalysis(input: GraphInput): Promise<GraphResult
     return {
       success: true,
       reports: result.reports || [],
+      extracted_data: result.extracted_data,
     };
     
   } catch (error) {
@@ -137,6 +144,79 @@ export async function startGraphAnalysis(input: GraphInput): Promise<GraphResult
   }
 }
 
+/**
+ * Startet den Graph-Workflow und liefert die Reports jedes Knotens per Server-Sent Events,
+ * sobald der Knoten fertig ist (onNode). Das Endergebnis entspricht startGraphAnalysis.
+ */
+export async function streamGraphAnalysis(
+  input: GraphInput,
+  onNode: (node: string, reports: Report[]) => void
+): Promise<GraphResult> {
+  try {
+    const graphState = convertLeadToGraphState(input);
+
+    const response = await fetch(`${API_BASE_URL}/api/run-workflow/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'Accept': 'text/event-stream',
+      },
+      body: JSON.stringify(graphState)
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events sind durch eine Leerzeile getrennt
+      let boundary: number;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let event = 'message';
+        let data = '';
+        for (const line of rawEvent.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        const payload = data ? JSON.parse(data) : {};
+
+        if (event === 'node') {
+          onNode(payload.node, payload.reports || []);
+        } else if (event === 'completed') {
+          return {
+            success: true,
+            reports: payload.reports || [],
+            extracted_data: payload.extracted_data,
+          };
+        } else if (event === 'error') {
+          throw new Error(payload.error || 'Workflow fehlgeschlagen');
+        }
+      }
+    }
+
+    throw new Error('Stream wurde ohne Ergebnis beendet');
+
+  } catch (error) {
+    console.error('Error in graph analysis stream:', error);
+    return {
+      success: false,
+      reports: [],
+      error: error instanceof Error ? error.message : 'Unknown error'
+    };
+  }
+}
+
 /**
  * Prüft, ob alle erforderlichen Daten für den Graph vorhanden sind
  */
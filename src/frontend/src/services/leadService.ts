@@ -30,3 +30,40 @@ export async function createLead(lead: Partial<Lead>): Promise<Lead> {
   if (!res.ok) throw new Error('Failed to create lead');
   return res.json();
 }
+
+export interface LeadQuery {
+  status?: string[];
+  min_score?: number;
+  max_score?: number;
+  industry?: string;
+  city?: string;
+  created_from?: string;
+  created_to?: string;
+  sort?: string; // z.B. '-score'
+  limit?: number;
+  cursor?: string;
+  fields?: (keyof Lead)[];
+}
+
+export interface LeadPage {
+  leads: Partial<Lead>[];
+  nextCursor: string | null;
+}
+
+/**
+ * Lädt eine Seite gefilterter/sortierter Leads vom Server (Cursor-Pagination)
+ */
+export async function fetchLeadsPage(q: LeadQuery = {}): Promise<LeadPage> {
+  const params = new URLSearchParams();
+  for (const s of q.status || []) params.append('status', s);
+  for (const key of ['min_score', 'max_score', 'industry', 'city', 'created_from', 'created_to', 'sort', 'cursor'] as const) {
+    const value = q[key];
+    if (value !== undefined && value !== null && value !== '') params.set(key, String(value));
+  }
+  params.set('limit', String(q.limit ?? 50));
+  if (q.fields?.length) params.set('fields', q.fields.join(','));
+
+  const res = await fetch(`${API_BASE}/leads?${params.toString()}`);
+  if (!res.ok) throw new Error('Failed to fetch leads');
+  return { leads: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') };
+}
@@ -1,22 +1,158 @@
-from typing import Callable, Dict, Any
+import asyncio
+import functools
+import os
+import time
+import uuid
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple, Union
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
-from .state import GraphState, LeadData, CompanyData
-from .nodes import OutReachAutomationNodes
+from .state import GraphState, LeadData, CompanyData, Report
+from .nodes import OutReachAutomationNodes, _regex_extract_plz
+from .result_cache import ResultCache, PIPELINE_VERSION
+from .artifacts import artifact_run
+from .checkpoints import CheckpointStore
+from .batch import BATCH_MAX_CONCURRENCY
+from .llm_batch import PendingBatchResult, get_batch_processor, get_batch_store, llm_batch_mode
+from .deadline import DeadlineExceeded, current_deadline, deadline_expired, deadline_scope, note_trimmed, resolve_deadline
+
+# Alle verfügbaren Recherche-Säulen (Reihenfolge = Reihenfolge im sequenziellen Modus)
+PILLARS = {
+    "unternehmensinformationen": OutReachAutomationNodes.pillar_unternehmensinformationen,
+    "unternehmensinformationen_s_m": OutReachAutomationNodes.pillar_unternehmensinformationen_services_materials,
+    "finanzen": OutReachAutomationNodes.pillar_finanzen,
+    "linkedin": OutReachAutomationNodes.pillar_linkedin,
+    "news": OutReachAutomationNodes.pillar_news,
+}
+# Async-Varianten (ainvoke + async HTTP), genutzt von arun_workflow / astream
+ASYNC_PILLARS = {
+    "unternehmensinformationen": OutReachAutomationNodes.apillar_unternehmensinformationen,
+    "unternehmensinformationen_s_m": OutReachAutomationNodes.apillar_unternehmensinformationen_services_materials,
+    "finanzen": OutReachAutomationNodes.apillar_finanzen,
+    "linkedin": OutReachAutomationNodes.apillar_linkedin,
+    "news": OutReachAutomationNodes.apillar_news,
+}
+
+# Benötigte Eingaben je Säule: Firma = Firmenname + PLZ, Person = Lead-Name + PLZ
+PILLAR_INPUTS = {
+    "unternehmensinformationen": "company",
+    "unternehmensinformationen_s_m": "company",
+    "finanzen": "company",
+    "linkedin": "person",
+    "news": "company",
+}
+# Lead-Felder, die eine Säule liefert (siehe extraction.FIELDS). Sind alle bekannt, entfällt die Säule;
+# Säulen ohne Felder (News) laufen immer.
+PILLAR_FIELDS = {
+    "unternehmensinformationen": ("employee_count", "industry", "company_type"),
+    "unternehmensinformationen_s_m": ("employee_count", "industry", "company_type", "materials"),
+    "finanzen": ("revenue",),
+    "linkedin": ("linkedin",),
+    "news": (),
+}
+
+# parallel: alle Säulen starten gleichzeitig ab "start", "merge" wartet auf alle (Fan-out/Fan-in)
+# sequential: Säulen laufen nacheinander
+GRAPH_MODE = os.environ.get("GRAPH_MODE", "parallel")
+ENABLED_PILLARS = [
+    p.strip() for p in os.environ.get("ENABLED_PILLARS", "unternehmensinformationen,unternehmensinformationen_s_m").split(",")
+    if p.strip()
+]
+# Offline-Batch-Modus: Wartezeit zwischen zwei Abgleichen und Höchstzahl der Runden (LLM-Schritte je Lead;
+# 0 = bis keine neuen Requests mehr anfallen)
+OFFLINE_BATCH_POLL_SECONDS = float(os.environ.get("OFFLINE_BATCH_POLL_SECONDS", "60"))
+OFFLINE_BATCH_MAX_ROUNDS = int(os.environ.get("OFFLINE_BATCH_MAX_ROUNDS", "0"))
+# Checkpoints je Lead-ID, damit fehlgeschlagene Läufe beim nächsten Versuch fortgesetzt werden (0 = aus)
+CHECKPOINTS_ENABLED = os.environ.get("CHECKPOINTS_ENABLED", "1") != "0"
+
+
+def _deadline_node(name: str, fn):
+    """Säule mit der Deadline des aktuellen Laufs (ContextVar) ausführen. Läuft sie in das Zeitbudget,
+    liefert sie kein Ergebnis statt den ganzen Lauf scheitern zu lassen (Best-Effort). Die Deadline im
+    GraphState wird bewusst nicht gelesen: beim Fortsetzen eines Checkpoints stammt sie aus dem
+    abgebrochenen Lauf und ist meist schon abgelaufen."""
+    @functools.wraps(fn)
+    def node(state: GraphState):
+        with deadline_scope(current_deadline()):
+            try:
+                return fn(state)
+            except Exception as e:
+                if not (isinstance(e, DeadlineExceeded) or deadline_expired()):
+                    raise
+                note_trimmed(f"Säule {name} ohne Ergebnis")
+                return {}
+    return node
+
+
+def _adeadline_node(name: str, afn):
+    @functools.wraps(afn)
+    async def anode(state: GraphState):
+        with deadline_scope(current_deadline()):
+            try:
+                return await afn(state)
+            except Exception as e:
+                if not (isinstance(e, DeadlineExceeded) or deadline_expired()):
+                    raise
+                note_trimmed(f"Säule {name} ohne Ergebnis")
+                return {}
+    return anode
+
+
+def _missing_input(pillar: str, state: GraphState) -> Optional[str]:
+    lead = state.get("current_lead")
+    company = state.get("company_data")
+    if not _regex_extract_plz(lead.address if lead else ""):
+        return "Postleitzahl fehlt"
+    if PILLAR_INPUTS[pillar] == "person":
+        return None if lead and lead.name else "Lead-Name fehlt"
+    return None if company and company.name else "Firmenname fehlt"
+
+
+def plan_pillars(pillars: List[str], state: GraphState) -> Tuple[List[str], Dict[str, str]]:
+    """Wählt die Säulen, die für diesen Lead laufen müssen. Liefert (Säulen, {übersprungene Säule: Grund}):
+    Säulen ohne ihre Eingaben werden übersprungen statt den Lauf abzubrechen, ebenso Säulen, deren
+    Felder der Lead schon hat (keine bezahlten Such-/LLM-Aufrufe für bekannte Daten)."""
+    known = set(state.get("known_fields") or [])
+    selected, skipped = [], {}
+    for name in pillars:
+        missing = _missing_input(name, state)
+        if missing:
+            skipped[name] = missing
+        elif PILLAR_FIELDS[name] and known.issuperset(PILLAR_FIELDS[name]):
+            skipped[name] = f"bekannt: {', '.join(PILLAR_FIELDS[name])}"
+        else:
+            selected.append(name)
+    return selected, skipped
+
+
+def node_start(state: GraphState) -> Dict[str, Any]:
+    """Gemeinsamer Startpunkt, von dem aus die Säulen verzweigen"""
+    return {}
+
 
 def node_merge_reports(state: GraphState) -> Dict[str, Any]:
-    """Führt die Ergebnisse der vorigen Knoten deterministisch zusammen"""
-    reports = state.get("reports", [])
-    return {
-        "reports": reports,  # Reports wurden bereits akkumuliert
-        "workflow_completed": True
-    }
+    """Join-Knoten: läuft erst, wenn alle Säulen fertig sind. Die Reports wurden bereits über den
+    Reducer des States akkumuliert und werden hier nicht erneut ausgegeben."""
+    return {"workflow_completed": True}
 
 class OutReachAutomation:
-    def __init__(self):
+    def __init__(self, result_cache: Optional[ResultCache] = None, mode: str = GRAPH_MODE,
+                 pillars: Optional[List[str]] = None, checkpoints: Optional[CheckpointStore] = None):
+        self.mode = mode
+        self.pillars = list(pillars or ENABLED_PILLARS)
+        unknown = [p for p in self.pillars if p not in PILLARS]
+        if unknown or not self.pillars:
+            raise ValueError(f"Unbekannte oder keine Säulen konfiguriert: {unknown or self.pillars}")
+        if self.mode not in ("parallel", "sequential"):
+            raise ValueError(f"Unbekannter GRAPH_MODE: {self.mode}")
+
+        self.checkpoints = checkpoints if checkpoints is not None else (CheckpointStore() if CHECKPOINTS_ENABLED else None)
         # Initialize the automation workflow by building the graph
         self.app = self.build_graph()
+        # Andere Säulen liefern andere Reports -> eigener Cache-Bereich je Säulen-Auswahl
+        self.result_cache = result_cache if result_cache is not None else ResultCache(
+            pipeline_version=f"{PIPELINE_VERSION}-{'.'.join(sorted(self.pillars))}"
+        )
 
     def build_graph(self):
         """
@@ -25,45 +161,291 @@ class OutReachAutomation:
         # StateGraph erstellen
         graph = StateGraph(GraphState)
 
-        # Knoten registrieren - direkt die statischen Methoden verwenden
-        graph.add_node("unternehmensinformationen", OutReachAutomationNodes.pillar_unternehmensinformationen)
-        graph.add_node("finanzen", OutReachAutomationNodes.pillar_finanzen)
-        graph.add_node("linkedin", OutReachAutomationNodes.pillar_linkedin)
-        graph.add_node("news", OutReachAutomationNodes.pillar_news)
+        # Knoten registrieren (nur aktivierte Säulen): stream() nutzt die synchrone,
+        # astream() die async Variante derselben Säule
+        for name in self.pillars:
+            graph.add_node(name, RunnableLambda(
+                _deadline_node(name, PILLARS[name]), afunc=_adeadline_node(name, ASYNC_PILLARS[name]), name=name
+            ))
         graph.add_node("merge", node_merge_reports)
-        graph.add_node("unternehmensinformationen_s_m", OutReachAutomationNodes.pillar_unternehmensinformationen_services_materials)
-        
-        # Einstiegspunkt setzen
-        graph.set_entry_point("unternehmensinformationen")
-
-        # Deterministische Kanten
-        # Unternehmensinformationen -> Finanzen -> LinkedIn -> News -> Merge -> END
-        graph.add_edge("unternehmensinformationen", "unternehmensinformationen_s_m")
-        graph.add_edge("unternehmensinformationen_s_m", "merge")
-        # graph.add_edge("linkedin", "news")
-        # graph.add_edge("news", "merge")
+
+        # Router wählen je Lead nur die benötigten Säulen (siehe plan_pillars); ohne Säule direkt zu merge
+        targets = self.pillars + ["merge"]
+        if self.mode == "parallel":
+            # start -> benötigte Säulen gleichzeitig -> merge (nach dem Schritt aller Säulen) -> END
+            graph.add_node("start", node_start)
+            graph.set_entry_point("start")
+            graph.add_conditional_edges("start", self.route_pillars, targets)
+            for name in self.pillars:
+                graph.add_edge(name, "merge")
+        else:
+            # Säule 1 -> Säule 2 -> ... -> merge -> END, übersprungene Säulen fallen heraus
+            graph.set_conditional_entry_point(self.route_first_pillar, targets)
+            for name in self.pillars:
+                graph.add_conditional_edges(name, functools.partial(self.route_next_pillar, name), targets)
         graph.add_edge("merge", END)
 
-        # App kompilieren (ohne Checkpointer für deterministischen Workflow)
-        return graph.compile()
+        # App kompilieren (mit SQLite-Checkpointer, falls aktiviert)
+        return graph.compile(checkpointer=self.checkpoints.saver if self.checkpoints else None)
+
+    def route_pillars(self, state: GraphState) -> List[str]:
+        """Router (parallel): alle für diesen Lead benötigten Säulen, sonst direkt merge."""
+        selected, skipped = plan_pillars(self.pillars, state)
+        for name, reason in skipped.items():
+            print(f"⏭️ Säule {name} übersprungen ({reason})")
+        return selected or ["merge"]
 
-    def run_workflow(self, initial_state: GraphState) -> GraphState:
+    def route_first_pillar(self, state: GraphState) -> str:
+        """Router (sequenziell) am Einstieg: erste benötigte Säule."""
+        return self.route_pillars(state)[0]
+
+    def route_next_pillar(self, previous: str, state: GraphState) -> str:
+        """Router (sequenziell) nach einer Säule: nächste benötigte Säule, sonst merge."""
+        selected, _ = plan_pillars(self.pillars, state)
+        position = self.pillars.index(previous)
+        return next((name for name in selected if self.pillars.index(name) > position), "merge")
+
+    def cache_identity(self, state: GraphState) -> Tuple[str, str, str]:
+        """(Firmenname, PLZ, Person) für den Result-Cache. Die Person (Lead-Name) gehört nur dazu, wenn eine
+        personenbezogene Säule (LinkedIn) aktiv ist - sonst teilen sich alle Leads einer Firma das Ergebnis."""
+        company = state.get("company_data")
+        lead = state.get("current_lead")
+        person_pillars = any(PILLAR_INPUTS[name] == "person" for name in self.pillars)
+        person = lead.name if person_pillars and lead else ""
+        return (company.name if company else ""), _regex_extract_plz(lead.address if lead else ""), person
+
+    def run_workflow(self, initial_state: GraphState, on_node: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                     thread_id: Optional[str] = None, deadline_seconds: Optional[float] = None) -> GraphState:
         """
         Führt den LangGraph-Workflow deterministisch aus und gibt den finalen State zurück.
+        Optional wird on_node(node_name, update) nach jedem abgeschlossenen Knoten aufgerufen
+        (z.B. für Teilergebnisse in Job-Status oder Streams).
+        Ergebnisse werden je Firmenname + PLZ (mit LinkedIn-Säule zusätzlich je Person) gecacht (siehe result_cache.py). Innerhalb eines Laufs
+        teilen sich alle Säulen und Tools abgerufene Suchen/Seiten (siehe artifacts.py).
+        Mit Checkpoints (thread_id, Standard: Lead-ID) setzt ein erneuter Lauf nach einem Fehler
+        beim letzten erfolgreichen Knoten fort. Läuft dieselbe Lead-ID bereits (Lease, siehe checkpoints.py),
+        startet der Lauf neu in einem eigenen Versuchs-Thread, ohne den laufenden zu stören.
+        Mit Zeitbudget (deadline_seconds bzw. RUN_DEADLINE_SECONDS) kürzen die Tools ihre Arbeit, sodass
+        der Lauf rechtzeitig einen Best-Effort-Report liefert (siehe deadline.py).
+        """
+        company_name, plz, person = self.cache_identity(initial_state)
+        cached = self._cached_result(company_name, plz, person, on_node)
+        if cached is not None:
+            return cached
+
+        initial_state = self._with_deadline(initial_state, deadline_seconds)
+        with artifact_run(company_name) as artifacts, deadline_scope(initial_state.get("deadline")) as trimmed:
+            final_state = self._run_graph(initial_state, on_node, thread_id or self.thread_id(initial_state))
+        final_state["trimmed"] = list(trimmed)
+        return self._store_result(initial_state, final_state, company_name, plz, person, artifacts)
+
+    async def arun_workflow(self, initial_state: GraphState,
+                            on_node: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                            thread_id: Optional[str] = None, deadline_seconds: Optional[float] = None) -> GraphState:
+        """
+        Async-Variante von run_workflow für den Event-Loop (z.B. direkt aus FastAPI awaiten).
+        Die Säulen laufen als Coroutinen (ainvoke, async HTTP) statt in Threads; Cache- und
+        Checkpoint-Zugriffe (SQLite) werden in Worker-Threads ausgelagert.
+        """
+        company_name, plz, person = self.cache_identity(initial_state)
+        cached = await asyncio.to_thread(self._cached_result, company_name, plz, person, on_node)
+        if cached is not None:
+            return cached
+
+        initial_state = self._with_deadline(initial_state, deadline_seconds)
+        with artifact_run(company_name) as artifacts, deadline_scope(initial_state.get("deadline")) as trimmed:
+            final_state = await self._arun_graph(initial_state, on_node, thread_id or self.thread_id(initial_state))
+        final_state["trimmed"] = list(trimmed)
+        return await asyncio.to_thread(self._store_result, initial_state, final_state, company_name, plz, person,
+                                       artifacts)
+
+    def run_batch(self, states: Sequence[GraphState], max_concurrency: int = BATCH_MAX_CONCURRENCY,
+                  deadline_seconds: Optional[float] = None) -> List[Union[GraphState, Exception]]:
+        """
+        Führt run_workflow für mehrere States aus (Runnable.batch, höchstens max_concurrency gleichzeitig).
+        Ergebnisse kommen in Eingabereihenfolge; ein fehlgeschlagener Lead liefert seine Exception
+        statt eines States, ohne die übrigen abzubrechen. Artefakt-Speicher, Result-Cache, Checkpoints und
+        Zeitbudget gelten je Lead (der Speicher wird nach jedem Lead freigegeben, unter einer Deadline
+        gekürzte Artefakte erreichen keine anderen Leads); gemeinsam sind nur die Connection-Pools.
         """
-        # LangGraph akkumuliert bereits automatisch die Reports (wegen Annotated[list[Report], add])
-        # Wir brauchen nur das fin^ ale Ergebnis
-        final_state = None
-        for event in self.app.stream(initial_state):
-            # Das letzte Event enthält den finalen State
-            final_state = event
-            
-        # Das letzte Event sollte vom "merge"-Knoten kommen
-        if final_state and "merge" in final_state:
-            return final_state["merge"]
-        
-        # Fallback: letzten verfügbaren State zurückgeben
-        return final_state.get(list(final_state.keys())[-1], initial_state) if final_state else initial_state
+        runner = RunnableLambda(lambda state: self.run_workflow(state, deadline_seconds=deadline_seconds),
+                                name="run_workflow")
+        results = runner.batch(list(states), config={"max_concurrency": max(1, max_concurrency)},
+                               return_exceptions=True)
+        failed = sum(isinstance(r, Exception) for r in results)
+        print(f"📦 Batch abgeschlossen: {len(results) - failed} erfolgreich, {failed} fehlgeschlagen")
+        return results
+
+    def run_offline_batch(self, states: Sequence[GraphState], processor=None, poll_seconds: float = OFFLINE_BATCH_POLL_SECONDS,
+                          max_rounds: int = OFFLINE_BATCH_MAX_ROUNDS,
+                          max_concurrency: int = BATCH_MAX_CONCURRENCY) -> List[Union[GraphState, Exception]]:
+        """
+        Führt run_batch im Offline-Batch-Modus aus (siehe llm_batch.py): Jede Runde sammelt die
+        LLM-Requests aller offenen Leads, reicht sie als ein Batch ein und wartet auf den Abgleich. Leads,
+        deren Lauf auf Antworten wartet (PendingBatchResult), setzen in der nächsten Runde per Checkpoint
+        fort. Jede Runde bringt einen Lead nur einen LLM-Schritt je Säule weiter, daher laufen die Runden,
+        bis keine neuen Requests mehr anfallen (max_rounds > 0 begrenzt zusätzlich). Ergebnisse in
+        Eingabereihenfolge; danach noch wartende Leads liefern PendingBatchResult.
+        Nur dieser Einstieg nutzt den Batch-Modus - Echtzeit-Endpunkte des API-Servers bleiben unberührt.
+        """
+        processor = processor or get_batch_processor()
+        store = get_batch_store()
+        results: List[Union[GraphState, Exception]] = list(states)
+        open_indices = list(range(len(states)))
+        round_no = 0
+        while open_indices:
+            round_no += 1
+            with llm_batch_mode():
+                round_results = self.run_batch([states[i] for i in open_indices], max_concurrency=max_concurrency)
+            for i, result in zip(open_indices, round_results):
+                results[i] = result
+            open_indices = [i for i, result in zip(open_indices, round_results) if isinstance(result, PendingBatchResult)]
+            if not open_indices:
+                break
+            print(f"🌙 Offline-Batch Runde {round_no}: {len(open_indices)} Leads warten auf LLM-Antworten")
+            if store.submit_pending(processor) is None:
+                # Keine neuen Requests: weitere Runden brächten die offenen Leads nicht weiter
+                print(f"⚠️ Offline-Batch: keine neuen LLM-Requests, {len(open_indices)} Leads bleiben offen")
+                break
+            if max_rounds and round_no >= max_rounds:
+                break
+            # Warten, bis alle eingereichten Batches abgeglichen sind
+            while store.reconcile(processor)["open_batches"]:
+                time.sleep(poll_seconds)
+        return results
+
+    @staticmethod
+    def _with_deadline(initial_state: GraphState, deadline_seconds: Optional[float]) -> GraphState:
+        # Deadline wird je Lauf erzeugt; eine bereits im State gesetzte hat Vorrang
+        if initial_state.get("deadline") is not None:
+            return initial_state
+        deadline = resolve_deadline(deadline_seconds)
+        return {**initial_state, "deadline": deadline} if deadline else initial_state
+
+    def _cached_result(self, company_name: str, plz: str, person: str, on_node) -> Optional[GraphState]:
+        cached = self.result_cache.get(company_name, plz, person)
+        if cached is None:
+            return None
+        print(f"⚡ Cache-Treffer für {company_name} ({plz})")
+        reports = [Report(**r) for r in cached]
+        final = {"reports": reports, "workflow_completed": True, "cache_hit": True}
+        if on_node:
+            on_node("result_cache", {"reports": reports})
+            on_node("merge", final)
+        return final
+
+    def _store_result(self, initial_state: GraphState, final_state: GraphState, company_name: str, plz: str,
+                      person: str, artifacts) -> GraphState:
+        final_state["artifact_stats"] = artifacts.stats()
+        reports = final_state.get("reports", [])
+        _, final_state["skipped_pillars"] = plan_pillars(self.pillars, initial_state)
+        # Unter Zeitdruck gekürzte Ergebnisse nicht cachen, der nächste Lauf recherchiert vollständig
+        if final_state.get("trimmed"):
+            print(f"⏱️ Best-Effort-Ergebnis ({len(final_state['trimmed'])} Schritte ausgelassen) - wird nicht gecacht")
+        elif final_state["skipped_pillars"]:
+            # Ohne übersprungene Säulen unvollständig für andere Leads derselben Firma
+            print(f"⏭️ {len(final_state['skipped_pillars'])} Säule(n) übersprungen - Ergebnis wird nicht gecacht")
+        elif reports:
+            self.result_cache.put(company_name, plz, [r.model_dump() for r in reports], person)
+        return final_state
+
+    @staticmethod
+    def thread_id(state: GraphState) -> Optional[str]:
+        lead = state.get("current_lead")
+        return lead.id if lead and lead.id else None
+
+    def _run_graph(self, initial_state: GraphState, on_node, thread_id: Optional[str] = None) -> GraphState:
+        run = _GraphRun(self, initial_state, on_node, thread_id)
+        try:
+            for event in self.app.stream(run.graph_input, run.config):
+                run.collect(event)
+            return run.finish()
+        finally:
+            run.close()
+
+    async def _arun_graph(self, initial_state: GraphState, on_node, thread_id: Optional[str] = None) -> GraphState:
+        run = await asyncio.to_thread(_GraphRun, self, initial_state, on_node, thread_id)
+        try:
+            async for event in self.app.astream(run.graph_input, run.config):
+                run.collect(event)
+            return await asyncio.to_thread(run.finish)
+        finally:
+            await asyncio.to_thread(run.close)
+
+
+class _GraphRun:
+    """Ein Graph-Lauf: Checkpoint-Fortsetzung vorbereiten, Stream-Events einsammeln, abschließen.
+    Gemeinsam für stream() und astream()."""
+
+    def __init__(self, automation: OutReachAutomation, initial_state: GraphState, on_node, thread_id: Optional[str]):
+        # Die Reports kommen als Updates der einzelnen Säulen (im Parallel-Modus in beliebiger
+        # Reihenfolge); "merge" gibt keine Reports mehr aus, daher werden sie hier eingesammelt
+        # und in die feste Säulen-Reihenfolge gebracht.
+        self.automation = automation
+        self.on_node = on_node
+        self.thread_id = thread_id
+        self.owner = uuid.uuid4().hex
+        self.leased = False
+        self.by_node: Dict[str, List[Report]] = {}
+        self.completed = False
+        self.graph_input, self.config = initial_state, None
+        self.reports = list(initial_state.get("reports") or [])
+
+        checkpoints = automation.checkpoints
+        if checkpoints and thread_id:
+            checkpoints.prune()
+            self.leased = checkpoints.acquire(thread_id, self.owner)
+            if not self.leased:
+                # Derselbe Lead läuft gerade (anderer Job/Worker): dessen Checkpoint weder fortsetzen noch
+                # löschen, sondern in einem eigenen Versuchs-Thread von vorn beginnen
+                print(f"🔒 Lauf {thread_id} ist bereits aktiv - starte separaten Versuch")
+                self.thread_id = thread_id = f"{thread_id}#{self.owner[:8]}"
+            self.config = {"configurable": {"thread_id": thread_id}}
+            snapshot = automation.app.get_state(self.config)
+            if snapshot.next:
+                # Abgebrochener Lauf: ohne Input fortsetzen, Reports fertiger Knoten stehen im Checkpoint
+                print(f"♻️ Setze Lauf {thread_id} fort bei: {', '.join(snapshot.next)}")
+                self.graph_input = None
+                self.reports = list(snapshot.values.get("reports") or [])
+            elif snapshot.values:
+                # Alter, abgeschlossener Lauf mit derselben ID -> neu beginnen
+                checkpoints.clear(thread_id)
+            checkpoints.touch(thread_id)
+
+    def collect(self, event: Dict[str, Any]) -> None:
+        # Beim Fortsetzen werden bereits gespeicherte Ergebnisse erneut gemeldet (cached) -
+        # deren Reports sind schon im Checkpoint enthalten
+        cached = (event.get("__metadata__") or {}).get("cached", False)
+        for node_name, update in event.items():
+            if node_name == "__metadata__":
+                continue
+            if self.leased:
+                self.automation.checkpoints.renew(self.thread_id, self.owner)
+            update = update or {}
+            if self.on_node:
+                self.on_node(node_name, update)
+            if not cached:
+                self.by_node.setdefault(node_name, []).extend(update.get("reports") or [])
+            # "merge" läuft erst, wenn alle Säulen fertig sind
+            self.completed = self.completed or node_name == "merge"
+
+    def finish(self) -> GraphState:
+        pillars = self.automation.pillars
+        for node_name in pillars + [n for n in self.by_node if n not in pillars]:
+            self.reports.extend(self.by_node.get(node_name, []))
+        if self.completed and self.config:
+            self.automation.checkpoints.clear(self.thread_id)
+        return {"reports": self.reports, "workflow_completed": self.completed}
+
+    def close(self) -> None:
+        """Gibt das Lease frei (auch nach Fehlern). Versuchs-Threads werden nie fortgesetzt und daher gelöscht."""
+        if not self.config:
+            return
+        checkpoints = self.automation.checkpoints
+        if self.leased:
+            checkpoints.release(self.thread_id, self.owner)
+        elif not self.completed:
+            checkpoints.clear(self.thread_id)
 
 
 # # Mock-Datensatz für Tests
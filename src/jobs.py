@@ -0,0 +1,145 @@
+"""
+Job-Verwaltung für Graph-Workflows.
+Workflows laufen auf einem begrenzten Thread-Pool, damit der Event-Loop von FastAPI nie blockiert.
+Der Job-Status (inkl. Teil-Reports je abgeschlossenem Knoten) liegt im gemeinsamen Zustand (shared_state)
+und kann daher von jedem Server-Prozess abgefragt werden.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .shared_state import SharedState, get_shared_state
+from .state import GraphState
+
+WORKFLOW_MAX_WORKERS = int(os.environ.get("WORKFLOW_MAX_WORKERS", "4"))
+# Abgeschlossene Jobs werden nach dieser Zeit verworfen
+JOB_TTL_SECONDS = int(os.environ.get("JOB_TTL_SECONDS", "3600"))
+
+
+class WorkflowJob(BaseModel):
+    """Status eines asynchron ausgeführten Graph-Workflows"""
+    id: str
+    status: str = "queued"  # queued | running | completed | failed
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    current_node: Optional[str] = None
+    completed_nodes: List[str] = []
+    reports: List[Dict[str, Any]] = []
+    extracted_data: Optional[Dict[str, Any]] = None
+    trimmed: List[str] = []  # wegen des Zeitbudgets ausgelassene Schritte
+    error: Optional[str] = None
+
+
+def serialize_report(report: Any) -> Dict[str, Any]:
+    """Konvertiert einen Report (Pydantic, dict oder beliebiges Objekt) in ein JSON-fähiges dict."""
+    if hasattr(report, 'model_dump'):  # Pydantic model
+        return report.model_dump()
+    if hasattr(report, 'dict'):  # Pydantic model (old version)
+        return report.dict()
+    if isinstance(report, dict):  # Already a dict
+        return report
+    # Fallback for other types
+    return {
+        "title": str(getattr(report, 'title', 'Unnamed Report')),
+        "content": str(getattr(report, 'content', 'No content')),
+        "is_markdown": bool(getattr(report, 'is_markdown', False))
+    }
+
+
+class JobManager:
+    """Führt Workflows auf einem begrenzten Executor aus und hält den Job-Status im Speicher."""
+
+    def __init__(self, automation, max_workers: int = WORKFLOW_MAX_WORKERS, shared_state: Optional[SharedState] = None):
+        self.automation = automation
+        self.shared_state = shared_state or get_shared_state()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow")
+        self._jobs: Dict[str, WorkflowJob] = {}
+        self._futures: Dict[str, Future] = {}
+        self._finished_ts: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        graph_state: GraphState,
+        postprocess: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Any]]] = None,
+        listener: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ) -> WorkflowJob:
+        """Reiht einen Workflow ein und gibt sofort den Job (Status 'queued') zurück.
+        listener(node_name, update) wird nach jedem abgeschlossenen Knoten aufgerufen."""
+        self._prune()
+        job = WorkflowJob(id=uuid.uuid4().hex, created_at=datetime.now().isoformat())
+        self._save(job)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._futures[job.id] = self.executor.submit(self._run, job.id, graph_state, postprocess, listener)
+        return job.model_copy(deep=True)
+
+    def get(self, job_id: str) -> Optional[WorkflowJob]:
+        data = self.shared_state.get("jobs", job_id)
+        return WorkflowJob(**data) if data else None
+
+    def _save(self, job: WorkflowJob) -> None:
+        with self._lock:
+            data = job.model_dump()
+        self.shared_state.set("jobs", job.id, data, ttl_seconds=JOB_TTL_SECONDS)
+
+    def future(self, job_id: str) -> Optional[Future]:
+        with self._lock:
+            return self._futures.get(job_id)
+
+    def _run(self, job_id: str, graph_state: GraphState, postprocess, listener) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job.status = "running"
+            job.started_at = datetime.now().isoformat()
+        self._save(job)
+
+        def on_node(node_name: str, update: Dict[str, Any]) -> None:
+            with self._lock:
+                job.current_node = node_name
+                job.completed_nodes.append(node_name)
+                # Der Merge-Knoten liefert alle Reports erneut - Teilergebnisse nur aus den Säulen
+                if node_name != "merge":
+                    job.reports.extend(serialize_report(r) for r in update.get("reports", []))
+            self._save(job)
+            if listener:
+                listener(node_name, update)
+
+        try:
+            final_state = self.automation.run_workflow(graph_state, on_node=on_node)
+            reports = [serialize_report(r) for r in final_state.get("reports", [])]
+            extracted_data = postprocess(reports) if postprocess else None
+            with self._lock:
+                job.reports = reports
+                job.extracted_data = extracted_data
+                job.trimmed = final_state.get("trimmed", [])
+                job.status = "completed"
+        except Exception as e:
+            print(f"❌ Job {job_id} fehlgeschlagen: {e}")
+            with self._lock:
+                job.status = "failed"
+                job.error = str(e)
+        finally:
+            with self._lock:
+                job.current_node = None
+                job.finished_at = datetime.now().isoformat()
+                self._finished_ts[job_id] = time.time()
+            self._save(job)
+
+    def _prune(self) -> None:
+        """Entfernt abgeschlossene Jobs, deren TTL abgelaufen ist, aus dem Prozessspeicher."""
+        cutoff = time.time() - JOB_TTL_SECONDS
+        with self._lock:
+            for job_id, ts in list(self._finished_ts.items()):
+                if ts < cutoff:
+                    self._jobs.pop(job_id, None)
+                    self._futures.pop(job_id, None)
+                    self._finished_ts.pop(job_id, None)
@@ -0,0 +1,208 @@
+"""
+Bulk-Import von Leads aus CSV- oder JSONL-Dateien.
+Die Datei wird zeilenweise gelesen und in Blöcken validiert, dedupliziert (Domain bzw. Firmenname + PLZ)
+und per Bulk-Insert gespeichert. Es liegt immer nur ein Block im Speicher; Duplikate innerhalb der Datei
+werden über die bereits gespeicherten Blöcke erkannt.
+"""
+
+import csv
+import io
+import json
+import re
+from typing import Any, BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+try:
+    from .lead_store import LeadStore, normalize_company_key, normalize_domain
+except ImportError:
+    from lead_store import LeadStore, normalize_company_key, normalize_domain
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_ERRORS = 200
+
+# Gängige Spaltenüberschriften (auch deutsch) -> Feldname im Lead-Modell
+COLUMN_ALIASES = {
+    "company": "company_name", "firma": "company_name", "unternehmen": "company_name", "firmenname": "company_name",
+    "ansprechpartner": "lead", "kontakt": "lead", "contact": "lead",
+    "plz": "postal_code", "postleitzahl": "postal_code", "zip": "postal_code", "zip_code": "postal_code",
+    "ort": "city", "stadt": "city",
+    "adresse": "location", "address": "location", "standort": "location",
+    "webseite": "website", "homepage": "website", "url": "website", "domain": "website",
+    "e-mail": "email", "mail": "email",
+    "telefon": "phone", "tel": "phone",
+    "land": "country",
+    "branche": "industry",
+    "materialien": "materials",
+    "unternehmensart": "company_type",
+    "mitarbeiter": "employee_count", "mitarbeiteranzahl": "employee_count", "employees": "employee_count",
+    "umsatz": "revenue",
+}
+
+
+class LeadImportRow(BaseModel):
+    """Eine Zeile der Importdatei (nur Stammdaten, Status/Score werden beim Import gesetzt)"""
+    company_name: str
+    lead: Optional[str] = None
+    location: Optional[str] = None
+    postal_code: Optional[str] = None
+    website: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    country: Optional[str] = "DE"
+    city: Optional[str] = None
+    industry: Optional[str] = None
+    materials: Optional[str] = None
+    company_type: Optional[str] = None
+    linkedin: Optional[str] = None
+    position: Optional[str] = None
+    employee_count: Optional[int] = None
+    revenue: Optional[int] = None
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _empty_to_none(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            value = value.strip()
+            return value or None
+        return value
+
+    @field_validator("postal_code", "phone", mode="before")
+    @classmethod
+    def _as_text(cls, value: Any) -> Any:
+        # PLZ/Telefon aus JSON können als Zahl kommen
+        return str(value) if isinstance(value, int) else value
+
+    @field_validator("employee_count", "revenue", mode="before")
+    @classmethod
+    def _parse_int(cls, value: Any) -> Any:
+        # "1.200" bzw. "1 200" als Tausendertrennzeichen zulassen; "1.5" bleibt und wird abgelehnt
+        if isinstance(value, str):
+            value = value.strip().replace(" ", "")
+            if re.fullmatch(r"\d{1,3}(?:\.\d{3})+", value):
+                value = value.replace(".", "")
+        return value
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    """Ergebnis eines Bulk-Imports"""
+    total_rows: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
+
+
+def _normalize_header(name: str) -> str:
+    key = (name or "").strip().lower()
+    return COLUMN_ALIASES.get(key, key.replace(" ", "_"))
+
+
+def _iter_csv(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    text.seek(0)
+    reader = csv.reader(text, dialect)
+    header = [_normalize_header(h) for h in next(reader, [])]
+    # Zeile 1 ist die Kopfzeile
+    for row_number, values in enumerate(reader, start=2):
+        if not any(v.strip() for v in values):
+            continue
+        yield row_number, dict(zip(header, values))
+
+
+def _iter_jsonl(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    for row_number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"Ungültiges JSON: {e.msg}")
+            continue
+        if not isinstance(data, dict):
+            yield row_number, ValueError("Zeile ist kein JSON-Objekt")
+            continue
+        yield row_number, {_normalize_header(k): v for k, v in data.items()}
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in (content_type or "") or "jsonl" in (content_type or ""):
+        return "jsonl"
+    return "csv"
+
+
+def import_leads(
+    stream: BinaryIO,
+    fmt: str,
+    store: LeadStore,
+    build_lead: Callable[[LeadImportRow], BaseModel],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    max_errors: int = IMPORT_MAX_ERRORS,
+) -> ImportResult:
+    """Liest die Datei als Stream und speichert neue Leads blockweise.
+    Zeilenfehler werden mit Zeilennummer gemeldet (höchstens max_errors Einträge)."""
+    rows = _iter_jsonl(stream) if fmt == "jsonl" else _iter_csv(stream)
+    result = ImportResult()
+
+    def add_error(row_number: int, message: str) -> None:
+        result.invalid += 1
+        if len(result.errors) < max_errors:
+            result.errors.append(ImportRowError(row=row_number, error=message))
+        else:
+            result.errors_truncated = True
+
+    batch: List[LeadImportRow] = []
+    for row_number, data in rows:
+        result.total_rows += 1
+        if isinstance(data, Exception):
+            add_error(row_number, str(data))
+            continue
+        try:
+            batch.append(LeadImportRow.model_validate(data))
+        except ValidationError as e:
+            add_error(row_number, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+        if len(batch) >= batch_size:
+            _flush(batch, store, build_lead, result)
+            batch = []
+    if batch:
+        _flush(batch, store, build_lead, result)
+
+    print(f"📥 Import abgeschlossen: {result.imported} neu, {result.duplicates} Duplikate, {result.invalid} fehlerhaft")
+    return result
+
+
+def _flush(batch: List[LeadImportRow], store: LeadStore, build_lead, result: ImportResult) -> None:
+    keys: List[Tuple[Optional[str], Optional[str]]] = [
+        (normalize_domain(row.website), normalize_company_key(row.company_name, row.postal_code)) for row in batch
+    ]
+    known_domains, known_companies = store.existing_keys(
+        {d for d, _ in keys if d}, {c for _, c in keys if c}
+    )
+
+    new_leads: List[BaseModel] = []
+    for row, (domain, company) in zip(batch, keys):
+        if (domain and domain in known_domains) or (company and company in known_companies):
+            result.duplicates += 1
+            continue
+        # Auch Duplikate innerhalb desselben Blocks erkennen
+        if domain:
+            known_domains.add(domain)
+        if company:
+            known_companies.add(company)
+        new_leads.append(build_lead(row))
+
+    if new_leads:
+        store.add_many(new_leads)
+        result.imported += len(new_leads)
@@ -0,0 +1,349 @@
+"""
+Persistenter Lead-Store auf Basis von SQLite.
+Ersetzt die In-Memory-Liste in main.py: Zugriffe per Primärschlüssel, Sekundärindizes für häufige Filter,
+Bulk-Inserts in einer Transaktion.
+"""
+
+import base64
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel
+
+from .db import SQLiteDatabase, data_path
+
+# Spalten in Reihenfolge des Frontend-Lead-Modells (ohne id)
+LEAD_COLUMNS = [
+    "company_name", "lead", "location", "postal_code", "website", "email", "phone",
+    "country", "city", "industry", "materials", "company_type", "linkedin", "position",
+    "employee_count", "revenue", "score", "status", "created_at", "updated_at", "score_breakdown",
+]
+
+# Felder, die als JSON serialisiert werden
+JSON_COLUMNS = {"score_breakdown"}
+
+# Abgeleitete Schlüssel für die Duplikaterkennung (werden beim Schreiben berechnet)
+KEY_COLUMNS = ["domain_key", "company_key"]
+
+# Rechtsformen und Füllwörter, die beim Namensvergleich ignoriert werden
+_LEGAL_FORMS = re.compile(
+    r"\b(?:gmbh|mbh|ag|kg|kgaa|ohg|gbr|ug|se|e\.?\s?k|e\.?\s?v|co|inc|ltd|llc|haftungsbeschränkt)\b"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_name TEXT,
+    lead TEXT,
+    location TEXT,
+    postal_code TEXT,
+    website TEXT,
+    email TEXT,
+    phone TEXT,
+    country TEXT,
+    city TEXT,
+    industry TEXT,
+    materials TEXT,
+    company_type TEXT,
+    linkedin TEXT,
+    position TEXT,
+    employee_count INTEGER,
+    revenue INTEGER,
+    score INTEGER,
+    status TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    score_breakdown TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status);
+CREATE INDEX IF NOT EXISTS idx_leads_company_name ON leads(company_name);
+CREATE INDEX IF NOT EXISTS idx_leads_postal_code ON leads(postal_code);
+-- Filter und Sortierung für GET /leads (rowid = id ist in jedem Index enthalten -> Keyset-Pagination)
+CREATE INDEX IF NOT EXISTS idx_leads_score ON leads(score);
+CREATE INDEX IF NOT EXISTS idx_leads_created_at ON leads(created_at);
+CREATE INDEX IF NOT EXISTS idx_leads_updated_at ON leads(updated_at);
+CREATE INDEX IF NOT EXISTS idx_leads_status_score ON leads(status, score);
+CREATE INDEX IF NOT EXISTS idx_leads_status_created_at ON leads(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_leads_industry ON leads(industry COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_leads_city ON leads(city COLLATE NOCASE);
+"""
+
+# Erlaubte Sortierschlüssel für query(); Tie-Breaker ist immer die id
+SORT_COLUMNS = {"id", "score", "created_at", "updated_at", "company_name", "employee_count", "revenue"}
+
+# Indizes auf den Duplikat-Schlüsseln, erst nach dem Nachrüsten der Spalten in bestehenden Datenbanken
+KEY_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_leads_domain_key ON leads(domain_key);
+CREATE INDEX IF NOT EXISTS idx_leads_company_key ON leads(company_key);
+"""
+
+# Maximale Anzahl Parameter je IN-Abfrage (SQLite-Limit liegt je nach Version bei 999)
+_IN_CHUNK = 500
+
+
+class InvalidQueryError(ValueError):
+    """Ungültiger Filter, Sortierschlüssel, Cursor oder Feldname"""
+
+
+def _encode_cursor(sort: str, value: Any, lead_id: int) -> str:
+    raw = json.dumps([sort, value, lead_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, lead_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise InvalidQueryError("Ungültiger Cursor")
+    if cursor_sort != sort:
+        raise InvalidQueryError("Cursor gehört zu einer anderen Sortierung")
+    return value, int(lead_id)
+
+
+def normalize_domain(website: Optional[str]) -> Optional[str]:
+    """'https://www.Firma.de/kontakt' -> 'firma.de'"""
+    if not website or not website.strip():
+        return None
+    value = website.strip().lower()
+    if "://" not in value:
+        value = "http://" + value
+    host = urlsplit(value).hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    return host or None
+
+
+def normalize_company_key(company_name: Optional[str], postal_code: Optional[str]) -> Optional[str]:
+    """Firmenname ohne Rechtsform/Satzzeichen + PLZ, z.B. ('Müller GmbH & Co. KG', '70178') -> 'müller|70178'"""
+    if not company_name:
+        return None
+    name = re.sub(r"[^\w\s]", " ", company_name.lower())
+    name = _LEGAL_FORMS.sub(" ", name)
+    name = " ".join(name.split())
+    if not name:
+        return None
+    return f"{name}|{(postal_code or '').strip()}"
+
+
+class LeadStore:
+    """CRUD-Zugriff auf Leads; liefert Instanzen des übergebenen Pydantic-Modells zurück."""
+
+    def __init__(self, model: Type[BaseModel], path: Optional[str] = None):
+        self.model = model
+        self.db = SQLiteDatabase(path or data_path("leads.db"))
+        self.db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Ergänzt Schlüsselspalten in bestehenden Datenbanken und befüllt sie nach."""
+        # Prüfung in der Schreibtransaktion, damit parallel startende Prozesse nicht doppelt migrieren
+        with self.db.transaction() as conn:
+            existing = {r["name"] for r in conn.execute("PRAGMA table_info(leads)").fetchall()}
+            missing = [col for col in KEY_COLUMNS if col not in existing]
+            if missing:
+                for col in missing:
+                    conn.execute(f"ALTER TABLE leads ADD COLUMN {col} TEXT")
+                rows = conn.execute("SELECT id, website, company_name, postal_code FROM leads").fetchall()
+                conn.executemany(
+                    "UPDATE leads SET domain_key = ?, company_key = ? WHERE id = ?",
+                    [(normalize_domain(r["website"]), normalize_company_key(r["company_name"], r["postal_code"]), r["id"])
+                     for r in rows],
+                )
+        self.db.executescript(KEY_INDEXES)
+
+    # ------------------------------------------------------------------
+    # Konvertierung
+    # ------------------------------------------------------------------
+    def _to_row(self, lead: BaseModel) -> List[Any]:
+        data = lead.model_dump()
+        values = []
+        for col in LEAD_COLUMNS:
+            value = data.get(col)
+            if col in JSON_COLUMNS and value is not None:
+                value = json.dumps(value)
+            values.append(value)
+        values.append(normalize_domain(data.get("website")))
+        values.append(normalize_company_key(data.get("company_name"), data.get("postal_code")))
+        return values
+
+    def _from_row(self, row) -> BaseModel:
+        data: Dict[str, Any] = dict(row)
+        for col in KEY_COLUMNS:
+            data.pop(col, None)
+        for col in JSON_COLUMNS:
+            if data.get(col) is not None:
+                data[col] = json.loads(data[col])
+        return self.model(**data)
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+    def get(self, lead_id: int) -> Optional[BaseModel]:
+        row = self.db.execute("SELECT * FROM leads WHERE id = ?", (lead_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def list_leads(self) -> List[BaseModel]:
+        rows = self.db.execute("SELECT * FROM leads ORDER BY id").fetchall()
+        return [self._from_row(r) for r in rows]
+
+    def query(
+        self,
+        statuses: Optional[List[str]] = None,
+        min_score: Optional[int] = None,
+        max_score: Optional[int] = None,
+        industry: Optional[str] = None,
+        city: Optional[str] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+        sort: str = "id",
+        limit: Optional[int] = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Gefilterte, sortierte Seite von Leads mit Keyset-Pagination.
+        sort: Spaltenname, mit '-' absteigend (z.B. '-score'). fields: nur diese Spalten laden.
+        limit=None: alle passenden Leads ohne weitere Seite.
+        Gibt (Zeilen als dict, Cursor der nächsten Seite oder None) zurück."""
+        descending = sort.startswith("-")
+        sort_col = sort.lstrip("-")
+        if sort_col not in SORT_COLUMNS:
+            raise InvalidQueryError(f"Unbekannter Sortierschlüssel: {sort_col}")
+
+        if fields:
+            unknown = [f for f in fields if f != "id" and f not in LEAD_COLUMNS]
+            if unknown:
+                raise InvalidQueryError(f"Unbekannte Felder: {', '.join(unknown)}")
+            columns = list(dict.fromkeys(["id"] + fields))
+        else:
+            columns = ["id"] + LEAD_COLUMNS
+        # Sortierspalte wird für den Cursor gebraucht, auch wenn sie nicht angefordert wurde
+        select = columns if sort_col in columns else columns + [sort_col]
+
+        where: List[str] = []
+        params: List[Any] = []
+        if statuses:
+            where.append(f"status IN ({', '.join(['?'] * len(statuses))})")
+            params.extend(statuses)
+        if min_score is not None:
+            where.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            where.append("score <= ?")
+            params.append(max_score)
+        if industry:
+            where.append("industry = ? COLLATE NOCASE")
+            params.append(industry)
+        if city:
+            where.append("city = ? COLLATE NOCASE")
+            params.append(city)
+        if created_from:
+            where.append("created_at >= ?")
+            params.append(created_from)
+        if created_to:
+            where.append("created_at <= ?")
+            params.append(created_to)
+
+        if cursor:
+            value, last_id = _decode_cursor(cursor, sort)
+            # SQLite sortiert NULL als kleinsten Wert: aufsteigend zuerst, absteigend zuletzt
+            if sort_col == "id":
+                where.append("id < ?" if descending else "id > ?")
+                params.append(last_id)
+            elif value is None:
+                if descending:
+                    where.append(f"({sort_col} IS NULL AND id < ?)")
+                else:
+                    where.append(f"(({sort_col} IS NULL AND id > ?) OR {sort_col} IS NOT NULL)")
+                params.append(last_id)
+            elif descending:
+                where.append(f"({sort_col} < ? OR ({sort_col} = ? AND id < ?) OR {sort_col} IS NULL)")
+                params.extend([value, value, last_id])
+            else:
+                where.append(f"({sort_col} > ? OR ({sort_col} = ? AND id > ?))")
+                params.extend([value, value, last_id])
+
+        direction = "DESC" if descending else "ASC"
+        order = f"id {direction}" if sort_col == "id" else f"{sort_col} {direction}, id {direction}"
+        sql = f"SELECT {', '.join(select)} FROM leads"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            # Eine Zeile mehr laden, um zu erkennen, ob es eine weitere Seite gibt
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+        rows = self.db.execute(sql, params).fetchall()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(sort, last[sort_col], last["id"])
+
+        result = []
+        for row in rows:
+            data = {col: row[col] for col in columns}
+            for col in JSON_COLUMNS:
+                if data.get(col) is not None:
+                    data[col] = json.loads(data[col])
+            result.append(data)
+        return result, next_cursor
+
+    def ids_by_status(self, status: str) -> List[int]:
+        rows = self.db.execute("SELECT id FROM leads WHERE status = ? ORDER BY id", (status,)).fetchall()
+        return [r["id"] for r in rows]
+
+    def count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def existing_keys(self, domains: Iterable[str], company_keys: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """Liefert die bereits gespeicherten Domains und Firmen-Schlüssel aus den übergebenen Mengen."""
+        found: Dict[str, Set[str]] = {"domain_key": set(), "company_key": set()}
+        for col, values in (("domain_key", list(domains)), ("company_key", list(company_keys))):
+            for i in range(0, len(values), _IN_CHUNK):
+                chunk = values[i:i + _IN_CHUNK]
+                placeholders = ", ".join(["?"] * len(chunk))
+                rows = self.db.execute(f"SELECT DISTINCT {col} FROM leads WHERE {col} IN ({placeholders})", chunk).fetchall()
+                found[col].update(r[0] for r in rows)
+        return found["domain_key"], found["company_key"]
+
+    # ------------------------------------------------------------------
+    # Schreiben
+    # ------------------------------------------------------------------
+    def add(self, lead: BaseModel) -> BaseModel:
+        """Fügt einen Lead ein; ohne id vergibt SQLite den nächsten Schlüssel."""
+        return self.add_many([lead])[0]
+
+    def add_many(self, leads: Iterable[BaseModel]) -> List[BaseModel]:
+        """Bulk-Insert aller Leads in einer einzigen Transaktion."""
+        cols = ", ".join(["id"] + LEAD_COLUMNS + KEY_COLUMNS)
+        placeholders = ", ".join(["?"] * (len(LEAD_COLUMNS) + len(KEY_COLUMNS) + 1))
+        sql = f"INSERT INTO leads ({cols}) VALUES ({placeholders})"
+        inserted: List[BaseModel] = []
+        with self.db.transaction() as conn:
+            for lead in leads:
+                cur = conn.execute(sql, [lead.id] + self._to_row(lead))
+                inserted.append(lead.model_copy(update={"id": cur.lastrowid}))
+        return inserted
+
+    def update(self, lead: BaseModel) -> BaseModel:
+        assignments = ", ".join(f"{col} = ?" for col in LEAD_COLUMNS + KEY_COLUMNS)
+        with self.db.transaction() as conn:
+            conn.execute(f"UPDATE leads SET {assignments} WHERE id = ?", self._to_row(lead) + [lead.id])
+        return lead
+
+    def update_status(self, lead_ids: Iterable[int], status: str, updated_at: str) -> None:
+        """Setzt den Status mehrerer Leads in einer Transaktion."""
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "UPDATE leads SET status = ?, updated_at = ? WHERE id = ?",
+                [(status, updated_at, lead_id) for lead_id in lead_ids],
+            )
+
+    def delete(self, lead_id: int) -> bool:
+        with self.db.transaction() as conn:
+            cur = conn.execute("DELETE FROM leads WHERE id = ?", (lead_id,))
+        return cur.rowcount > 0
@@ -0,0 +1,399 @@
+"""
+Offline-Batch-Inferenz für große Nacht-Läufe.
+Im Batch-Modus (innerhalb von llm_batch_mode(), z.B. in run_offline_batch) schickt invoke_llm keine
+Echtzeit-Anfrage: Der Aufruf wird als Request-Record (OpenAI-Batch-Format, custom_id = LLM-Cache-Schlüssel)
+vorgemerkt und PendingBatchResult geworfen. Der Lauf des Leads bricht ab; die Checkpoints halten die
+bereits abgeschlossenen Säulen fest.
+submit_pending() schreibt alle vorgemerkten Records als JSONL nach data/llm_batches/ und reicht sie beim
+Batch-Prozessor ein (OpenAI Batch API oder lokaler Ersatz ohne Netzwerk). reconcile() ordnet die
+Ergebnisse über die custom_id den Records zu. Danach setzt der nächste Lauf fort und bekommt die Antworten
+aus dem Store (siehe OutReachAutomation.run_offline_batch).
+Bewusst kein prozessweiter Schalter: Echtzeit-Endpunkte im selben Prozess würden sonst PendingBatchResult werfen.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    from .db import SQLiteDatabase, data_path
+    from .llm_cache import llm_cache_key
+except ImportError:
+    from db import SQLiteDatabase, data_path
+    from llm_cache import llm_cache_key
+
+# openai = OpenAI Batch API, local = lokaler Ersatz (ohne Netzwerk, z.B. für Tests)
+LLM_BATCH_PROCESSOR = os.environ.get("LLM_BATCH_PROCESSOR", "openai")
+LLM_BATCH_COMPLETION_WINDOW = os.environ.get("LLM_BATCH_COMPLETION_WINDOW", "24h")
+# Abgeholte Antworten werden so lange für erneute Läufe aufbewahrt
+LLM_BATCH_MAX_AGE_SECONDS = int(os.environ.get("LLM_BATCH_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+# Nur diese Provider werden gebatcht, alle anderen laufen weiter in Echtzeit
+BATCH_PROVIDERS = ("openai", "openai-structured")
+
+_ENDPOINT = "/v1/chat/completions"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batch_requests (
+    custom_id TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL,
+    batch_id TEXT,
+    response TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_batch_requests_status ON batch_requests(status);
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    processor TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Batch-Status des Prozessors, bei denen keine weiteren Ergebnisse mehr kommen
+_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+_batch_mode: ContextVar[bool] = ContextVar("llm_batch_mode", default=False)
+
+
+class PendingBatchResult(Exception):
+    """Die Antwort des LLM-Aufrufs steht erst nach dem Abgleich des Offline-Batches bereit."""
+
+    def __init__(self, custom_id: str):
+        super().__init__(f"LLM-Antwort {custom_id} wartet auf den Offline-Batch")
+        self.custom_id = custom_id
+
+
+class BatchRequestFailed(RuntimeError):
+    """Der Batch-Prozessor hat für den Request einen Fehler geliefert."""
+
+
+@contextmanager
+def llm_batch_mode() -> Iterator[None]:
+    """LLM-Aufrufe im Block (inkl. Threads mit kopiertem Kontext) werden gebatcht statt in Echtzeit gesendet."""
+    token = _batch_mode.set(True)
+    try:
+        yield
+    finally:
+        _batch_mode.reset(token)
+
+
+def batch_mode_active(llm_provider: str) -> bool:
+    return _batch_mode.get() and llm_provider in BATCH_PROVIDERS
+
+
+# --- Prozessoren -----------------------------------------------------------------------
+
+
+class OpenAIBatchProcessor:
+    """Reicht JSONL-Dateien über die OpenAI Batch API ein und liest die Ergebnisdateien."""
+
+    name = "openai"
+
+    def __init__(self, client=None):
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI()
+        self.client = client
+
+    def submit(self, path: str) -> str:
+        with open(path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id, endpoint=_ENDPOINT, completion_window=LLM_BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        batch = self.client.batches.retrieve(batch_id)
+        # Erfolgreiche und fehlgeschlagene Requests stehen in getrennten Dateien
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    yield json.loads(line)
+
+
+_PLACEHOLDER_VALUES = {"string": "", "integer": 0, "number": 0, "boolean": False, "array": [], "null": None}
+
+
+def _placeholder(schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """Minimaler Wert, der das JSON-Schema erfüllt (Defaults, sonst leere Werte bzw. null)."""
+    if "$ref" in schema:
+        return _placeholder(defs.get(schema["$ref"].rsplit("/", 1)[-1], {}), defs)
+    if "default" in schema:
+        return schema["default"]
+    options = schema.get("anyOf") or schema.get("oneOf")
+    if options:
+        if any(option.get("type") == "null" for option in options):
+            return None
+        return _placeholder(options[0], defs)
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = "null" if "null" in kind else kind[0]
+    if kind == "object":
+        return {name: _placeholder(prop, defs) for name, prop in (schema.get("properties") or {}).items()}
+    return _PLACEHOLDER_VALUES.get(kind)
+
+
+def _echo_response(body: Dict[str, Any]) -> str:
+    # Platzhalter-Antwort: letzte Nachricht bzw. schemagültiges JSON bei Structured Output
+    response_format = body.get("response_format")
+    if response_format:
+        schema = (response_format.get("json_schema") or {}).get("schema") or {}
+        return json.dumps(_placeholder(schema, schema.get("$defs") or {}), ensure_ascii=False)
+    return str(body["messages"][-1]["content"])
+
+
+class LocalBatchProcessor:
+    """Lokaler Ersatz für die Batch API: beantwortet alle Requests sofort mit respond(body) und schreibt
+    die Ergebnisse im Format der OpenAI-Ausgabedatei neben die Eingabedatei. Ohne respond wird die
+    letzte Nachricht zurückgegeben, bei Structured Output ein schemagültiger Platzhalter."""
+
+    name = "local"
+
+    def __init__(self, respond: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.respond = respond or _echo_response
+
+    def submit(self, path: str) -> str:
+        output_path = Path(path).with_suffix(".output.jsonl")
+        with open(path, encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as out:
+            for line in src:
+                if line.strip():
+                    out.write(json.dumps(self._answer(json.loads(line)), ensure_ascii=False) + "\n")
+        return str(output_path)
+
+    def _answer(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            content = self.respond(record["body"])
+        except Exception as e:
+            return {"custom_id": record["custom_id"], "response": None, "error": {"message": str(e)}}
+        body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+        return {"custom_id": record["custom_id"], "response": {"status_code": 200, "body": body}, "error": None}
+
+    def status(self, batch_id: str) -> str:
+        return "completed"
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        with open(batch_id, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def get_batch_processor(name: Optional[str] = None):
+    name = name or LLM_BATCH_PROCESSOR
+    if name == "openai":
+        return OpenAIBatchProcessor()
+    if name == "local":
+        return LocalBatchProcessor()
+    raise ValueError(f"Unbekannter Batch-Prozessor: {name}")
+
+
+# --- Store -----------------------------------------------------------------------------
+
+
+class BatchStore:
+    """Vorgemerkte Requests, eingereichte Batches und abgeglichene Antworten (SQLite)."""
+
+    def __init__(self, path: Optional[str] = None, batch_dir: Optional[str] = None):
+        self.db = SQLiteDatabase(path or data_path("llm_batch.db"))
+        self.db.executescript(_SCHEMA)
+        self.batch_dir = Path(batch_dir or data_path("llm_batches"))
+
+    def lookup(self, custom_id: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            "SELECT status, response, error FROM batch_requests WHERE custom_id = ?", (custom_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def enqueue(self, custom_id: str, body: Dict[str, Any]) -> None:
+        """Merkt den Request vor (ein bereits vorgemerkter oder eingereichter bleibt unverändert)."""
+        now = time.time()
+        self.db.execute(
+            "INSERT OR IGNORE INTO batch_requests (custom_id, body, status, created_at, updated_at)"
+            " VALUES (?, ?, 'pending', ?, ?)",
+            (custom_id, json.dumps(body, ensure_ascii=False), now, now),
+        )
+
+    def discard(self, custom_id: str) -> None:
+        self.db.execute("DELETE FROM batch_requests WHERE custom_id = ?", (custom_id,))
+
+    def pending_count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM batch_requests WHERE status = 'pending'").fetchone()[0]
+
+    def open_batches(self) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT * FROM batches WHERE status NOT IN ({})".format(",".join("?" * len(_FINAL_STATUSES))),
+            _FINAL_STATUSES,
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def submit_pending(self, processor) -> Optional[str]:
+        """Schreibt alle vorgemerkten Requests als JSONL-Datei und reicht sie ein. Liefert die Batch-ID."""
+        self._purge()
+        rows = self.db.execute("SELECT custom_id, body FROM batch_requests WHERE status = 'pending'").fetchall()
+        if not rows:
+            return None
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        path = self.batch_dir / f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                record = {"custom_id": row["custom_id"], "method": "POST", "url": _ENDPOINT, "body": json.loads(row["body"])}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        batch_id = processor.submit(str(path))
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO batches (id, processor, input_path, status, requests, created_at, updated_at)"
+                " VALUES (?, ?, ?, 'submitted', ?, ?, ?)",
+                (batch_id, processor.name, str(path), len(rows), now, now),
+            )
+            conn.executemany(
+                "UPDATE batch_requests SET status = 'submitted', batch_id = ?, updated_at = ? WHERE custom_id = ?",
+                [(batch_id, now, row["custom_id"]) for row in rows],
+            )
+        print(f"📤 Offline-Batch {batch_id}: {len(rows)} LLM-Requests eingereicht ({path.name})")
+        return batch_id
+
+    def reconcile(self, processor) -> Dict[str, int]:
+        """Gleicht abgeschlossene Batches des Prozessors über die custom_id ab. Requests ohne Ergebnis eines
+        abgelaufenen/abgebrochenen Batches werden erneut vorgemerkt."""
+        counts = {"completed": 0, "failed": 0, "requeued": 0, "open_batches": 0}
+        for batch in self.open_batches():
+            if batch["processor"] != processor.name:
+                continue
+            status = processor.status(batch["id"])
+            if status not in _FINAL_STATUSES:
+                counts["open_batches"] += 1
+                continue
+            now = time.time()
+            with self.db.transaction() as conn:
+                for result in processor.results(batch["id"]):
+                    response, error = _parse_result(result)
+                    outcome = "done" if error is None else "failed"
+                    updated = conn.execute(
+                        "UPDATE batch_requests SET status = ?, response = ?, error = ?, updated_at = ?"
+                        " WHERE custom_id = ? AND batch_id = ?",
+                        (outcome, response, error, now, result.get("custom_id"), batch["id"]),
+                    ).rowcount
+                    counts["completed" if error is None else "failed"] += updated
+                # Nicht beantwortete Requests: bei abgeschlossenem Batch Fehler, sonst erneut vormerken
+                if status == "completed":
+                    counts["failed"] += conn.execute(
+                        "UPDATE batch_requests SET status = 'failed', error = 'Keine Antwort im Batch', updated_at = ?"
+                        " WHERE batch_id = ? AND status = 'submitted'",
+                        (now, batch["id"]),
+                    ).rowcount
+                else:
+                    counts["requeued"] += conn.execute(
+                        "UPDATE batch_requests SET status = 'pending', batch_id = NULL, updated_at = ?"
+                        " WHERE batch_id = ? AND status = 'submitted'",
+                        (now, batch["id"]),
+                    ).rowcount
+                conn.execute("UPDATE batches SET status = ?, updated_at = ? WHERE id = ?", (status, now, batch["id"]))
+            print(f"📥 Offline-Batch {batch['id']} ({status}) abgeglichen")
+        return counts
+
+    def stats(self) -> Dict[str, int]:
+        rows = self.db.execute("SELECT status, COUNT(*) AS n FROM batch_requests GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def _purge(self) -> None:
+        cutoff = time.time() - LLM_BATCH_MAX_AGE_SECONDS
+        self.db.execute("DELETE FROM batch_requests WHERE status IN ('done', 'failed') AND updated_at <= ?", (cutoff,))
+        self.db.execute("DELETE FROM batches WHERE updated_at <= ?", (cutoff,))
+
+
+def _parse_result(result: Dict[str, Any]):
+    # Zeile der Ausgabe-/Fehlerdatei -> (Antworttext, Fehlermeldung)
+    response = result.get("response") or {}
+    if result.get("error") or response.get("status_code", 200) >= 400:
+        error = result.get("error") or response.get("body", {}).get("error") or response
+        return None, json.dumps(error, ensure_ascii=False)
+    try:
+        return response["body"]["choices"][0]["message"]["content"] or "", None
+    except (KeyError, IndexError, TypeError):
+        return None, "Ungültige Antwort im Batch"
+
+
+_store: Optional[BatchStore] = None
+_store_lock = threading.Lock()
+
+
+def get_batch_store() -> BatchStore:
+    """Prozessweite Instanz (wird beim ersten Zugriff angelegt)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BatchStore()
+        return _store
+
+
+# --- Aufrufe -------------------------------------------------------------------------
+
+
+def _response_format_body(response_format: Any) -> Optional[Dict[str, Any]]:
+    if response_format is None:
+        return None
+    if hasattr(response_format, "model_json_schema"):
+        return {"type": "json_schema",
+                "json_schema": {"name": response_format.__name__, "schema": response_format.model_json_schema()}}
+    return {"type": "json_schema", "json_schema": {"name": "response", "schema": response_format}}
+
+
+def batch_request_body(model: str, temperature: Any, system_prompt: str, user_message: str,
+                       response_format: Any = None) -> Dict[str, Any]:
+    """Body eines Chat-Completions-Requests im Batch."""
+    body = {
+        "model": model,
+        "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_message}],
+    }
+    if temperature is not None:
+        body["temperature"] = temperature
+    response_format_body = _response_format_body(response_format)
+    if response_format_body:
+        body["response_format"] = response_format_body
+    return body
+
+
+def _decode_response(content: str, response_format: Any) -> Any:
+    if response_format is None:
+        return content
+    if hasattr(response_format, "model_validate_json"):
+        return response_format.model_validate_json(content)
+    return json.loads(content)
+
+
+def batched_llm_call(provider: str, model: str, temperature: Any, system_prompt: str, user_message: str,
+                     response_format: Any = None) -> Any:
+    """Liefert die abgeglichene Batch-Antwort oder merkt den Request vor und wirft PendingBatchResult."""
+    store = get_batch_store()
+    custom_id = llm_cache_key(provider, model, temperature, system_prompt, user_message, response_format)
+    record = store.lookup(custom_id)
+    if record is None:
+        store.enqueue(custom_id, batch_request_body(model, temperature, system_prompt, user_message, response_format))
+        raise PendingBatchResult(custom_id)
+    if record["status"] == "done":
+        return _decode_response(record["response"], response_format)
+    if record["status"] == "failed":
+        # Beim nächsten Lauf wird der Request erneut vorgemerkt
+        store.discard(custom_id)
+        raise BatchRequestFailed(f"Batch-Request {custom_id} fehlgeschlagen: {record['error']}")
+    raise PendingBatchResult(custom_id)
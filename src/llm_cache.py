@@ -0,0 +1,247 @@
+"""
+Persistenter LLM-Antwort-Cache (inhaltsadressiert, SQLite).
+Schlüssel: Provider, Modell, Temperatur, Hash des System-Prompts, Hash der User-Nachricht und Hash des
+Antwortformats (Structured Output). Identische Prompts (z.B. dieselbe Impressum-Seite, URL-Picker mit
+denselben Suchergebnissen, Query-Writer für dieselbe Firma) werden nur einmal bezahlt.
+Einträge laufen nach LLM_CACHE_TTL_SECONDS ab; über LLM_CACHE_MAX_ENTRIES werden die am längsten nicht
+genutzten verdrängt (LRU). Mit LLM_CACHE_BYPASS=1 bzw. innerhalb von llm_cache_bypass() wird nicht
+gelesen, frische Antworten ersetzen aber die gespeicherten.
+Agent-Läufe mit Tools (openai-agent) werden nicht gecacht - ihr Ergebnis hängt von Live-Suchen ab.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from langchain_core.messages import AIMessage, SystemMessage
+
+try:
+    from .db import SQLiteDatabase, data_path
+    from .artifacts import content_hash
+except ImportError:
+    from db import SQLiteDatabase, data_path
+    from artifacts import content_hash
+
+# 0 = Cache aus
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_BYPASS = os.environ.get("LLM_CACHE_BYPASS", "0") == "1"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_responses_used ON llm_responses(last_used_at);
+CREATE INDEX IF NOT EXISTS idx_llm_responses_expires ON llm_responses(expires_at);
+"""
+
+# Abgelaufene Einträge werden höchstens so oft gelöscht
+_PURGE_INTERVAL_SECONDS = 3600
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def llm_cache_bypass() -> Iterator[None]:
+    """LLM-Aufrufe im Block (inkl. Threads mit kopiertem Kontext) lesen nicht aus dem Cache."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class LLMCache:
+    """LLM-Antworten je Schlüssel mit TTL und LRU-Obergrenze."""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.db = SQLiteDatabase(path or data_path("llm_cache.db"))
+        self.db.executescript(_SCHEMA)
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        row = self.db.execute(
+            "SELECT response FROM llm_responses WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not row:
+            return None
+        self.db.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (now, key))
+        return json.loads(row["response"])
+
+    def put(self, key: str, provider: str, model: str, response: Dict[str, Any]) -> None:
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, provider, model, response, created_at, expires_at, last_used_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, json.dumps(response, ensure_ascii=False), now, now + self.ttl_seconds, now),
+            )
+            overflow = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN"
+                    " (SELECT key FROM llm_responses ORDER BY last_used_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+        if now - self._last_purge >= _PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            self.db.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+
+    def invalidate(self) -> int:
+        return self.db.execute("DELETE FROM llm_responses").rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.db.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        with self._lock:
+            return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Prozessweite Instanz (None, wenn der Cache per LLM_CACHE_TTL_SECONDS=0 deaktiviert ist)."""
+    global _cache
+    if LLM_CACHE_TTL_SECONDS <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    cache = get_llm_cache()
+    return cache.stats() if cache else {"entries": 0, "hits": 0, "misses": 0}
+
+
+# --- Schlüssel und (De-)Serialisierung ------------------------------------------------
+
+
+def _format_hash(response_format: Any) -> str:
+    if response_format is None:
+        return ""
+    if hasattr(response_format, "model_json_schema"):
+        return content_hash(response_format.model_json_schema())
+    return content_hash(response_format)
+
+
+def llm_cache_key(provider: str, model: str, temperature: Any, system_prompt: str, user_message: str,
+                  response_format: Any = None) -> str:
+    return content_hash([
+        provider, model, temperature,
+        content_hash(system_prompt or ""), content_hash(user_message or ""), _format_hash(response_format),
+    ])
+
+
+def _encode(value: Any) -> Optional[Dict[str, Any]]:
+    # Leere Antworten (z.B. reine Tool-Calls) werden nicht gecacht
+    if isinstance(value, AIMessage):
+        return {"type": "message", "value": value.content} if value.content else None
+    if isinstance(value, str):
+        return {"type": "text", "value": value} if value else None
+    if hasattr(value, "model_dump"):
+        return {"type": "model", "value": value.model_dump(mode="json")}
+    if isinstance(value, (dict, list)):
+        return {"type": "json", "value": value}
+    # Unbekannte Typen (z.B. None bei fehlgeschlagenem Structured Output) werden nicht gecacht
+    return None
+
+
+def _decode(payload: Dict[str, Any], response_format: Any = None) -> Any:
+    kind, value = payload["type"], payload["value"]
+    if kind == "message":
+        return AIMessage(content=value)
+    if kind == "model" and hasattr(response_format, "model_validate"):
+        return response_format.model_validate(value)
+    return value
+
+
+# --- Aufrufe -------------------------------------------------------------------------
+
+
+def cached_llm_call(provider: str, model: str, temperature: Any, system_prompt: str, user_message: str,
+                    compute: Callable[[], Any], response_format: Any = None) -> Any:
+    """Liefert die gecachte Antwort oder ruft compute() auf und speichert deren Ergebnis."""
+    cache = get_llm_cache()
+    if cache is None:
+        return compute()
+    key = llm_cache_key(provider, model, temperature, system_prompt, user_message, response_format)
+    if not (LLM_CACHE_BYPASS or _bypass.get()):
+        payload = cache.get(key)
+        if payload is not None:
+            return _decode(payload, response_format)
+    value = compute()
+    payload = _encode(value)
+    if payload is not None:
+        cache.put(key, provider, model, payload)
+    return value
+
+
+async def acached_llm_call(provider: str, model: str, temperature: Any, system_prompt: str, user_message: str,
+                           compute: Callable[[], Awaitable[Any]], response_format: Any = None) -> Any:
+    """Async-Variante von cached_llm_call (compute liefert eine Coroutine, SQLite im Worker-Thread)."""
+    cache = get_llm_cache()
+    if cache is None:
+        return await compute()
+    key = llm_cache_key(provider, model, temperature, system_prompt, user_message, response_format)
+    if not (LLM_CACHE_BYPASS or _bypass.get()):
+        payload = await asyncio.to_thread(cache.get, key)
+        if payload is not None:
+            return _decode(payload, response_format)
+    value = await compute()
+    payload = _encode(value)
+    if payload is not None:
+        await asyncio.to_thread(cache.put, key, provider, model, payload)
+    return value
+
+
+def _chat_call(llm, messages) -> Dict[str, Any]:
+    # Schlüsselteile eines Chat-Modells (ChatOpenAI o.ä.) und einer Nachrichtenliste
+    system = "\n\n".join(str(m.content) for m in messages if isinstance(m, SystemMessage))
+    user = "\n\n".join(f"{m.type}: {m.content}" for m in messages if not isinstance(m, SystemMessage))
+    return dict(
+        provider=type(llm).__name__,
+        model=str(getattr(llm, "model_name", None) or getattr(llm, "model", "")),
+        temperature=getattr(llm, "temperature", None),
+        system_prompt=system,
+        user_message=user,
+    )
+
+
+def cached_invoke(llm, messages) -> AIMessage:
+    """llm.invoke(messages) für tool-lokale Chat-Modelle mit Cache (Antwort als AIMessage)."""
+    return cached_llm_call(**_chat_call(llm, messages), compute=lambda: llm.invoke(messages))
+
+
+async def acached_invoke(llm, messages) -> AIMessage:
+    """Async-Variante von cached_invoke."""
+    return await acached_llm_call(**_chat_call(llm, messages), compute=lambda: llm.ainvoke(messages))
@@ -0,0 +1,157 @@
+"""
+Pool wiederverwendbarer LLM-Clients und Agent-Executoren.
+get_llm_by_provider baut Chat-Modelle bzw. AgentExecutors nur einmal je Schlüssel (Provider, Modell,
+Temperatur, Tools, Agent-Prompt) und verwendet sie über Aufrufe und Threads hinweg. Alle gepoolten
+OpenAI-Modelle teilen sich einen HTTP-Client je Modus (sync/async), Verbindungen bleiben per
+Keep-Alive offen. llm_pool_stats() zeigt eingesparte Konstruktionen und die Wiederverwendung von
+Verbindungen (HTTP-Requests vs. neu aufgebaute TCP-Verbindungen).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Höchstzahl gepoolter Clients/Executoren (am längsten ungenutzte werden verworfen)
+LLM_POOL_MAX_SIZE = int(os.environ.get("LLM_POOL_MAX_SIZE", "64"))
+
+
+class _ConnectionStats:
+    """Zählt HTTP-Requests und neu aufgebaute Verbindungen der gemeinsamen HTTP-Clients."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def count(self, requests: int = 0, connections: int = 0) -> None:
+        with self._lock:
+            self.requests += requests
+            self.connections += connections
+
+
+_connections = _ConnectionStats()
+
+
+def _trace(event_name: str, info: Dict[str, Any]) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        _connections.count(connections=1)
+
+
+async def _atrace(event_name: str, info: Dict[str, Any]) -> None:
+    _trace(event_name, info)
+
+
+def _on_request(request) -> None:
+    request.extensions["trace"] = _trace
+
+
+async def _aon_request(request) -> None:
+    request.extensions["trace"] = _atrace
+
+
+def _on_response(response) -> None:
+    _connections.count(requests=1)
+
+
+async def _aon_response(response) -> None:
+    _on_response(response)
+
+
+_http_clients: Dict[str, Any] = {}
+_http_clients_lock = threading.Lock()
+
+
+def shared_http_client():
+    """Gemeinsamer httpx-Client (sync) für alle gepoolten OpenAI-Modelle."""
+    with _http_clients_lock:
+        if "sync" not in _http_clients:
+            from openai import DefaultHttpxClient
+            _http_clients["sync"] = DefaultHttpxClient(event_hooks={"request": [_on_request], "response": [_on_response]})
+        return _http_clients["sync"]
+
+
+def shared_async_http_client():
+    """Gemeinsamer httpx-Client (async) für alle gepoolten OpenAI-Modelle."""
+    with _http_clients_lock:
+        if "async" not in _http_clients:
+            from openai import DefaultAsyncHttpxClient
+            _http_clients["async"] = DefaultAsyncHttpxClient(
+                event_hooks={"request": [_aon_request], "response": [_aon_response]}
+            )
+        return _http_clients["async"]
+
+
+class LLMPool:
+    """Threadsichere LRU-Ablage gebauter LLM-Clients/Executoren inkl. Treffer- und Bauzeit-Statistik."""
+
+    def __init__(self, max_size: int = LLM_POOL_MAX_SIZE):
+        self.max_size = max(1, max_size)
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Liefert den Client zum Schlüssel oder baut ihn (außerhalb des Locks, Fehler werden nicht gespeichert).
+        Bauen zwei Threads gleichzeitig denselben Client, gewinnt der erste."""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+
+        start = time.perf_counter()
+        item = build()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.builds += 1
+            self.build_seconds += elapsed
+            item = self._items.setdefault(key, item)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            return item
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            avg_build = self.build_seconds / self.builds if self.builds else 0.0
+            pooled = {
+                "size": len(self._items),
+                "hits": self.hits,
+                "builds": self.builds,
+                "build_seconds": round(self.build_seconds, 3),
+                # Ohne Pool wäre bei jedem Treffer erneut gebaut worden
+                "saved_build_seconds": round(self.hits * avg_build, 3),
+            }
+        requests, connections = _connections.requests, _connections.connections
+        pooled.update({
+            "http_requests": requests,
+            "http_connections": connections,
+            "connection_reuse": round(1 - connections / requests, 3) if requests else 0.0,
+        })
+        return pooled
+
+
+_pool: Optional[LLMPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_llm_pool() -> LLMPool:
+    """Prozessweiter Pool (wird beim ersten Zugriff angelegt)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = LLMPool()
+        return _pool
+
+
+def llm_pool_stats() -> Dict[str, Any]:
+    return get_llm_pool().stats()
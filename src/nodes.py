@@ -4,17 +4,20 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from .tools.linkedin_scrape_tool import linkedin_scrape_tool
-from .tools.google_search_tool_serper import google_search_tool
+from .tools.google_search_tool_serper import google_search_tool, agoogle_search_tool
 from .tools.finance_scrape_tool import finance_scrape_tool
 from .tools.website_scraper import company_website_scraper as website_scraper
 from .tools.markdown_scrape_tool import scrape_website_to_markdown
 from .tools.wlw_scrape_tool import wlw_scrape_tool
 from .state import LeadData, CompanyData, Report, GraphInputState, GraphState
-from .structured_outputs import WebsiteData, EmailResponse
-from .utils import invoke_llm, get_report, get_current_date, save_reports_locally
+from .structured_outputs import WebsiteData, EmailResponse, CompanyProfile
+from .utils import invoke_llm, ainvoke_llm, gather_llm, agather_llm, get_report, get_current_date, save_reports_locally
+from .artifacts import artifact_run
+from .fingerprints import apage_summary, page_summary, pillar_inputs
+from .deadline import deadline_expired, note_trimmed, tool_deadline
+import asyncio
 import os
 import re
-import time
 from typing import List
 
 from langchain_openai import ChatOpenAI
@@ -24,6 +27,7 @@ from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
 # Research-Prompts
 from .prompts.research_prompts import (
     research_prompt_unternehmensidentifikation,
+    research_prompt_unternehmensprofil_structured,
     research_prompt_finanzen,
     research_prompt_lead,
     research_prompt_news_wo_tools,
@@ -36,6 +40,14 @@ SEND_EMAIL_DIRECTLY = False
 # Enable or disable saving emails to Google Docs
 # By defauly all reports are save locally in `reports` folder
 SAVE_TO_GOOGLE_DOCS = False
+# Unternehmensinformationen: alle Target-Informationen mit EINEM strukturierten LLM-Aufruf je Säule
+# statt zwei Agent-Aufrufen mit demselben Scrape (halbe Input-Tokens). COMBINED_EXTRACTION=0 = alter Modus
+COMBINED_EXTRACTION = os.environ.get("COMBINED_EXTRACTION", "1") != "0"
+
+TARGET_STAMMDATEN = "Das Ziel der Recherche ist es, die relevanten Target-Informationen zu sammeln.\n Target-Information: Mitarbeiteranzahl, Branche, Unternehmensart (Fertigungsunternehmen oder Händler?)"
+TARGET_ANGEBOT = "Das Ziel der Recherche ist es, die relevanten Target-Informationen zu sammeln.\n Target-Information: Dienstleistungen / Produkte, Materialien (Welche Materialien werden verarbeitet?)"
+FINANZEN_KENNZAHLEN = """Die Mission der Recherche ist es, die relevanten Finanziellen Kennzahlen zu sammeln.
+        Finanzielle Kennzahlen: Umsatz"""
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
@@ -49,233 +61,209 @@ class OutReachAutomationNodes:
     @staticmethod
     def pillar_unternehmensinformationen(state: GraphState):
         print(Fore.YELLOW + "----- Säule: Unternehmensinformationen (Website Scraper) -----\n" + Style.RESET_ALL)
-        company_name = state.get("company_data", CompanyData()).name
-        plz = _regex_extract_plz(state.get("current_lead").address if state.get("current_lead") else "")
-        if not (company_name and plz):
-            raise ValueError("Fehlende Daten: Firmenname und Postleitzahl benötigt für Unternehmensinformationen.")
-
-        query = f"{company_name} AND {plz}"
-        tool_output = ""
-        if website_scraper:
-            try:
-                res = website_scraper(query)
-                tool_output = getattr(res, "content", str(res))
-            except Exception as e:
-                tool_output = f"Website-Scraper Fehler: {e}"
+        query = _company_query(state, "Unternehmensinformationen")
+        with pillar_inputs("unternehmensinformationen", query) as inputs:
+            tool_output = _run_tool(website_scraper, query, "Website-Scraper")
+        # Website unverändert (Sitemap, Seiten-Hashes) -> Report des letzten Laufs übernehmen
+        previous = inputs.previous_result()
+        if previous is not None:
+            return previous
+
+        if COMBINED_EXTRACTION:
+            llm_output_1, llm_output_2 = _render_company_profile(_extract_company_profile(tool_output))
         else:
-            tool_output = "Website-Scraper nicht verfügbar."
-
-        target_information_1 = "Das Ziel der Recherche ist es, die relevanten Target-Informationen zu sammeln.\n Target-Information: Mitarbeiteranzahl, Branche, Unternehmensart (Fertigungsunternehmen oder Händler?)"
-        target_information_2 = "Das Ziel der Recherche ist es, die relevanten Target-Informationen zu sammeln.\n Target-Information: Dienstleistungen / Produkte, Materialien (Welche Materialien werden verarbeitet?)"
-
-        mission_prompt_1 = f"Rechercheergebnisse: {tool_output} \n Mission Prompt: {target_information_1} "
-        mission_prompt_2 = f"Rechercheergebnisse: {tool_output} \n Mission Prompt: {target_information_2} "
-
-        llm_output_1 = invoke_llm(
-            system_prompt=research_prompt_unternehmensidentifikation,
-            user_message=mission_prompt_1,
-            model="gpt-4o-mini",
-            llm_provider="openai-agent",
-        )
+            # Beide Missionen sind unabhängig und laufen gleichzeitig
+            llm_output_1, llm_output_2 = _raise_errors(gather_llm([
+                _research_call(tool_output, TARGET_STAMMDATEN), _research_call(tool_output, TARGET_ANGEBOT),
+            ]))
+        return inputs.save(_unternehmensinformationen_result(llm_output_1, llm_output_2))
 
-        print(f"Finaler Report Unternehmensinformationen_1: {llm_output_1}")
-        report_1 = Report(title="Unternehmensinformationen_1", content=llm_output_1, is_markdown=True)
-
-        llm_output_2 = invoke_llm(
-            system_prompt=research_prompt_unternehmensidentifikation,
-            user_message=mission_prompt_2,
-            model="gpt-4o-mini",
-            llm_provider="openai-agent",
-        )
-
-        print(f"Finaler Report Unternehmensinformationen_2: {llm_output_2}")
-        report_2 = Report(title="Unternehmensinformationen_2", content=llm_output_2, is_markdown=True)
-        return {"reports": [report_1, report_2], "sektion_unternehmensinformationen": [llm_output_1, llm_output_2]}
+    @staticmethod
+    async def apillar_unternehmensinformationen(state: GraphState):
+        print(Fore.YELLOW + "----- Säule: Unternehmensinformationen (Website Scraper, async) -----\n" + Style.RESET_ALL)
+        query = _company_query(state, "Unternehmensinformationen")
+        # Der Website-Scraper bleibt synchron (Crawl mit eigenem Thread-Pool) und läuft im Thread
+        with pillar_inputs("unternehmensinformationen", query) as inputs:
+            tool_output = await asyncio.to_thread(_run_tool, website_scraper, query, "Website-Scraper")
+        previous = await asyncio.to_thread(inputs.previous_result)
+        if previous is not None:
+            return previous
+
+        if COMBINED_EXTRACTION:
+            llm_output_1, llm_output_2 = _render_company_profile(await _aextract_company_profile(tool_output))
+        else:
+            llm_output_1, llm_output_2 = _raise_errors(await agather_llm([
+                _research_call(tool_output, TARGET_STAMMDATEN), _research_call(tool_output, TARGET_ANGEBOT),
+            ]))
+        return await asyncio.to_thread(inputs.save, _unternehmensinformationen_result(llm_output_1, llm_output_2))
 
     @staticmethod
     def pillar_unternehmensinformationen_services_materials(state: GraphState):
         print(Fore.YELLOW + "----- Säule: Unternehmensinformationen (Website Scraper) -----\n" + Style.RESET_ALL)
-        company_name = state.get("company_data", CompanyData()).name
-        plz = _regex_extract_plz(state.get("current_lead").address if state.get("current_lead") else "")
-        if not (company_name and plz):
-            raise ValueError("Fehlende Daten: Firmenname und Postleitzahl benötigt für Unternehmensinformationen.")
-
-        query = f"{company_name} AND {plz}"
-        tool_output = ""
-        if wlw_scrape_tool:
-            try:
-                res = wlw_scrape_tool(query)
-                tool_output = getattr(res, "content", str(res))
-            except Exception as e:
-                tool_output = f"WLW-Scraper Fehler: {e}"
+        query = _company_query(state, "Unternehmensinformationen")
+        with pillar_inputs("unternehmensinformationen_s_m", query) as inputs:
+            tool_output = _run_tool(wlw_scrape_tool, query, "WLW-Scraper")
+        previous = inputs.previous_result()
+        if previous is not None:
+            return previous
+
+        if COMBINED_EXTRACTION:
+            # Reihenfolge wie im alten Modus: _1 = Dienstleistungen/Materialien, _2 = Stammdaten
+            llm_output_2, llm_output_1 = _render_company_profile(_extract_company_profile(tool_output))
         else:
-            tool_output = "WLW-Scraper nicht verfügbar."
+            # Beide Missionen sind unabhängig und laufen gleichzeitig
+            llm_output_1, llm_output_2 = _raise_errors(gather_llm([
+                _research_call(tool_output, TARGET_ANGEBOT), _research_call(tool_output, TARGET_STAMMDATEN),
+            ]))
+        return inputs.save(_services_materials_result(llm_output_1, llm_output_2))
 
-        target_information_1 = "Das Ziel der Recherche ist es, die relevanten Target-Informationen zu sammeln.\n Target-Information: Dienstleistungen / Produkte, Materialien (Welche Materialien werden verarbeitet?)"
-        target_information_2 = "Das Ziel der Recherche ist es, die relevanten Target-Informationen zu sammeln.\n Target-Information: Mitarbeiteranzahl, Branche, Unternehmensart (Fertigungsunternehmen oder Händler?)"
-
-        mission_prompt_1 = f"Rechercheergebnisse: {tool_output} \n Mission Prompt: {target_information_1} "
-        mission_prompt_2 = f"Rechercheergebnisse: {tool_output} \n Mission Prompt: {target_information_2} "
-
-        llm_output_1 = invoke_llm(
-            system_prompt=research_prompt_unternehmensidentifikation,
-            user_message=mission_prompt_1,
-            model="gpt-4o-mini",
-            llm_provider="openai-agent",
-        )
-
-        llm_output_2 = invoke_llm(
-            system_prompt=research_prompt_unternehmensidentifikation,
-            user_message=mission_prompt_2,
-            model="gpt-4o-mini",
-            llm_provider="openai-agent",
-        )
-
-        print(f"Finaler Report Unternehmensinformationen_services_materials: {llm_output_1}")
-        report_1 = Report(title="Unternehmensinformationen_services_materials_1", content=llm_output_1, is_markdown=True)
-
-        print(f"Finaler Report Unternehmensinformationen_services_materials: {llm_output_2}")
-        report_2 = Report(title="Unternehmensinformationen_services_materials_2", content=llm_output_2, is_markdown=True)
-        return {"reports": [report_1, report_2], "sektion_unternehmensinformationen_services_materials": [llm_output_1, llm_output_2]}
+    @staticmethod
+    async def apillar_unternehmensinformationen_services_materials(state: GraphState):
+        print(Fore.YELLOW + "----- Säule: Unternehmensinformationen (WLW Scraper, async) -----\n" + Style.RESET_ALL)
+        query = _company_query(state, "Unternehmensinformationen")
+        with pillar_inputs("unternehmensinformationen_s_m", query) as inputs:
+            tool_output = await asyncio.to_thread(_run_tool, wlw_scrape_tool, query, "WLW-Scraper")
+        previous = await asyncio.to_thread(inputs.previous_result)
+        if previous is not None:
+            return previous
+
+        if COMBINED_EXTRACTION:
+            llm_output_2, llm_output_1 = _render_company_profile(await _aextract_company_profile(tool_output))
+        else:
+            llm_output_1, llm_output_2 = _raise_errors(await agather_llm([
+                _research_call(tool_output, TARGET_ANGEBOT), _research_call(tool_output, TARGET_STAMMDATEN),
+            ]))
+        return await asyncio.to_thread(inputs.save, _services_materials_result(llm_output_1, llm_output_2))
 
     @staticmethod
     def pillar_finanzen(state: GraphState):
         print(Fore.YELLOW + "----- Säule: Finanzen -----\n" + Style.RESET_ALL)
-        # Rate-Limiting: Warte 2 Sekunden vor dem nächsten API-Aufruf
-        print("⏳ Warte 2 Sekunden für Rate-Limiting...")
-        time.sleep(2)
-        
-        company_name = state.get("company_data", CompanyData()).name
-        plz = _regex_extract_plz(state.get("current_lead").address if state.get("current_lead") else "")
-        if not (company_name and plz):
-            raise ValueError("Fehlende Daten: Firmenname und Postleitzahl benötigt für Finanzen.")
-
-        query = f"{company_name} AND {plz}"
-        tool_output = ""
-        if finance_scrape_tool:
-            try:
-                res = finance_scrape_tool(query)
-                tool_output = getattr(res, "content", str(res))
-            except Exception as e:
-                tool_output = f"Finance-Tool Fehler: {e}"
-        else:
-            tool_output = "Finance-Tool nicht verfügbar."
-
-        finanzen_kennzahlen = """Die Mission der Recherche ist es, die relevanten Finanziellen Kennzahlen zu sammeln.
-        Finanzielle Kennzahlen: Umsatz"""
-
-        mission_prompt = f"Rechercheergebnisse: {tool_output} \n Mission Prompt: {finanzen_kennzahlen} "
+        # Rate-Limiting übernehmen die Provider-Buckets in rate_limiter.py
+        query = _company_query(state, "Finanzen")
+        with pillar_inputs("finanzen", query) as inputs:
+            tool_output = _run_tool(finance_scrape_tool, query, "Finance-Tool")
+        previous = inputs.previous_result()
+        if previous is not None:
+            return previous
+        llm_output = invoke_llm(**_finanzen_call(tool_output))
+        return inputs.save(_finanzen_result(llm_output))
 
-        llm_output = invoke_llm(
-            system_prompt=research_prompt_finanzen,
-            user_message=mission_prompt,
-            model="gpt-4o-mini",
-            llm_provider="openai-agent",
-        )
-        print(f"Finaler Report Finanzen: {llm_output}")
-        report = Report(title="Finanzen", content=llm_output, is_markdown=True)
-        return {"reports": [report], "sektion_finanzen": llm_output}
+    @staticmethod
+    async def apillar_finanzen(state: GraphState):
+        print(Fore.YELLOW + "----- Säule: Finanzen (async) -----\n" + Style.RESET_ALL)
+        query = _company_query(state, "Finanzen")
+        with pillar_inputs("finanzen", query) as inputs:
+            tool_output = await asyncio.to_thread(_run_tool, finance_scrape_tool, query, "Finance-Tool")
+        previous = await asyncio.to_thread(inputs.previous_result)
+        if previous is not None:
+            return previous
+        llm_output = await ainvoke_llm(**_finanzen_call(tool_output))
+        return await asyncio.to_thread(inputs.save, _finanzen_result(llm_output))
 
     @staticmethod
     def pillar_linkedin(state: GraphState):
         print(Fore.YELLOW + "----- Säule: LinkedIn (LinkedIn Scraper) -----\n" + Style.RESET_ALL)
-        # Rate-Limiting: Warte 2 Sekunden vor dem nächsten API-Aufruf
-        print("⏳ Warte 2 Sekunden für Rate-Limiting...")
-        time.sleep(2)
-        
-        lead_name = state.get("current_lead").name if state.get("current_lead") else ""
-        company_name = state.get("company_data", CompanyData()).name
-        plz = _regex_extract_plz(state.get("current_lead").address if state.get("current_lead") else "")
-        if not (lead_name and plz):
-            raise ValueError("Fehlende Daten: Lead-Name und Postleitzahl benötigt für LinkedIn.")
-
-        if company_name:
-            query = f"site:linkedin.com ({lead_name} AND {plz} OR {company_name})"
-        else:
-            query = f"{lead_name} AND {plz}"
+        # Rate-Limiting übernehmen die Provider-Buckets in rate_limiter.py
+        query = _linkedin_query(state)
+        with pillar_inputs("linkedin", query) as inputs:
+            tool_output = _run_tool(_invoke_linkedin_tool if linkedin_scrape_tool else None, query, "LinkedIn-Tool")
+        previous = inputs.previous_result()
+        if previous is not None:
+            return previous
+        llm_output = invoke_llm(**_linkedin_call(tool_output))
+        return inputs.save(_linkedin_result(llm_output))
 
-        tool_output = ""
-        if linkedin_scrape_tool:
-            try:
-                res = linkedin_scrape_tool.invoke({"query": query})
-                tool_output = str(res)
-            except Exception as e:
-                tool_output = f"LinkedIn-Tool Fehler: {e}"
-        else:
-            tool_output = "LinkedIn-Tool nicht verfügbar."
-
-        llm_output = invoke_llm(
-            system_prompt=research_prompt_lead,
-            user_message=tool_output,
-            model="gpt-4.1-mini",
-            llm_provider="openai",
-        )
-        print(f"Finaler Report LinkedIn: {llm_output}")
-        report = Report(title="LinkedIn", content=llm_output, is_markdown=True)
-        return {"reports": [report], "sektion_linkedin": llm_output}
+    @staticmethod
+    async def apillar_linkedin(state: GraphState):
+        print(Fore.YELLOW + "----- Säule: LinkedIn (LinkedIn Scraper, async) -----\n" + Style.RESET_ALL)
+        query = _linkedin_query(state)
+        with pillar_inputs("linkedin", query) as inputs:
+            tool_output = await asyncio.to_thread(
+                _run_tool, _invoke_linkedin_tool if linkedin_scrape_tool else None, query, "LinkedIn-Tool"
+            )
+        previous = await asyncio.to_thread(inputs.previous_result)
+        if previous is not None:
+            return previous
+        llm_output = await ainvoke_llm(**_linkedin_call(tool_output))
+        return await asyncio.to_thread(inputs.save, _linkedin_result(llm_output))
 
     @staticmethod
     def pillar_news(state: GraphState):
         print(Fore.YELLOW + "----- Säule: News -----\n" + Style.RESET_ALL)
         # 1. Extrahiere Unternehmensnamen und Postleitzahl
-        company_name = state.get("company_data", CompanyData()).name
-        plz = _regex_extract_plz(state.get("current_lead").address if state.get("current_lead") else "")
-        if not (company_name and plz):
-            raise ValueError("Fehlende Daten: Firmenname und Postleitzahl benötigt für News.")
-
-        # 2. Query Writer LLM: Erstelle 3 Suchanfragen
-        company_input = f"Unternehmensname: {company_name}\nPostleitzahl: {plz}\n"
-        mission_input = f"""Mission der Recherche: Die Mission der Recherche ist es, aktuelle Nachrichten über das Unternehmen {company_name} zu identifizieren und gezielt auffindbar zu machen.
-Im Fokus stehen dabei insbesondere folgende Nachrichtenthemen:
-
-- Veränderungen im Management oder Geschäftsführerwechsel
-- Strategische Investitionen
-- Kooperationen und Partnerschaften
-- Akquisitionen und Unternehmensübernahmen"""
-
-        mission_prompt = f"{company_input}\n{mission_input}"
-
+        mission_prompt = _news_mission(state)
         print(f"Query Writer Input:\n {mission_prompt}")
-        
-        query_writer_output = invoke_llm(
-            system_prompt=query_writer_prompt,
-            user_message=mission_prompt,
-            model="gpt-4o-mini",
-            llm_provider="openai",
-        )
-        
-        # Parse die 3 Suchanfragen aus der LLM-Antwort
-        suchanfragen = [line.strip() for line in query_writer_output.strip().split('\n') if line.strip()][:3]
-        print(f"Generierte Suchanfragen: {suchanfragen}")
+
+        # 2. Query Writer LLM: Erstelle 3 Suchanfragen (je Mission gespeichert, siehe NEWS_QUERIES_KIND)
+        suchanfragen = _parse_queries(page_summary(
+            NEWS_QUERIES_KIND, mission_prompt, lambda: invoke_llm(**_query_writer_call(mission_prompt))
+        ))
 
         # 3. Führe alle 3 Suchanfragen durch das Google Search Tool aus
         tool_output = ""
-        if google_search_tool and suchanfragen:
-            search_results = []
-            for i, query in enumerate(suchanfragen, 1):
-                try:
-                    print(f"Führe Suchanfrage {i} aus: {query}")
-                    res = google_search_tool.invoke({"query": query, "mission_prompt": mission_prompt})
-                    search_results.append(f"=== Suchergebnisse {i} ===\n{str(res)}")
-                except Exception as e:
-                    search_results.append(f"=== Suchanfrage {i} - Fehler ===\n{e}")
-            
-            tool_output = "\n\n".join(search_results)
-        else:
-            tool_output = "Google-Search-Tool nicht verfügbar oder keine Suchanfragen generiert."
+        with pillar_inputs("news", mission_prompt) as inputs:
+            if google_search_tool and suchanfragen:
+                search_results = []
+                for i, query in enumerate(suchanfragen, 1):
+                    # Zeitbudget erschöpft: weitere Suchanfragen auslassen
+                    if deadline_expired():
+                        note_trimmed(f"Suchanfrage {i} ausgelassen")
+                        continue
+                    try:
+                        print(f"Führe Suchanfrage {i} aus: {query}")
+                        with tool_deadline():
+                            res = google_search_tool.invoke({"query": query, "mission_prompt": mission_prompt})
+                        search_results.append(f"=== Suchergebnisse {i} ===\n{str(res)}")
+                    except Exception as e:
+                        search_results.append(f"=== Suchanfrage {i} - Fehler ===\n{e}")
+
+                tool_output = "\n\n".join(search_results)
+            else:
+                tool_output = "Google-Search-Tool nicht verfügbar oder keine Suchanfragen generiert."
+        # Gleiche Suchergebnis-Mengen und Seiten -> Report des letzten Laufs übernehmen
+        previous = inputs.previous_result()
+        if previous is not None:
+            return previous
 
         # 4. Verarbeite die Ergebnisse mit dem LLM
-        llm_output = invoke_llm(
-            system_prompt=research_prompt_news_wo_tools,
-            user_message=tool_output,
-            model="gpt-4o-mini",
-            llm_provider="openai",
-        )
-        report = Report(title="News", content=llm_output, is_markdown=True)
-        return {"reports": [report], "sektion_news": llm_output}
+        llm_output = invoke_llm(**_news_call(tool_output))
+        return inputs.save(_news_result(llm_output))
+
+    @staticmethod
+    async def apillar_news(state: GraphState):
+        print(Fore.YELLOW + "----- Säule: News (async) -----\n" + Style.RESET_ALL)
+        mission_prompt = _news_mission(state)
+        suchanfragen = _parse_queries(await apage_summary(
+            NEWS_QUERIES_KIND, mission_prompt, lambda: ainvoke_llm(**_query_writer_call(mission_prompt))
+        ))
+
+        # Alle Suchanfragen gleichzeitig ausführen
+        with pillar_inputs("news", mission_prompt) as inputs:
+            if suchanfragen:
+                with tool_deadline():
+                    results = await asyncio.gather(
+                        *(agoogle_search_tool(query, mission_prompt) for query in suchanfragen), return_exceptions=True
+                    )
+                tool_output = "\n\n".join(
+                    f"=== Suchanfrage {i} - Fehler ===\n{res}" if isinstance(res, Exception) else f"=== Suchergebnisse {i} ===\n{res}"
+                    for i, res in enumerate(results, 1)
+                )
+            else:
+                tool_output = "Google-Search-Tool nicht verfügbar oder keine Suchanfragen generiert."
+        previous = await asyncio.to_thread(inputs.previous_result)
+        if previous is not None:
+            return previous
+
+        llm_output = await ainvoke_llm(**_news_call(tool_output))
+        return await asyncio.to_thread(inputs.save, _news_result(llm_output))
 
     def run_deterministic_workflow(self, state: GraphState):
         print(Fore.YELLOW + "===== Starte deterministischen Outreach-Workflow =====\n" + Style.RESET_ALL)
+        # Wiederholte Säulen-Aufrufe nutzen die bereits abgerufenen Suchen/Seiten des Laufs
+        with artifact_run("deterministischer Workflow"):
+            return self._run_deterministic_pillars(state)
+
+    def _run_deterministic_pillars(self, state: GraphState):
         reports: List[Report] = []
 
         # 1) Unternehmensinformationen
@@ -332,4 +320,189 @@ def _regex_extract_plz(address: str) -> str:
         return plz_match.group(1)
     
     return ""
-    
\ No newline at end of file
+
+
+def _company_query(state: GraphState, section: str) -> str:
+    company_name = state.get("company_data", CompanyData()).name
+    plz = _regex_extract_plz(state.get("current_lead").address if state.get("current_lead") else "")
+    if not (company_name and plz):
+        raise ValueError(f"Fehlende Daten: Firmenname und Postleitzahl benötigt für {section}.")
+    return f"{company_name} AND {plz}"
+
+
+def _linkedin_query(state: GraphState) -> str:
+    lead_name = state.get("current_lead").name if state.get("current_lead") else ""
+    company_name = state.get("company_data", CompanyData()).name
+    plz = _regex_extract_plz(state.get("current_lead").address if state.get("current_lead") else "")
+    if not (lead_name and plz):
+        raise ValueError("Fehlende Daten: Lead-Name und Postleitzahl benötigt für LinkedIn.")
+
+    if company_name:
+        return f"site:linkedin.com ({lead_name} AND {plz} OR {company_name})"
+    return f"{lead_name} AND {plz}"
+
+
+def _invoke_linkedin_tool(query: str) -> str:
+    return str(linkedin_scrape_tool.invoke({"query": query}))
+
+
+def _run_tool(tool_fn, query: str, label: str) -> str:
+    """Ruft ein (synchrones) Recherche-Tool auf; Fehler landen als Text im Rechercheergebnis.
+    Das Tool endet vor der Deadline des Laufs, damit die Auswertung durch das LLM noch Zeit hat."""
+    if not tool_fn:
+        return f"{label} nicht verfügbar."
+    with tool_deadline():
+        if deadline_expired():
+            note_trimmed(f"{label} ausgelassen")
+            return f"{label} ausgelassen (Zeitbudget erschöpft)."
+        try:
+            res = tool_fn(query)
+            return getattr(res, "content", str(res))
+        except Exception as e:
+            return f"{label} Fehler: {e}"
+
+
+# --- LLM-Aufrufe der Säulen (Argumente für invoke_llm / ainvoke_llm) ---
+
+def _raise_errors(results: list) -> list:
+    """Ergebnisse von gather_llm; der erste fehlgeschlagene Aufruf bricht die Säule wie bisher ab."""
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+
+def _research_call(tool_output: str, target_information: str) -> dict:
+    return dict(
+        system_prompt=research_prompt_unternehmensidentifikation,
+        user_message=f"Rechercheergebnisse: {tool_output} \n Mission Prompt: {target_information} ",
+        model="gpt-4o-mini",
+        llm_provider="openai-agent",
+    )
+
+
+def _finanzen_call(tool_output: str) -> dict:
+    return dict(
+        system_prompt=research_prompt_finanzen,
+        user_message=f"Rechercheergebnisse: {tool_output} \n Mission Prompt: {FINANZEN_KENNZAHLEN} ",
+        model="gpt-4o-mini",
+        llm_provider="openai-agent",
+    )
+
+
+def _linkedin_call(tool_output: str) -> dict:
+    return dict(system_prompt=research_prompt_lead, user_message=tool_output, model="gpt-4.1-mini", llm_provider="openai")
+
+
+# Suchanfragen des Query Writers werden je Mission gespeichert (wie Seiten-Zusammenfassungen): erneute Läufe
+# sparen den LLM-Aufruf und suchen mit denselben Anfragen, sodass die News-Säule wiederverwendet werden kann
+NEWS_QUERIES_KIND = "news_queries"
+
+
+def _query_writer_call(mission_prompt: str) -> dict:
+    return dict(system_prompt=query_writer_prompt, user_message=mission_prompt, model="gpt-4o-mini", llm_provider="openai")
+
+
+def _news_call(tool_output: str) -> dict:
+    return dict(system_prompt=research_prompt_news_wo_tools, user_message=tool_output, model="gpt-4o-mini", llm_provider="openai")
+
+
+def _news_mission(state: GraphState) -> str:
+    company_name = state.get("company_data", CompanyData()).name
+    plz = _regex_extract_plz(state.get("current_lead").address if state.get("current_lead") else "")
+    if not (company_name and plz):
+        raise ValueError("Fehlende Daten: Firmenname und Postleitzahl benötigt für News.")
+
+    company_input = f"Unternehmensname: {company_name}\nPostleitzahl: {plz}\n"
+    mission_input = f"""Mission der Recherche: Die Mission der Recherche ist es, aktuelle Nachrichten über das Unternehmen {company_name} zu identifizieren und gezielt auffindbar zu machen.
+Im Fokus stehen dabei insbesondere folgende Nachrichtenthemen:
+
+- Veränderungen im Management oder Geschäftsführerwechsel
+- Strategische Investitionen
+- Kooperationen und Partnerschaften
+- Akquisitionen und Unternehmensübernahmen"""
+    return f"{company_input}\n{mission_input}"
+
+
+def _parse_queries(query_writer_output: str) -> List[str]:
+    # Parse die 3 Suchanfragen aus der LLM-Antwort
+    suchanfragen = [line.strip() for line in query_writer_output.strip().split('\n') if line.strip()][:3]
+    print(f"Generierte Suchanfragen: {suchanfragen}")
+    return suchanfragen
+
+
+# --- Ergebnisse der Säulen ---
+
+def _unternehmensinformationen_result(llm_output_1: str, llm_output_2: str) -> dict:
+    print(f"Finaler Report Unternehmensinformationen_1: {llm_output_1}")
+    print(f"Finaler Report Unternehmensinformationen_2: {llm_output_2}")
+    report_1 = Report(title="Unternehmensinformationen_1", content=llm_output_1, is_markdown=True)
+    report_2 = Report(title="Unternehmensinformationen_2", content=llm_output_2, is_markdown=True)
+    return {"reports": [report_1, report_2], "sektion_unternehmensinformationen": [llm_output_1, llm_output_2]}
+
+
+def _services_materials_result(llm_output_1: str, llm_output_2: str) -> dict:
+    print(f"Finaler Report Unternehmensinformationen_services_materials: {llm_output_1}")
+    print(f"Finaler Report Unternehmensinformationen_services_materials: {llm_output_2}")
+    report_1 = Report(title="Unternehmensinformationen_services_materials_1", content=llm_output_1, is_markdown=True)
+    report_2 = Report(title="Unternehmensinformationen_services_materials_2", content=llm_output_2, is_markdown=True)
+    return {"reports": [report_1, report_2], "sektion_unternehmensinformationen_services_materials": [llm_output_1, llm_output_2]}
+
+
+def _finanzen_result(llm_output: str) -> dict:
+    print(f"Finaler Report Finanzen: {llm_output}")
+    report = Report(title="Finanzen", content=llm_output, is_markdown=True)
+    return {"reports": [report], "sektion_finanzen": llm_output}
+
+
+def _linkedin_result(llm_output: str) -> dict:
+    print(f"Finaler Report LinkedIn: {llm_output}")
+    report = Report(title="LinkedIn", content=llm_output, is_markdown=True)
+    return {"reports": [report], "sektion_linkedin": llm_output}
+
+
+def _news_result(llm_output: str) -> dict:
+    report = Report(title="News", content=llm_output, is_markdown=True)
+    return {"reports": [report], "sektion_news": llm_output}
+
+
+def _profile_call(tool_output: str) -> dict:
+    return dict(
+        system_prompt=research_prompt_unternehmensprofil_structured,
+        user_message=f"Rechercheergebnisse: {tool_output}",
+        model="gpt-4o-mini",
+        # Extraktion wie bisher bei niedriger Temperatur (openai wäre 1)
+        llm_provider="openai-structured",
+        response_format=CompanyProfile,
+    )
+
+
+def _extract_company_profile(tool_output: str) -> CompanyProfile:
+    """Ein strukturierter LLM-Aufruf für alle Target-Informationen der Unternehmensinformationen."""
+    return invoke_llm(**_profile_call(tool_output))
+
+
+async def _aextract_company_profile(tool_output: str) -> CompanyProfile:
+    return await ainvoke_llm(**_profile_call(tool_output))
+
+
+def _render_company_profile(profile: CompanyProfile):
+    """Rendert das Profil in die zwei bisherigen Report-Abschnitte (Markdown):
+    (Mitarbeiteranzahl/Branche/Unternehmensart, Dienstleistungen/Materialien).
+    Leere Felder werden weggelassen, ein Abschnitt ohne Informationen bleibt leer."""
+    def section(lines):
+        lines = [f"- **{label}:** {value}" for label, value in lines if value]
+        if lines and profile.sources:
+            lines.append(f"- **Quellen:** {', '.join(profile.sources)}")
+        return "\n".join(lines)
+
+    stammdaten = section([
+        ("Mitarbeiteranzahl", profile.employee_count),
+        ("Branche", profile.industry.strip()),
+        ("Unternehmensart", profile.company_type.strip()),
+    ])
+    angebot = section([
+        ("Dienstleistungen / Produkte", ", ".join(profile.services_products)),
+        ("Materialien", ", ".join(profile.materials)),
+    ])
+    return stammdaten, angebot
@@ -273,6 +273,25 @@ research_prompt_unternehmensidentifikation = """Du bist ein erfahrener Recherchi
 """
 
 
+research_prompt_unternehmensprofil_structured = """Du bist ein erfahrener Recherchierer. Deine Aufgabe ist es die Rechercheergebnisse zu analysieren und alle Target-Informationen in EINEM Durchgang zu sammeln.
+<task>
+### Aufgabe:
+**Rechercheergebnisse analysieren und auswerten**
+- Analysiere die bereitgestellten Rechercheergebnisse und fülle alle Felder des vorgegebenen Schemas:
+  - Mitarbeiteranzahl
+  - Branche
+  - Unternehmensart (Fertigungsunternehmen, Händler oder Dienstleister?)
+  - Dienstleistungen / Produkte
+  - Materialien (Welche Materialien werden verarbeitet?)
+- Ignoriere alle Informationen im Scrape, die nicht wichtig für die Target-Informationen sind (z.B. Werbung, irrelevante Navigationselemente, nicht themenbezogene Abschnitte).
+
+**Wichtig:**
+  - Sammle IMMER die aktuellsten Target-Informationen, außer es ist explizit vermerkt!
+  - Ist eine Target-Information nicht in den Rechercheergebnissen enthalten, lasse das Feld leer (leerer String, leere Liste bzw. null). Erfinde keine Werte!
+  - Es sollen nur unternehmensspezifische Daten gesammelt werden, nicht allgemeine Definitionen oder Brancheninformationen!
+</task>
+"""
+
 query_writer_prompt = """Du bist ein erfahrener News-Rechercheur und Experte darin, präzise und hochwertige Suchanfragen für die Google News Suche zu erstellen.
 
 ## Deine Rolle und dein Ziel
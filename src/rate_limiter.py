@@ -0,0 +1,104 @@
+"""
+Zentrale Rate-Limits je Provider (Token-Bucket mit QPS und Burst).
+Der Bucket-Zustand liegt in shared_state, gilt also für alle Threads und Worker-Prozesse.
+Ohne Last wird nicht gewartet; erst wenn der Burst aufgebraucht ist, wird auf die konfigurierte
+Rate gedrosselt. Konfiguration per ENV: RATE_LIMIT_<PROVIDER>_QPS / RATE_LIMIT_<PROVIDER>_BURST
+(QPS 0 = kein Limit).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from langchain_core.rate_limiters import BaseRateLimiter
+
+try:
+    from .shared_state import get_shared_state
+except ImportError:
+    from shared_state import get_shared_state
+
+# Provider -> (Requests pro Sekunde, Burst)
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    "openai": (8.0, 16.0),
+    "serper": (5.0, 10.0),
+    "brave": (1.0, 1.0),
+    "rapidapi_linkedin": (1.0, 2.0),
+    "firecrawl": (1.0, 2.0),
+}
+
+
+def _limit_from_env(provider: str) -> Tuple[float, float]:
+    qps, burst = DEFAULT_RATE_LIMITS.get(provider, (0.0, 1.0))
+    prefix = f"RATE_LIMIT_{provider.upper()}"
+    qps = float(os.environ.get(f"{prefix}_QPS", qps))
+    burst = float(os.environ.get(f"{prefix}_BURST", burst))
+    return qps, max(1.0, burst)
+
+
+class ProviderRateLimiter(BaseRateLimiter):
+    """Token-Bucket eines Providers. Kann direkt (acquire) oder als rate_limiter von
+    LangChain-Chatmodellen verwendet werden, die es vor jedem API-Request aufrufen."""
+
+    def __init__(self, provider: str, qps: Optional[float] = None, burst: Optional[float] = None):
+        default_qps, default_burst = _limit_from_env(provider)
+        self.provider = provider
+        self.qps = default_qps if qps is None else qps
+        self.burst = default_burst if burst is None else max(1.0, burst)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.waited_seconds = 0.0
+
+    def _reserve(self, blocking: bool = True) -> float:
+        """Entnimmt ein Token und liefert die Wartezeit bis zu seiner Freigabe. Ohne blocking wird nur ein
+        sofort verfügbares Token entnommen (ein erfolgloser Versuch kostet späteren Aufrufern nichts)."""
+        if self.qps <= 0:
+            return 0.0
+        delay = get_shared_state().take_token(f"bucket:{self.provider}", self.qps, self.burst, reserve=blocking)
+        if delay > 0 and not blocking:
+            return delay
+        with self._lock:
+            self.requests += 1
+            self.waited_seconds += delay
+        return delay
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        delay = self._reserve(blocking)
+        if delay > 0:
+            if not blocking:
+                return False
+            time.sleep(delay)
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        delay = await asyncio.to_thread(self._reserve, blocking)
+        if delay > 0:
+            if not blocking:
+                return False
+            await asyncio.sleep(delay)
+        return True
+
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """Prozessweiter Limiter je Provider (wird beim ersten Zugriff angelegt)."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ProviderRateLimiter(provider)
+        return _limiters[provider]
+
+
+def rate_limit(provider: str) -> None:
+    """Blockiert, bis ein Request an den Provider erlaubt ist."""
+    get_rate_limiter(provider).acquire()
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, float]]:
+    return {
+        name: {"qps": lim.qps, "burst": lim.burst, "requests": lim.requests, "waited_seconds": round(lim.waited_seconds, 3)}
+        for name, lim in _limiters.items()
+    }
@@ -0,0 +1,111 @@
+"""
+Ergebnis-Cache für komplette Graph-Läufe.
+Schlüssel: normalisierter Firmenname + PLZ (+ Lead-Name, falls personenbezogene Säulen laufen) +
+Pipeline-Version. Die Pipeline-Version ist ein Hash über Knoten, Graph, Prompts, Tools und die übrigen
+ergebnisrelevanten Module - jede Code- oder Prompt-Änderung macht alte Einträge automatisch ungültig.
+Einträge anderer Versionen (z.B. Prozesse mit anderen Säulen) laufen über ihre TTL ab.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .db import SQLiteDatabase, data_path
+from .lead_store import normalize_company_key
+
+RESULT_CACHE_TTL_SECONDS = int(os.environ.get("RESULT_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+_SRC_DIR = Path(__file__).resolve().parent
+_PIPELINE_SOURCES = [
+    "nodes.py", "graph.py", "structured_outputs.py", "utils.py", "token_budget.py", "fingerprints.py",
+    "deadline.py", "llm_cache.py", "prompts/*.py", "tools/*.py",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS graph_results (
+    company_key TEXT NOT NULL,
+    pipeline_version TEXT NOT NULL,
+    reports TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (company_key, pipeline_version)
+);
+CREATE INDEX IF NOT EXISTS idx_graph_results_expires ON graph_results(expires_at);
+"""
+
+
+def compute_pipeline_version() -> str:
+    """Hash über alle Quelldateien, die das Ergebnis eines Graph-Laufs bestimmen."""
+    digest = hashlib.sha256()
+    for pattern in _PIPELINE_SOURCES:
+        for path in sorted(_SRC_DIR.glob(pattern)):
+            digest.update(str(path.relative_to(_SRC_DIR)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+PIPELINE_VERSION = compute_pipeline_version()
+
+
+def result_key(company_name: str, plz: str, person: Optional[str] = None) -> Optional[str]:
+    """Firmen-Schlüssel (siehe normalize_company_key), bei personenbezogenen Reports ergänzt um den Lead-Namen."""
+    key = normalize_company_key(company_name, plz)
+    if key and person:
+        key = f"{key}|{' '.join(person.lower().split())}"
+    return key
+
+
+class ResultCache:
+    """Persistenter Cache der Reports eines Graph-Laufs je Unternehmen (bzw. Unternehmen + Person)."""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: int = RESULT_CACHE_TTL_SECONDS,
+                 pipeline_version: str = PIPELINE_VERSION):
+        self.ttl_seconds = ttl_seconds
+        self.pipeline_version = pipeline_version
+        self.db = SQLiteDatabase(path or data_path("result_cache.db"))
+        self.db.executescript(_SCHEMA)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, company_name: str, plz: str, person: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Liefert die gecachten Reports (serialisiert) oder None."""
+        key = result_key(company_name, plz, person)
+        if not (self.enabled and key):
+            return None
+        row = self.db.execute(
+            "SELECT reports FROM graph_results WHERE company_key = ? AND pipeline_version = ? AND expires_at > ?",
+            (key, self.pipeline_version, time.time()),
+        ).fetchone()
+        return json.loads(row["reports"]) if row else None
+
+    def put(self, company_name: str, plz: str, reports: List[Dict[str, Any]], person: Optional[str] = None) -> None:
+        key = result_key(company_name, plz, person)
+        if not (self.enabled and key):
+            return
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO graph_results (company_key, pipeline_version, reports, created_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, self.pipeline_version, json.dumps(reports, ensure_ascii=False), now, now + self.ttl_seconds),
+            )
+            # Abgelaufene Einträge nebenbei aufräumen; andere Pipeline-Versionen nur nach Alter, da Prozesse
+            # mit anderen Säulen denselben Cache nutzen können
+            conn.execute("DELETE FROM graph_results WHERE expires_at <= ?", (now,))
+
+    def invalidate(self, company_name: Optional[str] = None, plz: Optional[str] = None) -> int:
+        """Entfernt die Einträge eines Unternehmens (alle Versionen und Personen) bzw. ohne Firmennamen den ganzen Cache."""
+        if not company_name:
+            cur = self.db.execute("DELETE FROM graph_results")
+        else:
+            key = normalize_company_key(company_name, plz)
+            cur = self.db.execute(
+                "DELETE FROM graph_results WHERE company_key = ? OR substr(company_key, 1, ?) = ?",
+                (key, len(key or "") + 1, f"{key}|"),
+            )
+        return cur.rowcount
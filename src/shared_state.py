@@ -0,0 +1,122 @@
+"""
+Prozessübergreifender Zustand (SQLite) für den Betrieb mit mehreren Server-/Worker-Prozessen.
+Key-Value-Speicher mit Namespaces und optionaler TTL (Job-Status, robots.txt-Cache) sowie
+prozessübergreifende Mindestabstände und Token-Buckets für Requests (Rate-Limits).
+"""
+
+import json
+import threading
+import time
+from typing import Any, Optional
+
+try:
+    from .db import SQLiteDatabase, data_path
+except ImportError:
+    from db import SQLiteDatabase, data_path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_kv_expires ON kv(expires_at);
+CREATE TABLE IF NOT EXISTS rate_slots (
+    name TEXT PRIMARY KEY,
+    next_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS token_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Abgelaufene Einträge werden höchstens so oft gelöscht
+_PURGE_INTERVAL_SECONDS = 60
+
+
+class SharedState:
+    """Gemeinsamer Zustand aller Prozesse, die dieselbe Datenbankdatei verwenden."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.db = SQLiteDatabase(path or data_path("shared_state.db"))
+        self.db.executescript(_SCHEMA)
+        self._last_purge = 0.0
+
+    # --- Key-Value ---------------------------------------------------------
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        row = self.db.execute(
+            "SELECT value FROM kv WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Speichert einen JSON-serialisierbaren Wert; ohne TTL bleibt er bis zum Löschen erhalten."""
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        self.db.execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, ensure_ascii=False, default=str), expires_at),
+        )
+        if now - self._last_purge > _PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            self.db.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+
+    def delete(self, namespace: str, key: str) -> bool:
+        cur = self.db.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+        return cur.rowcount > 0
+
+    # --- Rate-Limits -------------------------------------------------------
+
+    def reserve_interval(self, name: str, min_interval: float) -> float:
+        """Reserviert den nächsten freien Zeitpunkt für einen Request, sodass zwischen zwei Requests
+        (über alle Prozesse) mindestens min_interval Sekunden liegen. Gibt die Wartezeit zurück."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT next_at FROM rate_slots WHERE name = ?", (name,)).fetchone()
+            slot = max(now, row["next_at"]) if row else now
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_slots (name, next_at) VALUES (?, ?)", (name, slot + min_interval)
+            )
+        return slot - now
+
+    def take_token(self, name: str, rate: float, burst: float, reserve: bool = True) -> float:
+        """Entnimmt ein Token aus dem Bucket (rate Tokens/s, höchstens burst Tokens gespeichert).
+        Ist der Bucket leer, wird das Token im Voraus reserviert (Bestand wird negativ);
+        zurückgegeben wird die Wartezeit bis zu seiner Freigabe. Mit reserve=False wird nur ein
+        sofort verfügbares Token entnommen, sonst bleibt der Bucket unverändert."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (name,)).fetchone()
+            tokens = min(burst, row["tokens"] + (now - row["updated_at"]) * rate) if row else burst
+            tokens -= 1
+            if tokens < 0 and not reserve:
+                return -tokens / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)", (name, tokens, now)
+            )
+        return -tokens / rate if tokens < 0 else 0.0
+
+    def wait_interval(self, name: str, min_interval: float) -> None:
+        """Wie reserve_interval, schläft aber selbst bis zum reservierten Zeitpunkt."""
+        delay = self.reserve_interval(name, min_interval)
+        if delay > 0:
+            time.sleep(delay)
+
+
+_shared_state: Optional[SharedState] = None
+_shared_state_lock = threading.Lock()
+
+
+def get_shared_state() -> SharedState:
+    """Prozessweite Instanz (wird beim ersten Zugriff angelegt)."""
+    global _shared_state
+    with _shared_state_lock:
+        if _shared_state is None:
+            _shared_state = SharedState()
+        return _shared_state
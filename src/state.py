@@ -1,5 +1,6 @@
+import time
 from pydantic import BaseModel, Field
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 from typing_extensions import TypedDict
 from operator import add
     
@@ -30,6 +31,24 @@ class CompanyData(BaseModel):
     website: str = ""
     social_media_links: SocialMediaLinks = SocialMediaLinks()
     
+class Deadline(BaseModel):
+    """Zeitbudget eines Graph-Laufs (absoluter Zeitpunkt, siehe deadline.py)"""
+    expires_at: float = Field(..., description="Unix-Zeitpunkt, bis zu dem der Lauf ein Ergebnis liefern soll")
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(expires_at=time.time() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.time())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def earlier(self, seconds: float) -> "Deadline":
+        return Deadline(expires_at=self.expires_at - seconds)
+    
 class GraphInputState(TypedDict):
     leads_ids: List[str]
 
@@ -44,4 +63,6 @@ class GraphState(TypedDict):
     custom_outreach_report_link: str
     personalized_email: str
     interview_script: str
-    number_leads: int
\ No newline at end of file
+    number_leads: int
+    deadline: Optional[Deadline]
+    known_fields: List[str]  # bereits bekannte Lead-Felder (z.B. employee_count), Säulen dafür entfallen
\ No newline at end of file
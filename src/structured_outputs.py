@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -10,4 +12,13 @@ class WebsiteData(BaseModel):
 
 class EmailResponse(BaseModel):
     subject: str = Field(description="An engaging subject line to encourage the lead to open the email.")
-    email: str = Field(description="The personalized email content tailored to the lead’s profile and company information.")
\ No newline at end of file
+    email: str = Field(description="The personalized email content tailored to the lead’s profile and company information.")
+
+
+class CompanyProfile(BaseModel):
+    employee_count: Optional[int] = Field(description="Anzahl der Mitarbeiter des Unternehmens, null falls unbekannt.")
+    industry: str = Field(description="Branche des Unternehmens, leer falls unbekannt.")
+    company_type: str = Field(description="Unternehmensart: Fertigungsunternehmen, Händler oder Dienstleister, leer falls unbekannt.")
+    services_products: List[str] = Field(description="Angebotene Dienstleistungen und Produkte des Unternehmens.")
+    materials: List[str] = Field(description="Vom Unternehmen verarbeitete Materialien.")
+    sources: List[str] = Field(description="URLs der Quellen, aus denen die Informationen stammen.")
@@ -0,0 +1,116 @@
+"""
+Token-Budgets für LLM-Eingaben.
+Statt Zeichenlimits zählen die Tools Tokens mit dem Tokenizer des Zielmodells (tiktoken, Encodings je
+Modell gecacht):
+- count(text) zählt die Tokens,
+- truncate(text, max_tokens) kürzt auf höchstens max_tokens,
+- fit(text, model, prompt=...) kürzt so, dass System-Prompt, Text und Antwort-Reserve ins
+  Kontextfenster passen,
+- chunks(text, chunk_tokens) teilt lange Texte in überlappende Teile.
+Ohne tiktoken bzw. ohne ladbares Encoding (z.B. offline) wird mit einer konservativen Schätzung
+(Zeichen je Token) gerechnet.
+"""
+
+import functools
+import os
+from typing import List, Optional
+
+DEFAULT_MODEL = "gpt-4o-mini"
+# Kontextfenster je Modell (Tokens); unbekannte Modelle: DEFAULT_CONTEXT_WINDOW
+CONTEXT_WINDOWS = {
+    "gpt-4o-mini": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4.1-mini": 1047576,
+    "gpt-4.1-nano": 1047576,
+    "gemini-1.5-flash": 1048576,
+}
+DEFAULT_CONTEXT_WINDOW = 128000
+# Für die Antwort freigehaltene Tokens
+OUTPUT_RESERVE_TOKENS = int(os.environ.get("OUTPUT_RESERVE_TOKENS", "4096"))
+# Schätzung ohne Tokenizer (deutsche Texte liegen meist bei 3.5-4.5 Zeichen je Token)
+_CHARS_PER_TOKEN = 3.5
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken-Encoding des Modells (bzw. o200k_base für unbekannte Modelle), None ohne Tokenizer."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        print(f"⚠️ Tokenizer für {model} nicht verfügbar ({e}) - schätze Tokens")
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"⚠️ Tokenizer für {model} nicht verfügbar ({e}) - schätze Tokens")
+        return None
+
+
+def context_window(model: str = DEFAULT_MODEL) -> int:
+    return CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+
+
+def count(text: Optional[str], model: str = DEFAULT_MODEL) -> int:
+    """Anzahl der Tokens von text für das Modell."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return int(len(text) / _CHARS_PER_TOKEN) + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate(text: Optional[str], max_tokens: int, model: str = DEFAULT_MODEL, marker: bool = False) -> str:
+    """Kürzt text auf höchstens max_tokens Tokens. Mit marker wird ein Hinweis auf die entfernten
+    Tokens angehängt (zählt nicht zum Budget)."""
+    if not text:
+        return ""
+    max_tokens = max(0, int(max_tokens))
+    # Jedes Token umfasst mindestens ein Zeichen
+    if len(text) <= max_tokens:
+        return text
+    encoding = _encoding(model)
+    if encoding is None:
+        limit = int(max_tokens * _CHARS_PER_TOKEN)
+        if len(text) <= limit:
+            return text
+        trimmed, removed = text[:limit], count(text[limit:], model)
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        trimmed, removed = encoding.decode(tokens[:max_tokens]), len(tokens) - max_tokens
+    return f"{trimmed}\n\n[Hinweis: Inhalt gekürzt, {removed} Tokens entfernt]" if marker else trimmed
+
+
+def fit(text: Optional[str], model: str = DEFAULT_MODEL, prompt: str = "", max_tokens: Optional[int] = None,
+        reserve_tokens: int = OUTPUT_RESERVE_TOKENS, marker: bool = False) -> str:
+    """Kürzt text so, dass prompt + text + Antwort-Reserve ins Kontextfenster des Modells passen
+    (und text höchstens max_tokens umfasst)."""
+    budget = context_window(model) - count(prompt, model) - reserve_tokens
+    if max_tokens is not None:
+        budget = min(budget, max_tokens)
+    return truncate(text, budget, model, marker=marker)
+
+
+def chunks(text: Optional[str], chunk_tokens: int, overlap_tokens: int = 0, model: str = DEFAULT_MODEL) -> List[str]:
+    """Teilt text in Teile zu höchstens chunk_tokens Tokens mit overlap_tokens Überlappung."""
+    if not text:
+        return []
+    step = max(1, chunk_tokens - overlap_tokens)
+    encoding = _encoding(model)
+    if encoding is None:
+        size, step = int(chunk_tokens * _CHARS_PER_TOKEN), int(step * _CHARS_PER_TOKEN)
+        return [text[start:start + size] for start in range(0, max(1, len(text) - size + step), step)]
+    tokens = encoding.encode(text, disallowed_special=())
+    return [
+        encoding.decode(tokens[start:start + chunk_tokens])
+        for start in range(0, max(1, len(tokens) - chunk_tokens + step), step)
+    ]
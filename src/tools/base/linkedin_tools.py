@@ -1,6 +1,8 @@
 import os
 import requests
 from src.utils import invoke_llm
+from src.rate_limiter import rate_limit
+from src.deadline import clamp_timeout
 
 def extract_linkedin_url_base(search_results):
     """
@@ -53,7 +55,8 @@ def scrape_linkedin(linkedin_url, is_company=False):
       "x-rapidapi-host": "fresh-linkedin-profile-data.p.rapidapi.com"
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    rate_limit("rapidapi_linkedin")
+    response = requests.get(url, headers=headers, params=querystring, timeout=clamp_timeout(None))
     if response.status_code == 200:
         data = response.json()
         return data
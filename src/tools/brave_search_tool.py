@@ -14,7 +14,14 @@ from langchain_core.tools import tool
 # --- Initialisierung (Annahme) ---
 openai_api_key = os.environ.get("OPENAI_API_KEY")
 brave_api_key = os.environ.get("BRAVESEARCH_API_KEY")
-llm = ChatOpenAI(model="gpt-4.1-mini", temperature=0.2)
+try:
+    from ..rate_limiter import get_rate_limiter, rate_limit
+    from ..llm_cache import cached_invoke
+except ImportError:
+    from rate_limiter import get_rate_limiter, rate_limit
+    from llm_cache import cached_invoke
+
+llm = ChatOpenAI(model="gpt-4.1-mini", temperature=0.2, rate_limiter=get_rate_limiter("openai"))
 
 # --- State Definition (Annahme) ---
 class ToolState(TypedDict):
@@ -71,7 +78,7 @@ Gib als Ergebnis ausschließlich den URL Link aus. Füge keine Erklärungen, Tit
 WICHTIG: IGNORIERE URL LINKS mit ".pdf" oder einen Verweis darauf, dass es sich um eine PDF Datei handelt!""")
         
         user_prompt = HumanMessage(content=state["messages"])
-        response = llm.invoke([system_prompt, user_prompt])
+        response = cached_invoke(llm, [system_prompt, user_prompt])
         return response
 
     def get_markdown_cleaner(state:ToolState) -> AIMessage:
@@ -136,7 +143,7 @@ Bereinigter Fließtext...
 **Antwort:** Erklärung...""")
         
         user_prompt = HumanMessage(content=state["messages"])
-        response = llm.invoke([system_prompt, user_prompt])
+        response = cached_invoke(llm, [system_prompt, user_prompt])
         return response
 
     def get_relevant_information(state: ToolState) -> AIMessage:
@@ -155,7 +162,7 @@ Deine Aufgabe ist es, den folgenden Inhalt eines Web-Scrapes sorgfältig zu anal
 Wichtig: Wenn der Web-Scrape Inhalt nichts mit dem Unternehmen aus der Benutzeranfrage zu tun hat, gebe ausschließlich folgendes als Ergebnis aus = "Zur 'Suchanfrage' konnte nichts relevantes gefunden werden.""")
         
         user_prompt = HumanMessage(content=state["messages"])
-        response = llm.invoke([system_prompt, user_prompt])
+        response = cached_invoke(llm, [system_prompt, user_prompt])
         return response
     
     def extract_and_format_links(text: str) -> List[Dict[str, str]]:
@@ -188,6 +195,7 @@ Wichtig: Wenn der Web-Scrape Inhalt nichts mit dem Unternehmen aus der Benutzera
 
         # --- Brave Search Suche durchführen --- #  
     try:
+        rate_limit("brave")
         response = requests.get(
             "https://api.search.brave.com/res/v1/web/search",
             headers={
@@ -18,7 +18,12 @@ openai_api_key = os.environ.get("OPENAI_API_KEY")
 google_api_key = os.environ.get("GOOGLESEARCH_API_KEY")
 serper_api_key = os.environ.get("SERPER_API_KEY")
 
-llm = ChatOpenAI(api_key=openai_api_key, model="gpt-4o-mini", temperature=0.1)
+try:
+    from ..rate_limiter import get_rate_limiter
+except ImportError:
+    from rate_limiter import get_rate_limiter
+
+llm = ChatOpenAI(api_key=openai_api_key, model="gpt-4o-mini", temperature=0.1, rate_limiter=get_rate_limiter("openai"))
 
 # Markdown-Tool primär nutzen, falls verfügbar
 try:
@@ -29,6 +34,26 @@ except Exception:
     except Exception:
         scrape_website_to_markdown = None  # type: ignore
 
+try:
+    from .serper_client import serper_search
+except Exception:
+    from tools.serper_client import serper_search
+
+try:
+    from ..concurrency import llm_slot, fetch_slot
+    from ..artifacts import run_cached, record_source
+    from ..fingerprints import page_summary
+    from ..deadline import clamp_llm, clamp_timeout, deadline_expired, note_trimmed
+    from ..llm_cache import cached_invoke
+    from ..token_budget import fit
+except ImportError:
+    from concurrency import llm_slot, fetch_slot
+    from artifacts import run_cached, record_source
+    from fingerprints import page_summary
+    from deadline import clamp_llm, clamp_timeout, deadline_expired, note_trimmed
+    from llm_cache import cached_invoke
+    from token_budget import fit
+
 class ToolState(TypedDict):
     messages: str
 
@@ -73,7 +98,7 @@ def extract_and_format_links(text: str) -> List[Dict[str, str]]:
 
 # --- Debug-Helfer ---
 DEBUG_SNIPPET_CHARS = int(os.environ.get("DEBUG_SNIPPET_CHARS", "1000"))
-MAX_LLM_INPUT_CHARS = int(os.environ.get("MAX_LLM_INPUT_CHARS", "120000"))
+MAX_LLM_INPUT_TOKENS = int(os.environ.get("MAX_LLM_INPUT_TOKENS", "30000"))
 
 
 def debug_print_snippet(label: str, text: str, max_chars: int = 1200) -> None:
@@ -89,15 +114,11 @@ def debug_print_snippet(label: str, text: str, max_chars: int = 1200) -> None:
         print(f"[DEBUG] Fehler beim Debug-Print für {label}: {e}")
 
 
-def trim_for_llm(text: str, max_chars: int = MAX_LLM_INPUT_CHARS) -> str:
+def trim_for_llm(text: str, max_tokens: int = MAX_LLM_INPUT_TOKENS) -> str:
     try:
         if not isinstance(text, str):
             return ""
-        if len(text) <= max_chars:
-            return text
-        trimmed = text[:max_chars]
-        removed = len(text) - max_chars
-        return f"{trimmed}\n\n[Hinweis: Inhalt gekürzt, {removed} Zeichen entfernt]"
+        return fit(text, llm.model_name, max_tokens=max_tokens, marker=True)
     except Exception:
         return text
 
@@ -131,6 +152,10 @@ def create_http_session() -> requests.Session:
     return session
 
 
+# Prozessweite Session: Verbindungen werden über Säulen, Leads und Batches hinweg wiederverwendet
+SESSION = create_http_session()
+
+
 def analyze_northdata_results(formatted_user_prompt: str, company: str) -> str:
     """
     Separate Node/Funktion für die LLM-Analyse der Northdata-Suchergebnisse.
@@ -157,7 +182,8 @@ def analyze_northdata_results(formatted_user_prompt: str, company: str) -> str:
     print("------------------------------------")
     
     user_prompt = HumanMessage(content=formatted_user_prompt)
-    llm_response = llm.invoke([system_prompt, user_prompt])
+    with llm_slot():
+        llm_response = cached_invoke(clamp_llm(llm), [system_prompt, user_prompt])
     
     return llm_response.content.strip()
 
@@ -245,7 +271,8 @@ Deine Aufgabe ist es, aus NorthData-Inhalten die wichtigsten Finanzkennzahlen un
 - etc.""")
             
     user_prompt = HumanMessage(content=state["messages"])
-    response = llm.invoke([system_prompt, user_prompt])
+    with llm_slot():
+        response = cached_invoke(clamp_llm(llm), [system_prompt, user_prompt])
     return response
 
 
@@ -372,6 +399,7 @@ def format_extracted_data_for_llm(extracted_data: Dict[str, any]) -> str:
 
 
 
+@run_cached("finance")
 def finance_scrape_tool(query: str) -> AIMessage:
     """Dieses Tool durchsucht Northdata nach Unternehmensinformationen."""
 
@@ -383,26 +411,7 @@ def finance_scrape_tool(query: str) -> AIMessage:
     print(f"Angepasste Suchanfrage für die API: {search_query}")
 
     try:
-        # Serper API erwartet POST mit JSON-Payload
-        payload = {
-            "q": search_query,
-            "location": "Germany",
-            "gl": "de",
-            "hl": "de",
-            "num": 8
-        }
-        
-        response = requests.post(
-            "https://google.serper.dev/search",
-            headers={
-                "Content-Type": "application/json",
-                "X-API-KEY": f"{serper_api_key}",
-            },
-            json=payload,
-            timeout=30,
-        )
-        response.raise_for_status()
-        search_results = response.json()
+        search_results = serper_search(search_query, num=8)
     except Exception as e:
         return AIMessage(content=f"Fehler bei der Google-Suche: {e}")
 
@@ -449,12 +458,16 @@ def finance_scrape_tool(query: str) -> AIMessage:
     try: 
         for url_dict in target_url:  # Verwende target_url direkt
             url_string = url_dict['url']
+            # Zeitbudget erschöpft: weitere URLs auslassen, bisherige Zusammenfassungen zurückgeben
+            if deadline_expired():
+                note_trimmed(f"Finanzquelle {url_string} ausgelassen")
+                continue
             print(f"Verarbeite URL: {url_string}")
 
             try:
                 markdown_content: str = ""
                 structured_data: Dict[str, any] = {}
-                session = create_http_session()
+                session = SESSION
 
                 # Primär: Markdown-Tool nutzen (außer für northdata.de)
                 is_northdata = False
@@ -479,7 +492,8 @@ def finance_scrape_tool(query: str) -> AIMessage:
                 # Fallback: klassische HTTP-GET + strukturierte Extraktion + lokale Markdown-Konvertierung
                 if not markdown_content:
                     print("[DEBUG] Fallback-Fetch: Session mit Retries und erhöhtem Timeout aktiv")
-                    response = session.get(url_string, timeout=(20, 60))
+                    with fetch_slot():
+                        response = session.get(url_string, timeout=clamp_timeout((20, 60)))
                     response.raise_for_status()
                     content = response.text
 
@@ -503,15 +517,19 @@ def finance_scrape_tool(query: str) -> AIMessage:
                         print(f"Fallback: Verwende Text/Markdown für {url_string}")
 
                     # Vor LLM-Call auf sichere Länge kürzen
-                    markdown_content = trim_for_llm(markdown_content, MAX_LLM_INPUT_CHARS)
+                    markdown_content = trim_for_llm(markdown_content, MAX_LLM_INPUT_TOKENS)
+                    record_source("page", url_string, markdown_content)
                     # Debug: Markdown aus Fallback/strukturiertem Pfad anzeigen
                     debug_print_snippet("MARKDOWN (prepared)", markdown_content, DEBUG_SNIPPET_CHARS)
 
-                # NODE 4: Relevante Informationen extrahieren
-                summary = get_relevant_information(ToolState(messages=markdown_content))
+                # NODE 4: Relevante Informationen extrahieren (je Seiten-Hash, auch laufübergreifend)
+                summary = page_summary(
+                    "finance_summary", markdown_content,
+                    lambda: get_relevant_information(ToolState(messages=markdown_content)).content,
+                )
                 all_summaries.append({
                     "url": url_string,
-                    "summary": summary.content,
+                    "summary": summary,
                     "structured_data": structured_data  # Zusätzliche strukturierte Daten für Debugging
                 })
                 print(f"Zusammenfassung erstellt für URL: {url_string}")
@@ -3,6 +3,13 @@ import requests
 from dotenv import load_dotenv
 import json
 
+try:
+    from ..rate_limiter import rate_limit
+    from ..deadline import clamp_timeout, deadline_expired
+except ImportError:
+    from rate_limiter import rate_limit
+    from deadline import clamp_timeout, deadline_expired
+
 load_dotenv()
 
 url = "https://www.fehrenbach-klaus.de/"
@@ -45,7 +52,8 @@ def firecrawl_tool(target_url: str) -> str:
         }
         
         # Crawl-Request senden
-        response = requests.post(api_url, json=payload, headers=headers)
+        rate_limit("firecrawl")
+        response = requests.post(api_url, json=payload, headers=headers, timeout=clamp_timeout(None))
         
         if response.status_code != 200:
             return f"Fehler: API-Request fehlgeschlagen mit Status {response.status_code}: {response.text}"
@@ -72,7 +80,11 @@ def firecrawl_tool(target_url: str) -> str:
         attempt = 0
         
         while attempt < max_attempts:
-            status_response = requests.get(status_url, headers=status_headers)
+            # Zeitbudget des Laufs erschöpft: nicht weiter auf den Crawl-Job warten
+            if deadline_expired():
+                return "Fehler: Crawl-Job nicht innerhalb des Zeitbudgets abgeschlossen"
+            rate_limit("firecrawl")
+            status_response = requests.get(status_url, headers=status_headers, timeout=clamp_timeout(None))
             
             if status_response.status_code != 200:
                 return f"Fehler beim Abrufen des Job-Status: {status_response.status_code}: {status_response.text}"
@@ -16,7 +16,19 @@ from langchain_core.tools import tool
 openai_api_key = os.environ.get("OPENAI_API_KEY")
 googlesearch_api_key = os.environ.get("GOOGLESEARCH_API_KEY")
 serper_api_key = os.environ.get("SERPER_API_KEY")
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+try:
+    from ..rate_limiter import get_rate_limiter
+    from ..llm_cache import cached_invoke
+    from ..token_budget import fit
+except ImportError:
+    from rate_limiter import get_rate_limiter
+    from llm_cache import cached_invoke
+    from token_budget import fit
+
+# Höchstzahl Tokens je gescrapter Seite für die Zusammenfassung
+SEARCH_PAGE_MAX_TOKENS = int(os.environ.get("SEARCH_PAGE_MAX_TOKENS", "4000"))
+
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, rate_limiter=get_rate_limiter("openai"))
 
 # Markdown-Tool optional einbinden
 try:
@@ -86,7 +98,7 @@ def google_search_tool(query: str, mission_prompt: str) -> str:
 - Gib als Ergebnis eine Liste von URLs aus, die du für am relevantesten hältst. Füge keine weiteren Erklärungen, Titel oder Formatierungen hinzu.""")
         
         user_prompt = HumanMessage(content=state["messages"])
-        response = llm.invoke([system_prompt, user_prompt])
+        response = cached_invoke(llm, [system_prompt, user_prompt])
         return response
     
 
@@ -109,12 +121,11 @@ Deine Aufgabe ist es, den bereitgestellten Inhalt eines Web-Scrapes zu analysier
 """
         )
         
-        # Eingabe begrenzen
-        limited = (state["messages"] or "").strip()
-        if len(limited) > 18000:
-            limited = limited[:12000]
+        # Eingabe auf das Token-Budget begrenzen
+        limited = fit((state["messages"] or "").strip(), llm.model_name, prompt=system_prompt.content,
+                      max_tokens=SEARCH_PAGE_MAX_TOKENS)
         user_prompt = HumanMessage(content=limited)
-        response = llm.invoke([system_prompt, user_prompt])
+        response = cached_invoke(llm, [system_prompt, user_prompt])
         return response
     
     def extract_and_format_links(text: str) -> List[Dict[str, str]]:
@@ -204,7 +215,7 @@ Deine Aufgabe ist es, den bereitgestellten Inhalt eines Web-Scrapes zu analysier
                         md_out = re.sub(r"\s+", " ", md_out).strip()
                     if isinstance(md_out, str) and md_out:
                         # Länge vor LLM begrenzen
-                        limited_md = md_out[:12000]
+                        limited_md = fit(md_out, llm.model_name, max_tokens=SEARCH_PAGE_MAX_TOKENS)
                         summarizer_response = get_relevant_information(ToolState(messages=limited_md, mission_prompt=mission_prompt))
                         summaries.append(f"## Inhalt: {u}\n\n{summarizer_response.content.strip()}")
                 except Exception as md_err:
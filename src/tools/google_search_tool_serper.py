@@ -1,21 +1,26 @@
 import os
 import re
+import asyncio
+import httpx
 import requests
 import json
 from typing_extensions import TypedDict, List, Dict, Union
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from markdownify import markdownify as md
-from bs4 import BeautifulSoup
 load_dotenv()
 
-from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
+from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.tools import tool
 
 # --- Initialisierung (Annahme) ---
 openai_api_key = os.environ.get("OPENAI_API_KEY")
 serper_api_key = os.environ.get("SERPER_API_KEY")
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+try:
+    from ..rate_limiter import get_rate_limiter
+except ImportError:
+    from rate_limiter import get_rate_limiter
+
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, rate_limiter=get_rate_limiter("openai"))
 
 # Markdown-Tool optional einbinden
 try:
@@ -26,73 +31,54 @@ except Exception:
     except Exception:
         scrape_website_to_markdown = None  # type: ignore
 
+try:
+    from .serper_client import serper_search, aserper_search
+except Exception:
+    from tools.serper_client import serper_search, aserper_search
+
+try:
+    from ..concurrency import llm_slot, allm_slot
+    from ..artifacts import run_cached, acached_artifact, artifact_key
+    from ..fingerprints import page_summary, apage_summary
+    from ..deadline import clamp_llm, deadline_expired, note_trimmed
+    from ..llm_cache import cached_invoke, acached_invoke
+    from ..token_budget import fit
+except ImportError:
+    from concurrency import llm_slot, allm_slot
+    from artifacts import run_cached, acached_artifact, artifact_key
+    from fingerprints import page_summary, apage_summary
+    from deadline import clamp_llm, deadline_expired, note_trimmed
+    from llm_cache import cached_invoke, acached_invoke
+    from token_budget import fit
+
+# Höchstzahl Tokens je gescrapter Seite für die Zusammenfassung
+SEARCH_PAGE_MAX_TOKENS = int(os.environ.get("SEARCH_PAGE_MAX_TOKENS", "4000"))
+
 # --- State Definition (Annahme) ---
 class ToolState(TypedDict):
     messages: str
     mission_prompt: str
 
 
-@tool
-def google_search_tool(query: str, mission_prompt: str) -> str:
-    """Google_Search_Tool: Verwende dieses Tool immer dann, wenn du im Web recherchieren und die Inhalte zu scrapen musst"""
-    
-    # Validierung der Eingabe
-    if not query or not query.strip():
-        return "Fehler: Leere Suchanfrage erhalten"
-    
-    def convert_html_to_markdown(html_content: str) -> str:
-        try:
-            # KORREKTUR: Entferne script und style Tags manuell vor der Markdown-Konvertierung
-            soup = BeautifulSoup(html_content, 'html.parser')
-            for script in soup(["script", "style"]):
-                script.decompose()
-            # Entferne auch Images mit data:-URIs und img-Tags
-            for img in soup.find_all("img"):
-                try:
-                    src = (img.get("src") or "").strip()
-                    if src.lower().startswith("data:"):
-                        img.decompose()
-                    else:
-                        img.decompose()  # Für LLM irrelevant
-                except Exception:
-                    pass
-            cleaned_html = str(soup)
-            
-            # Konvertiere HTML zu Markdown mit markdownify
-            markdown_content = md(
-                cleaned_html,
-                heading_style="ATX",  # Verwende # für Überschriften
-                convert=['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'a', 'ul', 'ol', 'li', 'strong', 'em', 'blockquote'],
-                escape_misc=False
-            )
-            # Normalisieren/trimmen
-            markdown_content = re.sub(r"\s+", " ", markdown_content).strip()
-            return markdown_content
-        except Exception as e:
-            print(f"Fehler bei HTML-zu-Markdown-Konvertierung: {e}")
-            return re.sub(r"\s+", " ", html_content).strip()  
-
-    ### --- Agenten --- ###
-    def get_url_picker(state: ToolState) -> AIMessage:
-        """Diese LLM Chain ist dafür verantwortlich, den richtigen URL Link auszuwählen."""
-        system_prompt = SystemMessage(content="""Du bist ein KI-gestützter Suchanalyst. Deine Aufgabe ist es, für eine gegebene Suchanfrage die relevantesten URLs zu identifizieren, die einen direkten Bezug zu einem Unternehmen haben.
+### --- Agenten (gemeinsam für sync und async) --- ###
+URL_PICKER_PROMPT = """Du bist ein KI-gestützter Suchanalyst. Deine Aufgabe ist es, für eine gegebene Suchanfrage die relevantesten URLs zu identifizieren, die einen direkten Bezug zu einem Unternehmen haben.
 
 **Regeln für die Auswahl:**
 
 - Wähle ausschließlich URLs aus, die einen direkten Zusammenhang mit dem Unternehmen aus der Suchanfrage haben. Der Unternehmensname oder ähnliche relevante Begriffe sollten im Titel oder im Snippet der Google-Suche vorkommen.
 - Bevorzuge offizielle Unternehmensseiten, öffentliche Register oder seriöse Branchenverzeichnisse.
 - Ignoriere alle URLs, die auf eine PDF-Datei verweisen.
-- Gib als Ergebnis eine Liste von URLs aus, die du für am relevantesten hältst. Füge keine weiteren Erklärungen, Titel oder Formatierungen hinzu.""")
-        
-        user_prompt = HumanMessage(content=state["messages"])
-        response = llm.invoke([system_prompt, user_prompt])
-        return response
-    
+- Gib als Ergebnis eine Liste von URLs aus, die du für am relevantesten hältst. Füge keine weiteren Erklärungen, Titel oder Formatierungen hinzu."""
+
+
+def url_picker_messages(state: ToolState) -> list:
+    """Diese LLM Chain ist dafür verantwortlich, den richtigen URL Link auszuwählen."""
+    return [SystemMessage(content=URL_PICKER_PROMPT), HumanMessage(content=state["messages"])]
 
-    def get_relevant_information(state: ToolState) -> AIMessage:
-        """Fasst die Inhalte der URL Links mit den relevanten Informationen über das Unternehmen zusammen."""
 
-        system_prompt = SystemMessage(content=f"""Du bist ein Experte für Informationsanalyse und -zusammenfassung.
+def relevant_information_messages(state: ToolState) -> list:
+    """Fasst die Inhalte der URL Links mit den relevanten Informationen über das Unternehmen zusammen."""
+    system_prompt = SystemMessage(content=f"""Du bist ein Experte für Informationsanalyse und -zusammenfassung.
 Deine Aufgabe ist es, den bereitgestellten Inhalt eines Web-Scrapes zu analysieren und eine prägnante Zusammenfassung zu erstellen.
 
 **Mission der Recherche:**
@@ -106,85 +92,88 @@ Deine Aufgabe ist es, den bereitgestellten Inhalt eines Web-Scrapes zu analysier
 
 **Wichtig:** Wenn der Web-Scrape keine Informationen enthält, die den Kriterien aus Anweisung 1 entsprechen, gib als einziges Ergebnis einen **leeren String** aus!
 """
-        )
-        
-        # Eingabe begrenzen
-        limited = (state["messages"] or "").strip()
-        if len(limited) > 18000:
-            limited = limited[:12000]
-        user_prompt = HumanMessage(content=limited)
-        response = llm.invoke([system_prompt, user_prompt])
-        return response
-    
-    def extract_and_format_links(text: str) -> List[Dict[str, str]]:
-        """
-        Extracts all URLs from a text string and formats them into a list of dictionaries.
-        """
-        if not isinstance(text, str):
-            return []
-        url_pattern = r"\bhttps?:\/\/[^\s<>\"']+"
-        extracted_urls = re.findall(url_pattern, text, re.IGNORECASE)
-        return [{"url": url} for url in extracted_urls]
+    )
+
+    # Eingabe auf das Token-Budget begrenzen
+    limited = fit((state["messages"] or "").strip(), llm.model_name, prompt=system_prompt.content,
+                  max_tokens=SEARCH_PAGE_MAX_TOKENS)
+    return [system_prompt, HumanMessage(content=limited)]
+
+
+def extract_and_format_links(text: str) -> List[Dict[str, str]]:
+    """
+    Extracts all URLs from a text string and formats them into a list of dictionaries.
+    """
+    if not isinstance(text, str):
+        return []
+    url_pattern = r"\bhttps?:\/\/[^\s<>\"']+"
+    extracted_urls = re.findall(url_pattern, text, re.IGNORECASE)
+    return [{"url": url} for url in extracted_urls]
+
+
+def _clean_results(search_results: dict) -> List[Dict[str, str]]:
+    """Bereinigt die organischen Ergebnisse für den URL-Picker LLM"""
+    # Debug-Ausgabe stark kürzen (keine Thumbnails/Base64 dumpen)
+    try:
+        preview = {
+            "search_information": search_results.get("searchInformation", {}),
+            "first_titles": [r.get("title") for r in (search_results.get("organic", []) or [])][:5]
+        }
+        print("--- GSearch Preview ---")
+        print(preview)
+        print("-----------------------")
+    except Exception:
+        pass
+
+    print("Google Search API erfolgreich")
+
+    cleaned_results = []
+    for item in search_results.get("organic", []):
+        if isinstance(item, dict):
+            cleaned_results.append({
+                "title": item.get("title"),
+                "link": item.get("link"),
+                "snippet": item.get("snippet")
+            })
+    return cleaned_results
+
+
+def _prepare_markdown(md_out) -> str:
+    if not isinstance(md_out, str):
+        return ""
+    # Länge vor LLM begrenzen
+    return fit(re.sub(r"\s+", " ", md_out).strip(), llm.model_name, max_tokens=SEARCH_PAGE_MAX_TOKENS)
+
+
+def _tool_key(query: str, mission_prompt: str) -> str:
+    return artifact_key(query, mission_prompt)
+
+
+@tool
+@run_cached("google_search", key=_tool_key)
+def google_search_tool(query: str, mission_prompt: str) -> str:
+    """Google_Search_Tool: Verwende dieses Tool immer dann, wenn du im Web recherchieren und die Inhalte zu scrapen musst"""
     
+    # Validierung der Eingabe
+    if not query or not query.strip():
+        return "Fehler: Leere Suchanfrage erhalten"
+
     # API-Schlüssel prüfen
     if not serper_api_key:
         return "Fehler: Umgebungsvariable 'SERPER_API_KEY' ist nicht gesetzt"
     
     try:
-        # Serper API erwartet POST mit JSON-Payload
-        payload = {
-            "q": query,
-            "location": "Germany",
-            "gl": "de",
-            "hl": "de",
-            "num": 8
-        }
-        
-        response = requests.post(
-            "https://google.serper.dev/search",
-            headers={
-                "Content-Type": "application/json",
-                "X-API-KEY": f"{serper_api_key}",
-            },
-            json=payload,
-            timeout=30,
-        )
-        response.raise_for_status()
-        search_results = response.json()
-
-        # Debug-Ausgabe stark kürzen (keine Thumbnails/Base64 dumpen)
-        try:
-            preview = {
-                "search_information": search_results.get("searchInformation", {}),
-                "first_titles": [r.get("title") for r in (search_results.get("organic", []) or [])][:5]
-            }
-            print("--- GSearch Preview ---")
-            print(preview)
-            print("-----------------------")
-        except Exception:
-            pass
-
-        print("Google Search API erfolgreich")
+        search_results = serper_search(query, num=8)
 
         # URL Picker verwenden, um relevante URLs zu identifizieren und PDFs zu filtern
-        organic_results = search_results.get("organic", [])
-        
-        # Bereinige Ergebnisse für den URL-Picker LLM
-        cleaned_results = []
-        for item in organic_results:
-            if isinstance(item, dict):
-                cleaned_results.append({
-                    "title": item.get("title"),
-                    "link": item.get("link"),
-                    "snippet": item.get("snippet")
-                })
-
+        cleaned_results = _clean_results(search_results)
         if not cleaned_results:
             return "Keine organischen Suchergebnisse gefunden."
         
         # LLM soll aus den JSON-Daten die besten URLs auswählen
         url_picker_input = json.dumps(cleaned_results, indent=2, ensure_ascii=False)
-        url_picker_response = get_url_picker(ToolState(messages=url_picker_input, mission_prompt=mission_prompt))
+        with llm_slot():
+            url_picker_response = cached_invoke(clamp_llm(llm), url_picker_messages(ToolState(messages=url_picker_input, mission_prompt=mission_prompt)))
         
         # Extrahiere die vom LLM ausgewählten URLs
         urls = [item['url'] for item in extract_and_format_links(url_picker_response.content)]
@@ -196,15 +185,19 @@ Deine Aufgabe ist es, den bereitgestellten Inhalt eines Web-Scrapes zu analysier
         if scrape_website_to_markdown is not None:
             summaries: List[str] = []
             for u in urls[:5]:  # begrenze auf die Top-5
+                # Zeitbudget erschöpft: weitere Suchergebnisse auslassen
+                if deadline_expired():
+                    note_trimmed(f"Suchergebnis {u} ausgelassen")
+                    continue
                 try:
-                    md_out = scrape_website_to_markdown(u)
-                    if isinstance(md_out, str):
-                        md_out = re.sub(r"\s+", " ", md_out).strip()
-                    if isinstance(md_out, str) and md_out:
-                        # Länge vor LLM begrenzen
-                        limited_md = md_out[:12000]
-                        summarizer_response = get_relevant_information(ToolState(messages=limited_md, mission_prompt=mission_prompt))
-                        summaries.append(f"## Inhalt: {u}\n\n{summarizer_response.content.strip()}")
+                    limited_md = _prepare_markdown(scrape_website_to_markdown(u))
+                    if limited_md:
+                        def summarize() -> str:
+                            with llm_slot():
+                                response = cached_invoke(clamp_llm(llm), relevant_information_messages(ToolState(messages=limited_md, mission_prompt=mission_prompt)))
+                            return response.content.strip()
+                        summary = page_summary("search_summary", [mission_prompt, limited_md], summarize)
+                        summaries.append(f"## Inhalt: {u}\n\n{summary}")
                 except Exception as md_err:
                     print(f"Markdown-Tool fehlgeschlagen für {u}: {md_err}")
             if summaries:
@@ -215,4 +208,58 @@ Deine Aufgabe ist es, den bereitgestellten Inhalt eines Web-Scrapes zu analysier
     except requests.RequestException as e:
         print(f"Google Search API fehlgeschlagen: {e}")
         return f"Fehler bei der Google Search API: {e}"
-        
\ No newline at end of file
+
+
+async def agoogle_search_tool(query: str, mission_prompt: str) -> str:
+    """Async-Variante von google_search_tool: Suche und LLM-Aufrufe ohne blockierten Thread,
+    die Top-URLs werden gleichzeitig gescrapt (Scraper im Thread) und zusammengefasst."""
+    if not query or not query.strip():
+        return "Fehler: Leere Suchanfrage erhalten"
+    if not serper_api_key:
+        return "Fehler: Umgebungsvariable 'SERPER_API_KEY' ist nicht gesetzt"
+
+    async def search() -> str:
+        try:
+            search_results = await aserper_search(query, num=8)
+        except httpx.HTTPError as e:
+            print(f"Google Search API fehlgeschlagen: {e}")
+            return f"Fehler bei der Google Search API: {e}"
+
+        cleaned_results = _clean_results(search_results)
+        if not cleaned_results:
+            return "Keine organischen Suchergebnisse gefunden."
+
+        url_picker_input = json.dumps(cleaned_results, indent=2, ensure_ascii=False)
+        async with allm_slot():
+            url_picker_response = await acached_invoke(clamp_llm(llm), url_picker_messages(ToolState(messages=url_picker_input, mission_prompt=mission_prompt)))
+        urls = [item['url'] for item in extract_and_format_links(url_picker_response.content)]
+        if not urls:
+            return "Keine relevanten URLs vom URL-Picker ausgewählt."
+        if scrape_website_to_markdown is None:
+            return "\n".join(urls)
+
+        async def summarize_url(u: str):
+            if deadline_expired():
+                note_trimmed(f"Suchergebnis {u} ausgelassen")
+                return None
+            try:
+                limited_md = _prepare_markdown(await asyncio.to_thread(scrape_website_to_markdown, u))
+                if not limited_md:
+                    return None
+
+                async def summarize() -> str:
+                    async with allm_slot():
+                        response = await acached_invoke(clamp_llm(llm), relevant_information_messages(ToolState(messages=limited_md, mission_prompt=mission_prompt)))
+                    return response.content.strip()
+                summary = await apage_summary("search_summary", [mission_prompt, limited_md], summarize)
+                return f"## Inhalt: {u}\n\n{summary}"
+            except Exception as md_err:
+                print(f"Markdown-Tool fehlgeschlagen für {u}: {md_err}")
+                return None
+
+        summaries = [s for s in await asyncio.gather(*(summarize_url(u) for u in urls[:5])) if s]
+        if summaries:
+            return "\n\n---\n\n".join(summaries)
+        return "\n".join(urls)
+
+    return await acached_artifact("google_search", _tool_key(query, mission_prompt), search)
@@ -1,5 +1,4 @@
 import os
-import requests
 import re 
 import json
 from dotenv import load_dotenv
@@ -14,7 +13,12 @@ from langchain_openai import ChatOpenAI
 openai_api_key = os.environ.get("OPENAI_API_KEY")
 google_api_key = os.environ.get("GOOGLESEARCH_API_KEY")
 serper_api_key = os.environ.get("SERPER_API_KEY")
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+try:
+    from ..rate_limiter import get_rate_limiter
+except ImportError:
+    from rate_limiter import get_rate_limiter
+
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, rate_limiter=get_rate_limiter("openai"))
 
 # Markdown-Tool optional einbinden
 try:
@@ -25,6 +29,20 @@ except Exception:
     except Exception:
         scrape_website_to_markdown = None  # type: ignore
 
+try:
+    from .serper_client import serper_search
+except Exception:
+    from tools.serper_client import serper_search
+
+try:
+    from ..concurrency import llm_slot
+    from ..deadline import clamp_llm
+    from ..llm_cache import cached_invoke
+except ImportError:
+    from concurrency import llm_slot
+    from deadline import clamp_llm
+    from llm_cache import cached_invoke
+
 # --- State Definition (Annahme) ---
 class ToolState(TypedDict):
     messages: str
@@ -55,7 +73,8 @@ Wenn unter den Ergebnissen kein passendes Profil zu finden ist, antworte mit: "K
         
         user_prompt = HumanMessage(content=state["messages"])
 
-        response = llm.invoke([system_prompt, user_prompt])
+        with llm_slot():
+            response = cached_invoke(clamp_llm(llm), [system_prompt, user_prompt])
         return response
 
 # === GEÄNDERTE SUCH ANFRAGE ===
@@ -64,26 +83,7 @@ Wenn unter den Ergebnissen kein passendes Profil zu finden ist, antworte mit: "K
     print(f"Angepasste Suchanfrage für die API: {search_query}")
 
     try:
-        # Serper API erwartet POST mit JSON-Payload
-        payload = {
-            "q": search_query,
-            "location": "Germany",
-            "gl": "de",
-            "hl": "de",
-            "num": 8
-        }
-        
-        response = requests.post(
-            "https://google.serper.dev/search",
-            headers={
-                "Content-Type": "application/json",
-                "X-API-KEY": f"{serper_api_key}",
-            },
-            json=payload,
-            timeout=30,
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = serper_search(search_query, num=8)
         print("Google Search erfolgreich")
     except Exception as e:
         return f"Fehler bei der Google-Suche: {e}"
@@ -11,7 +11,10 @@ from langchain_core.messages import AIMessage
 from langchain_core.tools import tool
 
 # TOKEN-LIMITING IMPORT
-from tools.token_limiter import truncate_content, count_tokens
+try:
+    from ..token_budget import count, truncate
+except ImportError:
+    from token_budget import count, truncate
 
 # --- State Definition (Annahme) ---
 class ToolState(TypedDict):
@@ -49,12 +52,12 @@ def linkup_search_tool(query: str) -> str:
         result_str = str(result)
         
         # TOKEN-LIMITING: Prüfe und begrenze die Antwort
-        token_count = count_tokens(result_str)
+        token_count = count(result_str)
         if token_count > 25000:
             print(f"⚠️ Linkup-Ergebnis zu lang ({token_count} tokens) - wird gekürzt")
-            result_str = truncate_content(result_str, max_tokens=12000)
+            result_str = truncate(result_str, 12000)
         
-        print(f"Linkup-Ergebnis: {count_tokens(result_str)} tokens")
+        print(f"Linkup-Ergebnis: {count(result_str)} tokens")
         return result_str
     except requests.exceptions.RequestException as e:
         return f"Fehler bei der Linkup-Suche: {str(e)}"
@@ -14,6 +14,15 @@ except Exception:
     class PlaywrightTimeoutError(Exception):
         pass
 
+try:
+    from ..concurrency import fetch_slot
+    from ..artifacts import run_cached, artifact_key, record_source
+    from ..deadline import check_deadline, clamp_timeout, deadline_expired, remaining_seconds
+except ImportError:
+    from concurrency import fetch_slot
+    from artifacts import run_cached, artifact_key, record_source
+    from deadline import check_deadline, clamp_timeout, deadline_expired, remaining_seconds
+
 
 def _create_retrying_session() -> requests.Session:
     retry_strategy = Retry(
@@ -30,6 +39,10 @@ def _create_retrying_session() -> requests.Session:
     return session
 
 
+# Prozessweite Session: Verbindungen werden über Säulen, Leads und Batches hinweg wiederverwendet
+SESSION = _create_retrying_session()
+
+
 def _fetch_html(url: str, max_bytes: int = 10 * 1024 * 1024, timeout: tuple = (10, 30)) -> str:
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.77 Safari/537.36",
@@ -37,8 +50,10 @@ def _fetch_html(url: str, max_bytes: int = 10 * 1024 * 1024, timeout: tuple = (1
         "Accept-Encoding": "gzip, deflate, br",
     }
 
-    session = _create_retrying_session()
-    resp = session.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+    session = SESSION
+    check_deadline(f"Seitenabruf {url}")
+    with fetch_slot():
+        resp = session.get(url, headers=headers, timeout=clamp_timeout(timeout), allow_redirects=True)
 
     if resp.status_code != 200:
         raise Exception(f"Failed to fetch the URL. Status code: {resp.status_code}")
@@ -82,7 +97,9 @@ def _render_with_playwright(url: str, max_time_s: int = 25) -> Optional[str]:
                 },
             )
             page = context.new_page()
-            timeout_ms = max_time_s * 1000
+            # Rendering höchstens bis zur Deadline des Laufs
+            remaining = remaining_seconds()
+            timeout_ms = int(min(max_time_s, remaining if remaining is not None else max_time_s) * 1000)
             page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
 
             # Versuche Cookie-/Consent-Dialoge zu schließen
@@ -303,6 +320,7 @@ def _extract_main_content(root: BeautifulSoup) -> str:
     return str(root)
 
 
+@run_cached("markdown", key=lambda url: artifact_key(url))
 def scrape_website_to_markdown(url: str) -> str:
     try:
         html_text = _fetch_html(url)
@@ -319,8 +337,9 @@ def scrape_website_to_markdown(url: str) -> str:
     low_text = _node_text_len(main_candidate) < 200
     js_hint = "javascript" in soup.get_text(" ", strip=True).lower()
 
-    if (low_text or js_hint):
-        rendered = _render_with_playwright(url)
+    if (low_text or js_hint) and not deadline_expired():
+        with fetch_slot():
+            rendered = _render_with_playwright(url)
         if rendered:
             soup = BeautifulSoup(rendered, "html.parser")
             main_candidate = _remove_boilerplate_and_select_main(soup)
@@ -407,4 +426,6 @@ def scrape_website_to_markdown(url: str) -> str:
         except Exception:
             markdown_content = ""
 
+    # Fingerprint über den extrahierten Inhalt (rohes HTML enthält oft wechselnde Tokens)
+    record_source("page", url, markdown_content)
     return markdown_content
\ No newline at end of file
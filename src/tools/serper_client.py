@@ -0,0 +1,93 @@
+import os
+import httpx
+import requests
+from dotenv import load_dotenv
+load_dotenv()
+
+try:
+    from ..concurrency import serper_slot, aserper_slot
+    from ..rate_limiter import rate_limit, get_rate_limiter
+    from ..artifacts import run_cached, acached_artifact, record_source
+    from ..deadline import check_deadline, clamp_timeout
+except ImportError:
+    from concurrency import serper_slot, aserper_slot
+    from rate_limiter import rate_limit, get_rate_limiter
+    from artifacts import run_cached, acached_artifact, record_source
+    from deadline import check_deadline, clamp_timeout
+
+serper_api_key = os.environ.get("SERPER_API_KEY")
+
+SERPER_URL = "https://google.serper.dev/search"
+
+# Prozessweite Session: Verbindungen zu Serper werden über Leads und Batches hinweg wiederverwendet
+SESSION = requests.Session()
+
+
+def _search_key(query: str, num: int = 8, timeout: int = 30) -> str:
+    return f"{num}:{' '.join(query.split()).casefold()}"
+
+
+def _record_results(query: str, num: int, data: dict) -> None:
+    # Fingerprint der Ergebnis-Menge (Links), Reihenfolge und Snippets spielen keine Rolle
+    links = sorted(r.get("link", "") for r in (data or {}).get("organic", []) if isinstance(r, dict))
+    record_source("serper", _search_key(query, num), links)
+
+
+def _payload(query: str, num: int) -> dict:
+    return {
+        "q": query,
+        "location": "Germany",
+        "gl": "de",
+        "hl": "de",
+        "num": num
+    }
+
+
+@run_cached("serper", key=_search_key)
+def serper_search(query: str, num: int = 8, timeout: int = 30) -> dict:
+    """Gemeinsamer Serper-Aufruf aller Tools (Google-Suche, Deutschland/Deutsch).
+    Innerhalb eines Lead-Laufs wird dieselbe Suche nur einmal ausgeführt (siehe artifacts.py).
+    Wirft requests.RequestException bei HTTP-Fehlern."""
+    # Serper API erwartet POST mit JSON-Payload
+    payload = _payload(query, num)
+    check_deadline(f"Serper-Suche '{query}'")
+
+    with serper_slot():
+        rate_limit("serper")
+        response = SESSION.post(
+            SERPER_URL,
+            headers={
+                "Content-Type": "application/json",
+                "X-API-KEY": f"{serper_api_key}",
+            },
+            json=payload,
+            timeout=clamp_timeout(timeout),
+        )
+    response.raise_for_status()
+    data = response.json()
+    _record_results(query, num, data)
+    return data
+
+
+async def aserper_search(query: str, num: int = 8, timeout: int = 30) -> dict:
+    """Async-Variante von serper_search (httpx). Teilt Artefakt-Speicher, Rate-Limit und
+    Concurrency-Limit mit der synchronen Variante. Wirft httpx.HTTPError bei HTTP-Fehlern."""
+    async def fetch() -> dict:
+        check_deadline(f"Serper-Suche '{query}'")
+        async with aserper_slot():
+            await get_rate_limiter("serper").aacquire()
+            async with httpx.AsyncClient(timeout=clamp_timeout(timeout)) as client:
+                response = await client.post(
+                    SERPER_URL,
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-API-KEY": f"{serper_api_key}",
+                    },
+                    json=_payload(query, num),
+                )
+        response.raise_for_status()
+        data = response.json()
+        _record_results(query, num, data)
+        return data
+
+    return await acached_artifact("serper", _search_key(query, num), fetch)
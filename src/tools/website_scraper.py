@@ -1,6 +1,5 @@
 import os
 import re
-import time
 import json
 import xmltodict
 import threading
@@ -24,7 +23,12 @@ from langchain_openai import ChatOpenAI
 openai_api_key = os.environ.get("OPENAI_API_KEY")
 google_api_key = os.environ.get("GOOGLESEARCH_API_KEY")
 serper_api_key = os.environ.get("SERPER_API_KEY")
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+try:
+    from ..rate_limiter import get_rate_limiter
+except ImportError:
+    from rate_limiter import get_rate_limiter
+
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, rate_limiter=get_rate_limiter("openai"))
 
 DEBUG = False
 USER_AGENT = "Mozilla/5.0 (compatible; CompanyScraper/1.0; +https://example.com/bot)"
@@ -57,6 +61,28 @@ except Exception:
     except Exception:
         scrape_website_to_markdown = None  # type: ignore
 
+try:
+    from .serper_client import serper_search
+except Exception:
+    from tools.serper_client import serper_search
+
+try:
+    from ..concurrency import llm_slot, fetch_slot, run_concurrently
+    from ..shared_state import get_shared_state
+    from ..artifacts import run_cached, artifact_key, record_source
+    from ..fingerprints import FallbackSummary, cached_page_summary
+    from ..deadline import clamp_llm, clamp_timeout, deadline_expired, note_trimmed
+    from ..llm_cache import cached_invoke
+    from ..token_budget import chunks, count, fit
+except ImportError:
+    from concurrency import llm_slot, fetch_slot, run_concurrently
+    from shared_state import get_shared_state
+    from artifacts import run_cached, artifact_key, record_source
+    from fingerprints import FallbackSummary, cached_page_summary
+    from deadline import clamp_llm, clamp_timeout, deadline_expired, note_trimmed
+    from llm_cache import cached_invoke
+    from token_budget import chunks, count, fit
+
 
 def _build_session() -> requests.Session:
     s = requests.Session()
@@ -81,18 +107,11 @@ def _build_session() -> requests.Session:
     return s
 
 SESSION = _build_session()
-RATE_LOCK = threading.Lock()
-LAST_REQUEST_TS: float = 0.0
 
 
 def _rate_sleep():
-    global LAST_REQUEST_TS
-    with RATE_LOCK:
-        now = time.time()
-        dt = now - LAST_REQUEST_TS
-        if dt < RATE_SLEEP_SECONDS:
-            time.sleep(RATE_SLEEP_SECONDS - dt)
-        LAST_REQUEST_TS = time.time()
+    # Mindestabstand gilt über alle Threads und Prozesse (gemeinsamer Zustand in SQLite)
+    get_shared_state().wait_interval("website_scraper", RATE_SLEEP_SECONDS)
 
 # --------------------------------------------------------------------------------------
 # URL Normalisierung & Domain-Utilities
@@ -124,9 +143,36 @@ def same_domain(base: str, candidate: str) -> bool:
 # --------------------------------------------------------------------------------------
 # robots.txt Handling (Cache) & Allowance Checks
 # --------------------------------------------------------------------------------------
+# Prozesslokaler Cache vor dem gemeinsamen Cache (robots.txt-Inhalte für alle Prozesse, ROBOTS_TTL_SECONDS)
 _RP_CACHE: Dict[str, RobotFileParser] = {}
 _RP_LOCK = threading.Lock()
+ROBOTS_TTL_SECONDS = 24 * 3600
+
 
+def _fetch_robots(robots_url: str) -> Dict[str, object]:
+    """Lädt robots.txt; Ergebnis als {'status': int, 'text': str} (status 0 = nicht erreichbar)."""
+    try:
+        _rate_sleep()
+        with fetch_slot():
+            r = SESSION.get(robots_url, timeout=clamp_timeout(10))
+        return {"status": r.status_code, "text": r.text if r.ok else ""}
+    except Exception:
+        return {"status": 0, "text": ""}
+
+
+def _build_robot_parser(robots: Dict[str, object]) -> RobotFileParser:
+    # Gleiche Semantik wie RobotFileParser.read()
+    rp = RobotFileParser()
+    status = int(robots.get("status") or 0)
+    if status in (401, 403):
+        rp.disallow_all = True
+    elif status >= 400 or status == 0:
+        # Fehlende oder nicht erreichbare robots.txt -> lieber erlauben
+        rp.allow_all = True
+    else:
+        rp.parse(str(robots.get("text") or "").splitlines())
+    rp.modified()
+    return rp
 
 
 def get_robot_parser(base_url: str) -> RobotFileParser:
@@ -135,17 +181,15 @@ def get_robot_parser(base_url: str) -> RobotFileParser:
         rp = _RP_CACHE.get(key)
         if rp:
             return rp
-        rp = RobotFileParser()
-        robots_url = urljoin(key + "/", "robots.txt")
-        try:
-            _rate_sleep()
-            rp.set_url(robots_url)
-            rp.read()
-        except Exception:
-            # Bei Fehlern lieber erlauben
-            pass
+    shared = get_shared_state()
+    robots = shared.get("robots", key)
+    if robots is None:
+        robots = _fetch_robots(urljoin(key + "/", "robots.txt"))
+        shared.set("robots", key, robots, ttl_seconds=ROBOTS_TTL_SECONDS)
+    rp = _build_robot_parser(robots)
+    with _RP_LOCK:
         _RP_CACHE[key] = rp
-        return rp
+    return rp
 
 
 
@@ -186,26 +230,7 @@ def select_company_homepage_from_brave(query: str) -> Optional[str]:
         return "Fehler: Umgebungsvariable 'SERPER_API_KEY' ist nicht gesetzt"
 
     try:
-        # Serper API erwartet POST mit JSON-Payload
-        payload = {
-            "q": query,
-            "location": "Germany",
-            "gl": "de",
-            "hl": "de",
-            "num": 8
-        }
-        
-        response = requests.post(
-            "https://google.serper.dev/search",
-            headers={
-                "Content-Type": "application/json",
-                "X-API-KEY": f"{serper_api_key}",
-            },
-            json=payload,
-            timeout=30,
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = serper_search(query, num=8)
     except Exception:
         return None
 
@@ -294,7 +319,8 @@ def find_sitemaps(base_url: str) -> List[str]:
         robots_url = urljoin(base_url + "/", "robots.txt")
         if robots_allowed(base_url, robots_url):
             _rate_sleep()
-            rr = SESSION.get(robots_url, timeout=(3, 10))
+            with fetch_slot():
+                rr = SESSION.get(robots_url, timeout=clamp_timeout((3, 10)))
             if rr.status_code == 200:
                 for line in rr.text.splitlines():
                     if line.lower().startswith("sitemap:"):
@@ -393,6 +419,9 @@ def filter_relevant_sitemaps(sitemaps: List[dict]) -> List[dict]:
 def iter_sitemap_locs(url: str, depth: int = 0, max_depth: int = SITEMAP_MAX_DEPTH) -> List[str]:
     if depth > max_depth:
         return []
+    if deadline_expired():
+        note_trimmed(f"Sitemap {url} ausgelassen")
+        return []
     try:
         _rate_sleep()
         # Explizit GZIP-Dekomprimierung aktivieren durch Accept-Encoding Header
@@ -401,7 +430,8 @@ def iter_sitemap_locs(url: str, depth: int = 0, max_depth: int = SITEMAP_MAX_DEP
             'Accept-Encoding': 'gzip, deflate, br',
             'User-Agent': USER_AGENT
         }
-        r = SESSION.get(url, timeout=(3, 10), headers=headers)
+        with fetch_slot():
+            r = SESSION.get(url, timeout=clamp_timeout((3, 10)), headers=headers)
         r.raise_for_status()
         
         if DEBUG:
@@ -510,6 +540,8 @@ def iter_sitemap_locs(url: str, depth: int = 0, max_depth: int = SITEMAP_MAX_DEP
             loc = (u or {}).get("loc")
             if loc:
                 locs.append(loc)
+        # Fingerprint: URLs samt lastmod (Änderungsdatum laut Sitemap)
+        record_source("sitemap", url, sorted((u or {}).get("loc", "") + "|" + str((u or {}).get("lastmod", "")) for u in uitems))
     return locs
 
 
@@ -788,55 +820,64 @@ def extract_text(html: str) -> str:
 
 
 
-def summarize_text(text: str) -> str:              # LLM-Call für Zusammenfassung des Website Inhalts
-    # Sicherheitsbegrenzungen für Eingabelänge
-    MAX_INPUT_CHARS = 50000
-    CHUNK_SIZE = 5000
-    OVERLAP = 200
-
-    def _chunk_text(t: str) -> List[str]:
-        if len(t) <= CHUNK_SIZE:
-            return [t]
-        chunks: List[str] = []
-        start = 0
-        while start < len(t):
-            end = min(len(t), start + CHUNK_SIZE)
-            chunks.append(t[start:end])
-            if end == len(t):
-                break
-            start = end - OVERLAP
-        return chunks
+# Token-Budget der Zusammenfassung: längere Seiten werden in Teilen zusammengefasst
+SUMMARY_MAX_INPUT_TOKENS = int(os.environ.get("SUMMARY_MAX_INPUT_TOKENS", "12000"))
+SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", "1500"))
+SUMMARY_CHUNK_OVERLAP_TOKENS = 50
+# Gleichzeitig zusammengefasste Teile einer Seite (global begrenzt weiterhin llm_slot)
+SUMMARY_MAX_CONCURRENCY = int(os.environ.get("SUMMARY_MAX_CONCURRENCY", "4"))
+
 
+# Zusammenfassung je Seiten-Hash: unveränderte Seiten werden auch laufübergreifend nicht erneut zusammengefasst
+@cached_page_summary("website_summary")
+def summarize_text(text: str) -> str:              # LLM-Call für Zusammenfassung des Website Inhalts
     # Text vorverarbeiten/trimmen
     base_text = re.sub(r"\s+", " ", (text or "")).strip()
     if not base_text:
         return ""
 
     # Wenn sehr lang: in Teile zusammenfassen und anschließend eine Meta-Zusammenfassung bilden
-    if len(base_text) > MAX_INPUT_CHARS:
-        parts = _chunk_text(base_text)
-        partial_summaries: List[str] = []
-        for idx, part in enumerate(parts, 1):
-            try:
-                system_prompt = SystemMessage(content=(
+    if count(base_text, llm.model_name) > SUMMARY_MAX_INPUT_TOKENS:
+        parts = chunks(base_text, SUMMARY_CHUNK_TOKENS, SUMMARY_CHUNK_OVERLAP_TOKENS, llm.model_name)
+        system_prompt = SystemMessage(content=(
 """Du bist ein Experte für Unternehmensrecherche. Fasse präzise nur relevante Fakten zusammen.
 Wenn vorhanden, fokussiere: 1) Geschäftsführung/Leitung, 2) Leistungen/Produkte, 3) Teamgröße, 4) LinkedIn, 5) Impressum/Kontakt."""
-                ))
-                user_prompt = HumanMessage(content=part)
-                resp = llm.invoke([system_prompt, user_prompt])
-                partial_summaries.append(resp.content.strip())
-            except Exception:
-                partial_summaries.append(part[:1500])
+        ))
+
+        def summarize_part(part: str) -> Optional[str]:
+            # Zeitbudget erschöpft: Teil nicht mehr zusammenfassen
+            if deadline_expired():
+                return None
+            with llm_slot():
+                resp = cached_invoke(clamp_llm(llm), [system_prompt, HumanMessage(content=part)])
+            return resp.content.strip()
+
+        # Teile sind unabhängig und werden gleichzeitig zusammengefasst (Reihenfolge bleibt erhalten)
+        results = run_concurrently(
+            [lambda part=part: summarize_part(part) for part in parts], SUMMARY_MAX_CONCURRENCY
+        )
+        skipped = sum(1 for r in results if r is None)
+        if skipped:
+            note_trimmed(f"{skipped} von {len(parts)} Textteilen nicht zusammengefasst")
+        partial_summaries: List[str] = [
+            part[:1500] if isinstance(r, Exception) else r for part, r in zip(parts, results) if r is not None
+        ]
         # Meta-Zusammenfassung der Teilzusammenfassungen
         try:
             system_prompt2 = SystemMessage(content=(
 """Fasse die folgenden Teilsummaries zu einer kurzen, strukturierten Übersicht zusammen (nur Fakten, keine Wiederholungen)."""
             ))
-            user_prompt2 = HumanMessage(content="\n\n".join(partial_summaries)[:MAX_INPUT_CHARS])
-            resp2 = llm.invoke([system_prompt2, user_prompt2])
+            user_prompt2 = HumanMessage(content=fit("\n\n".join(partial_summaries), llm.model_name,
+                                                    prompt=system_prompt2.content,
+                                                    max_tokens=SUMMARY_MAX_INPUT_TOKENS))
+            with llm_slot():
+                resp2 = cached_invoke(clamp_llm(llm), [system_prompt2, user_prompt2])
+            # Enthält Rohtext fehlgeschlagener Teile -> nicht laufübergreifend speichern
+            if any(isinstance(r, Exception) for r in results):
+                return FallbackSummary(resp2.content)
             return resp2.content
         except Exception:
-            return "\n\n".join(partial_summaries)[:2000]
+            return FallbackSummary("\n\n".join(partial_summaries)[:2000])
 
     # Normale (nicht zu lange) Eingabe direkt zusammenfassen
     system_prompt = SystemMessage(content=(
@@ -865,10 +906,12 @@ Falls eine Information nicht auffindbar ist, gebe für diese Information einen l
     ))
     user_prompt = HumanMessage(content=base_text)
     try:
-        resp = llm.invoke([system_prompt, user_prompt])
+        with llm_slot():
+            resp = cached_invoke(clamp_llm(llm), [system_prompt, user_prompt])
         return resp.content
     except Exception:
-        return base_text[:2000]
+        # Rohtext nur für diesen Lauf, nicht als Zusammenfassung der Seite speichern
+        return FallbackSummary(base_text[:2000])
 
 
 # --------------------------------------------------------------------------------------
@@ -876,12 +919,15 @@ Falls eine Information nicht auffindbar ist, gebe für diese Information einen l
 # --------------------------------------------------------------------------------------
 
 
+@run_cached("page_text", key=lambda base_url, url: artifact_key(url))
 def fetch_url_text(base_url: str, url: str) -> Optional[str]:
     try:
         if not robots_allowed(base_url, url):
             if DEBUG:
                 print(f"Robots disallow: {url}")
             return None
+        if deadline_expired():
+            return None
         _rate_sleep()
         # Primär: Markdown-Tool verwenden, das intern robust rendert/fetched
         if scrape_website_to_markdown is not None:
@@ -893,9 +939,12 @@ def fetch_url_text(base_url: str, url: str) -> Optional[str]:
                 if DEBUG:
                     print(f"Markdown-Tool fehlgeschlagen für {url}: {md_err}")
         # Fallback: klassisches HTTP + Extraktion
-        r = SESSION.get(url, timeout=(3, 15))
+        with fetch_slot():
+            r = SESSION.get(url, timeout=clamp_timeout((3, 15)))
         r.raise_for_status()
-        return extract_text(r.text)
+        text = extract_text(r.text)
+        record_source("page", url, text)
+        return text
     except Exception as e:
         if DEBUG:
             print(f"Fehler beim Laden {url}: {e}")
@@ -910,6 +959,7 @@ class ToolState(TypedDict):
 
 
 
+@run_cached("website_scraper")
 def company_website_scraper(query: str) -> AIMessage:
     """Deterministischer Website-Scraper für Unternehmensrecherche.
     Ablauf:
@@ -933,6 +983,7 @@ def company_website_scraper(query: str) -> AIMessage:
             return AIMessage(content="Es konnte keine Unternehmens-Homepage ermittelt werden.")
 
         print(f"✅ Homepage gefunden: {base_url}")
+        record_source("homepage", company_name, base_url)
         print(f"\n🤖 SCHRITT 2: Analysiere Website-Struktur...")
 
         # Sitemaps ermitteln
@@ -1004,10 +1055,14 @@ def company_website_scraper(query: str) -> AIMessage:
 
         # Parallel laden und zusammenfassen
         from concurrent.futures import ThreadPoolExecutor, as_completed
+        from contextvars import copy_context
         summaries: List[str] = []
 
         def process(u: str) -> Optional[str]:
             path = u.replace(base_url, '') or '/'
+            if deadline_expired():
+                note_trimmed(f"Seite {path} nicht geladen")
+                return None
             print(f"   🔄 Lade {path}...")
             
             # Robots.txt Check
@@ -1022,7 +1077,10 @@ def company_website_scraper(query: str) -> AIMessage:
                 
             print(f"   ✅ {path}: {len(text)} Zeichen Text extrahiert")
             
-            # LLM Zusammenfassung
+            # LLM Zusammenfassung (ohne Zeitbudget: gekürzter Rohtext statt Zusammenfassung)
+            if deadline_expired():
+                note_trimmed(f"Seite {path} nicht zusammengefasst")
+                return f"## Auszug von: {u}\n\n{text[:1500]}"
             print(f"   🤖 {path}: Erstelle KI-Zusammenfassung...")
             summary = summarize_text(text)
             print(f"   📝 {path}: Zusammenfassung fertig ({len(summary)} Zeichen)")
@@ -1032,7 +1090,8 @@ def company_website_scraper(query: str) -> AIMessage:
         print(f"⚡ Parallel-Verarbeitung mit {min(MAX_WORKERS, len(important_urls) or 1)} Threads...")
         
         with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(important_urls) or 1)) as ex:
-            futures = [ex.submit(process, u) for u in important_urls]
+            # Kontext mitgeben, damit die Threads den Artefakt-Speicher des Laufs nutzen
+            futures = [ex.submit(copy_context().run, process, u) for u in important_urls]
             completed = 0
             for fut in as_completed(futures):
                 completed += 1
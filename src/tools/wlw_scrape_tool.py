@@ -18,7 +18,12 @@ from langchain_openai import ChatOpenAI
 # --- Initialisierung (Annahme) ---
 openai_api_key = os.environ.get("OPENAI_API_KEY")
 serper_api_key = os.environ.get("SERPER_API_KEY")
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+try:
+    from ..rate_limiter import get_rate_limiter
+except ImportError:
+    from rate_limiter import get_rate_limiter
+
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, rate_limiter=get_rate_limiter("openai"))
 
 # Markdown-Tool optional einbinden
 try:
@@ -29,6 +34,25 @@ except Exception:
     except Exception:
         scrape_website_to_markdown = None  # type: ignore
 
+try:
+    from .serper_client import serper_search
+except Exception:
+    from tools.serper_client import serper_search
+
+try:
+    from ..concurrency import llm_slot, fetch_slot
+except ImportError:
+    from concurrency import llm_slot, fetch_slot
+
+try:
+    from ..artifacts import run_cached, record_source
+    from ..deadline import check_deadline, clamp_llm, clamp_timeout
+    from ..llm_cache import cached_invoke
+except ImportError:
+    from artifacts import run_cached, record_source
+    from deadline import check_deadline, clamp_llm, clamp_timeout
+    from llm_cache import cached_invoke
+
 # --- State Definition (Annahme) ---
 class ToolState(TypedDict):
     messages: str
@@ -69,6 +93,10 @@ def create_http_session() -> requests.Session:
     session.mount("http://", adapter)
     return session
 
+
+# Prozessweite Session: Verbindungen werden über Säulen, Leads und Batches hinweg wiederverwendet
+SESSION = create_http_session()
+
 def convert_html_to_markdown(html_content: str) -> str:
     try:
         soup = BeautifulSoup(html_content, 'html.parser')  # optional: 'lxml' wenn verfügbar
@@ -216,6 +244,7 @@ def format_wlw_data_to_markdown(structured_data: Dict[str, any]) -> str:
     return result
 
 @tool
+@run_cached("wlw")
 def wlw_scrape_tool(query: str) -> str:
     """WLW Scrape Tool: Verwende dieses Tool immer dann, wenn du die Mitarbeiteranzahl, den Lieferantentyp (Fertigungsunternehmen oder Händler?) und die Materialien (Welche Materialien werden verarbeitet?) eines Unternehmens scrapen willst. Verwende dieses Tool nur EINMALIG!"""
     
@@ -246,7 +275,8 @@ Wenn unter den Ergebnissen kein passendes Profil zu finden ist, antworte mit: "K
         print("------------------------------------")
         
         user_prompt = HumanMessage(content=state["messages"])
-        llm_response = llm.invoke([system_prompt, user_prompt])
+        with llm_slot():
+            llm_response = cached_invoke(clamp_llm(llm), [system_prompt, user_prompt])
         
         return llm_response
 
@@ -256,26 +286,7 @@ Wenn unter den Ergebnissen kein passendes Profil zu finden ist, antworte mit: "K
     print(f"Angepasste Suchanfrage für die API: {search_query}")
 
     try:
-        # Serper API erwartet POST mit JSON-Payload
-        payload = {
-            "q": search_query,
-            "location": "Germany",
-            "gl": "de",
-            "hl": "de",
-            "num": 5
-        }
-        
-        response = requests.post(
-            "https://google.serper.dev/search",
-            headers={
-                "Content-Type": "application/json",
-                "X-API-KEY": f"{serper_api_key}",
-            },
-            json=payload,
-            timeout=30,
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = serper_search(search_query, num=5)
         print("Google Search erfolgreich")
     except Exception as e:
         return f"Fehler bei der Google-Suche: {e}"
@@ -315,9 +326,11 @@ Wenn unter den Ergebnissen kein passendes Profil zu finden ist, antworte mit: "K
         # Falls eine URL gefunden wurde: scrape und HTML-Daten extrahieren
         if profile_url:
             try:
-                # Erstelle HTTP-Session für das Scraping
-                session = create_http_session()
-                response = session.get(profile_url, timeout=30)
+                # Gemeinsame HTTP-Session für das Scraping
+                session = SESSION
+                check_deadline(f"WLW-Profil {profile_url}")
+                with fetch_slot():
+                    response = session.get(profile_url, timeout=clamp_timeout(30))
                 response.raise_for_status()
                 
                 # Parse HTML mit BeautifulSoup
@@ -325,6 +338,7 @@ Wenn unter den Ergebnissen kein passendes Profil zu finden ist, antworte mit: "K
                 
                 # Extrahiere strukturierte HTML-Daten
                 structured_data = extract_structured_html_content(soup, profile_url)
+                record_source("page", profile_url, structured_data)
                 
                 # Gib die rohen HTML-Daten zurück (ohne Markdown-Formatierung)
                 return structured_data
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from datetime import datetime
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -6,9 +7,27 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from langchain_core.tools import tool
-from tools.google_search_tool_serper import google_search_tool
+try:
+    from .tools.google_search_tool_serper import google_search_tool
+    from .concurrency import llm_slot, allm_slot, run_concurrently, arun_concurrently, GATHER_MAX_CONCURRENCY
+    from .rate_limiter import get_rate_limiter
+    from .deadline import check_deadline, clamp_llm
+    from .llm_pool import get_llm_pool, shared_http_client, shared_async_http_client
+    from .llm_cache import cached_llm_call, acached_llm_call
+    from .token_budget import fit
+    from .llm_batch import batch_mode_active, batched_llm_call
+except ImportError:
+    from tools.google_search_tool_serper import google_search_tool
+    from concurrency import llm_slot, allm_slot, run_concurrently, arun_concurrently, GATHER_MAX_CONCURRENCY
+    from rate_limiter import get_rate_limiter
+    from deadline import check_deadline, clamp_llm
+    from llm_pool import get_llm_pool, shared_http_client, shared_async_http_client
+    from llm_cache import cached_llm_call, acached_llm_call
+    from token_budget import fit
+    from llm_batch import batch_mode_active, batched_llm_call
 from langchain.agents import AgentExecutor
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda
 from langchain.agents.output_parsers.openai_tools import OpenAIToolsAgentOutputParser
 from langchain.agents.format_scratchpad.openai_tools import format_to_openai_tool_messages
 
@@ -66,13 +85,33 @@ def save_reports_locally(reports):
         with open(file_path, "w", encoding="utf-8") as file:
             file.write(report.content)
 
+# Temperatur je Provider (Teil des Pool-Schlüssels); "openai-structured" = OpenAI mit niedriger Temperatur
+# für strukturierte Extraktion (Zahlen/Felder sollen nicht gesampelt werden)
+LLM_TEMPERATURES = {"openai": 1, "openai-structured": 0.1, "openai-agent": 0.1, "anthropic": 0.1, "google": 0.1}
+
+
 def get_llm_by_provider(llm_provider, model, tools=None, agent_prompt: str | None = None):
+    """LLM bzw. AgentExecutor aus dem Pool (siehe llm_pool.py); gebaut wird nur beim ersten Aufruf je
+    Provider, Modell, Temperatur, Tools und Agent-Prompt."""
     # Falls keine Tools übergeben wurden, verwende die modulweite Standardliste
     tool_list = tools if tools is not None else globals().get("tools", [])
-    # Else find provider
-    if llm_provider == "openai":
+    is_agent = llm_provider == "openai-agent"
+    key = (
+        llm_provider,
+        model,
+        LLM_TEMPERATURES.get(llm_provider),
+        tuple(getattr(t, "name", repr(t)) for t in tool_list) if is_agent else (),
+        (agent_prompt or "") if is_agent else "",
+    )
+    return get_llm_pool().get(key, lambda: _build_llm(llm_provider, model, tool_list, agent_prompt))
+
+
+def _build_llm(llm_provider, model, tool_list, agent_prompt: str | None = None):
+    temperature = LLM_TEMPERATURES.get(llm_provider)
+    if llm_provider in ("openai", "openai-structured"):
         from langchain_openai import ChatOpenAI
-        llm = ChatOpenAI(model=model, temperature=1)
+        llm = ChatOpenAI(model=model, temperature=temperature, rate_limiter=get_rate_limiter("openai"),
+                         http_client=shared_http_client(), http_async_client=shared_async_http_client())
     elif llm_provider == "openai-agent":
         from langchain_openai import ChatOpenAI
         # Baue einen Tool-Calling-Agent manuell (ohne prebuilt create_react_agent)
@@ -84,16 +123,19 @@ def get_llm_by_provider(llm_provider, model, tools=None, agent_prompt: str | Non
         ])
 
         # 2) LLM an Tools binden
-        llm = ChatOpenAI(model=model, temperature=0.1).bind_tools(tool_list)
+        llm = ChatOpenAI(model=model, temperature=temperature, rate_limiter=get_rate_limiter("openai"),
+                         http_client=shared_http_client(),
+                         http_async_client=shared_async_http_client()).bind_tools(tool_list)
 
         # 3) Agent-Pipeline zusammensetzen: input + scratchpad -> prompt -> llm -> parser
+        #    Nur die Modellaufrufe belegen einen LLM-Slot, nicht der ganze Lauf samt Tools
         agent = (
             {
                 "input": lambda x: x.get("input", ""),
                 "agent_scratchpad": lambda x: format_to_openai_tool_messages(x.get("intermediate_steps", [])),
             }
             | prompt
-            | llm
+            | _with_llm_slot(llm)
             | OpenAIToolsAgentOutputParser()
         )
 
@@ -102,29 +144,59 @@ def get_llm_by_provider(llm_provider, model, tools=None, agent_prompt: str | Non
         return executor
     elif llm_provider == "anthropic":
         from langchain_anthropic import ChatAnthropic
-        llm = ChatAnthropic(model=model, temperature=0.1)  # Use the correct model name
+        llm = ChatAnthropic(model=model, temperature=temperature)  # Use the correct model name
     elif llm_provider == "google":
         from langchain_google_genai import ChatGoogleGenerativeAI
-        llm = ChatGoogleGenerativeAI(model=model, temperature=0.1)  # Correct model name
+        llm = ChatGoogleGenerativeAI(model=model, temperature=temperature)  # Correct model name
     # ... add elif blocks for other providers ...
     else:
         raise ValueError(f"Unsupported LLM provider: {llm_provider}")
     return llm
 
+def _with_llm_slot(llm):
+    """Runnable, das jeden Aufruf von llm in einem LLM-Slot ausführt (sync und async)."""
+    def call(messages, config):
+        with llm_slot():
+            return llm.invoke(messages, config)
+
+    async def acall(messages, config):
+        async with allm_slot():
+            return await llm.ainvoke(messages, config)
+
+    return RunnableLambda(call, afunc=acall)
+
+
 def invoke_llm(
     system_prompt,
     user_message,
     model="gemini-1.5-flash",  # Specify the model name according to the provider
     llm_provider="google",  # By default use Google as provider
     response_format=None):
+    # Identische Prompts kommen aus dem LLM-Cache (siehe llm_cache.py); Agent-Läufe hängen von Live-Suchen ab
+    compute = lambda: _invoke_llm(system_prompt, user_message, model, llm_provider, response_format)
+    if llm_provider == "openai-agent":
+        return compute()
+    # Offline-Batch-Modus: Antwort aus dem abgeglichenen Batch bzw. PendingBatchResult (siehe llm_batch.py)
+    if batch_mode_active(llm_provider):
+        compute = lambda: _batched_llm(system_prompt, user_message, model, llm_provider, response_format)
+    return cached_llm_call(llm_provider, model, LLM_TEMPERATURES.get(llm_provider), system_prompt, user_message,
+                           compute, response_format=response_format)
+
+
+def _invoke_llm(system_prompt, user_message, model, llm_provider, response_format=None):
+    # Nachricht passend zum Kontextfenster des Modells kürzen (System-Prompt + Antwort-Reserve)
+    user_message = fit(user_message, model, prompt=system_prompt)
     # Get base LLM oder AgentExecutor abhängig vom Provider/Einstellung
     # Wenn ReAct-Agent: setze den system_prompt als Agent-Systemkontext
     agent_prompt = system_prompt if llm_provider == "openai-agent" else None
-    llm_or_agent = get_llm_by_provider(llm_provider, model, tools=tools, agent_prompt=agent_prompt)
+    # Zeitbudget des Laufs: kein Aufruf nach Ablauf, Request-Timeout höchstens bis zur Deadline
+    check_deadline("LLM-Aufruf")
+    llm_or_agent = clamp_llm(get_llm_by_provider(llm_provider, model, tools=tools, agent_prompt=agent_prompt))
 
     # Falls ein ReAct-Agent konfiguriert ist
     if isinstance(llm_or_agent, AgentExecutor):
         # Nutze die user_message als Human-Input; system_prompt ist bereits im Agenten gesetzt
+        # Kein Slot um den ganzen Lauf: die Modellaufrufe im Agenten belegen ihn selbst (_with_llm_slot)
         input_text = f"{user_message}"
         result = llm_or_agent.invoke({"input": input_text})
         # AgentExecutor liefert i. d. R. ein Dict mit Schlüssel 'output'
@@ -142,4 +214,66 @@ def invoke_llm(
     else:
         llm_chain = llm_chain | StrOutputParser()
 
-    return llm_chain.invoke(messages)
\ No newline at end of file
+    with llm_slot():
+        return llm_chain.invoke(messages)
+
+
+def _batched_llm(system_prompt, user_message, model, llm_provider, response_format=None):
+    user_message = fit(user_message, model, prompt=system_prompt)
+    return batched_llm_call(llm_provider, model, LLM_TEMPERATURES.get(llm_provider), system_prompt, user_message,
+                            response_format=response_format)
+
+
+async def ainvoke_llm(
+    system_prompt,
+    user_message,
+    model="gemini-1.5-flash",
+    llm_provider="google",
+    response_format=None):
+    """Async-Variante von invoke_llm (ainvoke), blockiert keinen Thread während der Anfrage."""
+    compute = lambda: _ainvoke_llm(system_prompt, user_message, model, llm_provider, response_format)
+    if llm_provider == "openai-agent":
+        return await compute()
+    if batch_mode_active(llm_provider):
+        compute = lambda: asyncio.to_thread(_batched_llm, system_prompt, user_message, model, llm_provider,
+                                            response_format)
+    return await acached_llm_call(llm_provider, model, LLM_TEMPERATURES.get(llm_provider), system_prompt,
+                                  user_message, compute, response_format=response_format)
+
+
+async def _ainvoke_llm(system_prompt, user_message, model, llm_provider, response_format=None):
+    user_message = fit(user_message, model, prompt=system_prompt)
+    agent_prompt = system_prompt if llm_provider == "openai-agent" else None
+    # Zeitbudget des Laufs: kein Aufruf nach Ablauf, Request-Timeout höchstens bis zur Deadline
+    check_deadline("LLM-Aufruf")
+    llm_or_agent = clamp_llm(get_llm_by_provider(llm_provider, model, tools=tools, agent_prompt=agent_prompt))
+
+    if isinstance(llm_or_agent, AgentExecutor):
+        # Slot nur je Modellaufruf: die Tools laufen in Executor-Threads und belegen eigene Slots
+        result = await llm_or_agent.ainvoke({"input": f"{user_message}"})
+        return result.get("output", str(result))
+
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_message),
+    ]
+
+    llm_chain = llm_or_agent
+    if response_format:
+        llm_chain = llm_chain.with_structured_output(response_format)
+    else:
+        llm_chain = llm_chain | StrOutputParser()
+
+    async with allm_slot():
+        return await llm_chain.ainvoke(messages)
+
+
+def gather_llm(calls, max_concurrency: int = GATHER_MAX_CONCURRENCY):
+    """Führt unabhängige invoke_llm-Aufrufe (je ein Dict mit den Argumenten) gleichzeitig aus.
+    Ergebnisse in Eingabereihenfolge, fehlgeschlagene Aufrufe liefern ihre Exception."""
+    return run_concurrently([lambda call=call: invoke_llm(**call) for call in calls], max_concurrency)
+
+
+async def agather_llm(calls, max_concurrency: int = GATHER_MAX_CONCURRENCY):
+    """Async-Variante von gather_llm (ainvoke_llm, höchstens max_concurrency gleichzeitig)."""
+    return await arun_concurrently([lambda call=call: ainvoke_llm(**call) for call in calls], max_concurrency)
@@ -0,0 +1,378 @@
+"""
+Persistente Arbeits-Queue für Lead-Recherchen (SQLite).
+Worker holen sich Einträge per Lease (Sichtbarkeits-Timeout) und verlängern ihn per Heartbeat.
+Stirbt ein Worker oder der Server, läuft der Lease ab und der Eintrag wird erneut vergeben;
+abgeschlossene Einträge werden nie wieder ausgeführt. Fehlschläge werden bis max_attempts
+mit Backoff wiederholt.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .db import SQLiteDatabase, data_path
+
+QUEUE_LEASE_SECONDS = int(os.environ.get("QUEUE_LEASE_SECONDS", "120"))
+QUEUE_MAX_ATTEMPTS = int(os.environ.get("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_RETRY_BACKOFF_SECONDS = int(os.environ.get("QUEUE_RETRY_BACKOFF_SECONDS", "30"))
+QUEUE_POLL_SECONDS = float(os.environ.get("QUEUE_POLL_SECONDS", "1.0"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    max_concurrency INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS work_items (
+    id TEXT PRIMARY KEY,
+    lead_id INTEGER NOT NULL,
+    batch_id TEXT,
+    dedupe_key TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    current_node TEXT,
+    completed_nodes TEXT NOT NULL DEFAULT '[]',
+    result TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_work_items_claim ON work_items(status, available_at);
+CREATE INDEX IF NOT EXISTS idx_work_items_batch ON work_items(batch_id, status);
+-- Pro Lead höchstens ein aktiver Eintrag
+CREATE UNIQUE INDEX IF NOT EXISTS idx_work_items_active_dedupe
+    ON work_items(dedupe_key) WHERE status IN ('queued', 'leased');
+-- Zugehörigkeit zu Batches, auch für bereits aktive Einträge, die ein späterer Batch mitverfolgt
+CREATE TABLE IF NOT EXISTS batch_members (
+    batch_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    PRIMARY KEY (batch_id, item_id)
+);
+"""
+
+
+class WorkItem(BaseModel):
+    """Ein Eintrag der Arbeits-Queue"""
+    id: str
+    lead_id: int
+    batch_id: Optional[str] = None
+    status: str  # queued | leased | completed | failed
+    attempts: int
+    max_attempts: int
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    current_node: Optional[str] = None
+    completed_nodes: List[str] = []
+    result: Optional[Dict[str, Any]] = None
+    last_error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+def _item_from_row(row) -> WorkItem:
+    data = dict(row)
+    data.pop("dedupe_key", None)
+    data.pop("available_at", None)
+    data["completed_nodes"] = json.loads(data["completed_nodes"] or "[]")
+    data["result"] = json.loads(data["result"]) if data["result"] else None
+    return WorkItem(**data)
+
+
+class WorkQueue:
+    """SQLite-Queue mit Leases; sicher für mehrere Threads und Prozesse auf derselben Datei."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.db = SQLiteDatabase(path or data_path("queue.db"))
+        self.db.executescript(_SCHEMA)
+
+    # --- Einreihen ---------------------------------------------------------
+
+    def create_batch(self, max_concurrency: int) -> str:
+        batch_id = uuid.uuid4().hex
+        self.db.execute(
+            "INSERT INTO batches (id, max_concurrency, created_at) VALUES (?, ?, ?)",
+            (batch_id, max_concurrency, time.time()),
+        )
+        return batch_id
+
+    def batch_info(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute("SELECT * FROM batches WHERE id = ?", (batch_id,)).fetchone()
+        return dict(row) if row else None
+
+    def enqueue(self, lead_id: int, batch_id: Optional[str] = None, max_attempts: int = QUEUE_MAX_ATTEMPTS) -> WorkItem:
+        """Reiht einen Lead ein. Ist bereits ein aktiver Eintrag für den Lead vorhanden, wird dieser zurückgegeben."""
+        created, existing = self.enqueue_many([lead_id], batch_id=batch_id, max_attempts=max_attempts)
+        return (created or existing)[0]
+
+    def enqueue_many(
+        self, lead_ids: List[int], batch_id: Optional[str] = None, max_attempts: int = QUEUE_MAX_ATTEMPTS
+    ) -> Tuple[List[WorkItem], List[WorkItem]]:
+        """Reiht mehrere Leads in einer Transaktion ein. Gibt (neu angelegte, bereits aktive) Einträge zurück.
+        Mit batch_id gehören auch die bereits aktiven Einträge zum Batch (sie laufen nicht doppelt)."""
+        now = time.time()
+        created_ids, existing_ids = [], []
+        with self.db.transaction() as conn:
+            for lead_id in dict.fromkeys(lead_ids):
+                key = f"lead:{lead_id}"
+                row = conn.execute(
+                    "SELECT id FROM work_items WHERE dedupe_key = ? AND status IN ('queued', 'leased')", (key,)
+                ).fetchone()
+                if row:
+                    existing_ids.append(row["id"])
+                    continue
+                item_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO work_items (id, lead_id, batch_id, dedupe_key, max_attempts, available_at, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (item_id, lead_id, batch_id, key, max_attempts, now, now),
+                )
+                created_ids.append(item_id)
+            if batch_id:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO batch_members (batch_id, item_id) VALUES (?, ?)",
+                    [(batch_id, item_id) for item_id in created_ids + existing_ids],
+                )
+        return self._get_many(created_ids), self._get_many(existing_ids)
+
+    # --- Worker-Seite ------------------------------------------------------
+
+    def claim(self, worker_id: str, lease_seconds: int = QUEUE_LEASE_SECONDS) -> Optional[WorkItem]:
+        """Vergibt den ältesten verfügbaren Eintrag (auch abgelaufene Leases) an den Worker.
+        Die Parallelität eines Batches (max_concurrency) wird dabei eingehalten."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            # Abgelaufene Leases ohne verbleibende Versuche übernimmt dead_letter_expired()
+            row = conn.execute(
+                """
+                SELECT w.id FROM work_items w
+                LEFT JOIN batches b ON b.id = w.batch_id
+                WHERE ((w.status = 'queued' AND w.available_at <= :now)
+                       OR (w.status = 'leased' AND w.lease_expires_at < :now AND w.attempts < w.max_attempts))
+                  AND (b.id IS NULL OR (
+                        SELECT COUNT(*) FROM work_items x
+                        WHERE x.batch_id = b.id AND x.status = 'leased' AND x.lease_expires_at >= :now
+                      ) < b.max_concurrency)
+                ORDER BY w.created_at
+                LIMIT 1
+                """,
+                {"now": now},
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute(
+                "UPDATE work_items SET status = 'leased', lease_owner = ?, lease_expires_at = ?,"
+                " attempts = attempts + 1, started_at = ?, current_node = NULL, completed_nodes = '[]'"
+                " WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"]),
+            )
+        return self.get(row["id"])
+
+    def dead_letter_expired(self) -> List[WorkItem]:
+        """Markiert abgelaufene Leases ohne verbleibende Versuche endgültig als fehlgeschlagen.
+        Gibt die betroffenen Einträge zurück (damit z.B. der Lead-Status nachgezogen wird)."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            ids = [r["id"] for r in conn.execute(
+                "SELECT id FROM work_items WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= max_attempts",
+                (now,),
+            ).fetchall()]
+            conn.executemany(
+                "UPDATE work_items SET status = 'failed', finished_at = ?, lease_owner = NULL,"
+                " last_error = COALESCE(last_error, 'Lease abgelaufen') WHERE id = ?",
+                [(now, item_id) for item_id in ids],
+            )
+        return self._get_many(ids)
+
+    def heartbeat(self, item_id: str, worker_id: str, lease_seconds: int = QUEUE_LEASE_SECONDS) -> bool:
+        """Verlängert den Lease. False, wenn der Worker den Eintrag nicht mehr hält."""
+        cur = self.db.execute(
+            "UPDATE work_items SET lease_expires_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (time.time() + lease_seconds, item_id, worker_id),
+        )
+        return cur.rowcount == 1
+
+    def record_node(self, item_id: str, worker_id: str, node_name: str) -> None:
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT completed_nodes FROM work_items WHERE id = ? AND lease_owner = ?", (item_id, worker_id)
+            ).fetchone()
+            if not row:
+                return
+            nodes = json.loads(row["completed_nodes"] or "[]") + [node_name]
+            conn.execute(
+                "UPDATE work_items SET current_node = ?, completed_nodes = ? WHERE id = ?",
+                (node_name, json.dumps(nodes), item_id),
+            )
+
+    def complete(self, item_id: str, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        cur = self.db.execute(
+            "UPDATE work_items SET status = 'completed', result = ?, finished_at = ?, current_node = NULL,"
+            " lease_owner = NULL, lease_expires_at = NULL WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (json.dumps(result, default=str) if result is not None else None, time.time(), item_id, worker_id),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, item_id: str, worker_id: str, error: str) -> Optional[str]:
+        """Meldet einen Fehlschlag. Gibt den neuen Status zurück ('queued' für Retry, sonst 'failed')."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM work_items WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (item_id, worker_id),
+            ).fetchone()
+            if not row:
+                return None
+            if row["attempts"] < row["max_attempts"]:
+                # Exponentieller Backoff: 30s, 60s, 120s, ...
+                delay = QUEUE_RETRY_BACKOFF_SECONDS * (2 ** (row["attempts"] - 1))
+                conn.execute(
+                    "UPDATE work_items SET status = 'queued', available_at = ?, last_error = ?, current_node = NULL,"
+                    " lease_owner = NULL, lease_expires_at = NULL WHERE id = ?",
+                    (now + delay, error, item_id),
+                )
+                return "queued"
+            conn.execute(
+                "UPDATE work_items SET status = 'failed', last_error = ?, finished_at = ?, current_node = NULL,"
+                " lease_owner = NULL, lease_expires_at = NULL WHERE id = ?",
+                (error, now, item_id),
+            )
+            return "failed"
+
+    # --- Abfragen ----------------------------------------------------------
+
+    def get(self, item_id: str) -> Optional[WorkItem]:
+        row = self.db.execute("SELECT * FROM work_items WHERE id = ?", (item_id,)).fetchone()
+        return _item_from_row(row) if row else None
+
+    def _get_many(self, item_ids: List[str]) -> List[WorkItem]:
+        return [item for item in (self.get(i) for i in item_ids) if item]
+
+    def batch_items(self, batch_id: str) -> List[WorkItem]:
+        rows = self.db.execute(
+            "SELECT * FROM work_items WHERE batch_id = ?"
+            " OR id IN (SELECT item_id FROM batch_members WHERE batch_id = ?) ORDER BY created_at",
+            (batch_id, batch_id),
+        ).fetchall()
+        return [_item_from_row(r) for r in rows]
+
+    def stats(self) -> Dict[str, int]:
+        rows = self.db.execute("SELECT status, COUNT(*) AS n FROM work_items GROUP BY status").fetchall()
+        counts = {s: 0 for s in ("queued", "leased", "completed", "failed")}
+        counts.update({r["status"]: r["n"] for r in rows})
+        return counts
+
+
+# handler(item, on_node) -> Ergebnis-dict mit Schlüssel 'success' (und ggf. 'error')
+WorkHandler = Callable[[WorkItem, Callable[[str, Dict[str, Any]], None]], Dict[str, Any]]
+# on_dead_letter(item): Eintrag ist endgültig fehlgeschlagen (keine Versuche mehr)
+DeadLetterHandler = Callable[[WorkItem], None]
+
+
+class QueueWorker:
+    """Pool von Worker-Threads, die Einträge aus der Queue holen und mit dem Handler verarbeiten."""
+
+    def __init__(self, queue: WorkQueue, handler: WorkHandler, concurrency: int = 4,
+                 lease_seconds: int = QUEUE_LEASE_SECONDS, poll_seconds: float = QUEUE_POLL_SECONDS,
+                 on_dead_letter: Optional[DeadLetterHandler] = None):
+        self.queue = queue
+        self.handler = handler
+        self.on_dead_letter = on_dead_letter
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        self._stop.clear()
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._loop, args=(f"{self.worker_prefix}:{i}",),
+                                 name=f"queue-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        print(f"👷 {self.concurrency} Queue-Worker gestartet ({self.worker_prefix})")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Beendet die Worker nach dem laufenden Eintrag; nicht beendete Leases laufen regulär ab."""
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def run_forever(self) -> None:
+        self.start()
+        try:
+            while any(t.is_alive() for t in self._threads):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("🛑 Worker werden beendet...")
+            self.stop()
+
+    def _loop(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            try:
+                for dead in self.queue.dead_letter_expired():
+                    print(f"💀 Lead {dead.lead_id} endgültig fehlgeschlagen: {dead.last_error}")
+                    self._dead_letter(dead)
+                item = self.queue.claim(worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"⚠️ Queue-Claim fehlgeschlagen: {e}")
+                item = None
+            if item is None:
+                self._stop.wait(self.poll_seconds)
+                continue
+            self._process(worker_id, item)
+
+    def _process(self, worker_id: str, item: WorkItem) -> None:
+        print(f"🔧 {worker_id} verarbeitet Lead {item.lead_id} (Versuch {item.attempts}/{item.max_attempts})")
+        done = threading.Event()
+
+        def keep_alive() -> None:
+            while not done.wait(self.lease_seconds / 3):
+                if not self.queue.heartbeat(item.id, worker_id, self.lease_seconds):
+                    return
+
+        heartbeat = threading.Thread(target=keep_alive, name=f"heartbeat-{item.id[:8]}", daemon=True)
+        heartbeat.start()
+
+        def on_node(node_name: str, update: Dict[str, Any]) -> None:
+            self.queue.record_node(item.id, worker_id, node_name)
+
+        try:
+            result = self.handler(item, on_node)
+            success = bool(result.get("success"))
+            error = None if success else str(result.get("error") or "Unbekannter Fehler")
+        except Exception as e:
+            result, success, error = None, False, str(e)
+        finally:
+            done.set()
+            heartbeat.join()
+
+        if success:
+            self.queue.complete(item.id, worker_id, result)
+        else:
+            status = self.queue.fail(item.id, worker_id, error)
+            print(f"❌ Lead {item.lead_id} fehlgeschlagen ({status}): {error}")
+            if status == "failed":
+                self._dead_letter(self.queue.get(item.id) or item)
+
+    def _dead_letter(self, item: WorkItem) -> None:
+        if self.on_dead_letter is None:
+            return
+        try:
+            self.on_dead_letter(item)
+        except Exception as e:
+            print(f"⚠️ Dead-Letter-Handler für Lead {item.lead_id} fehlgeschlagen: {e}")
@@ -0,0 +1,28 @@
+"""
+Eigenständiger Queue-Worker - verarbeitet Lead-Recherchen aus der persistenten Queue.
+Mehrere Worker-Prozesse (auch neben dem API-Server) können parallel auf dieselbe Queue zugreifen.
+
+Start: python worker.py --concurrency 4
+Nur externe Worker nutzen: Server mit EMBEDDED_QUEUE_WORKERS=0 starten.
+"""
+
+import argparse
+
+from main import handle_dead_letter, handle_work_item, work_queue
+from src.work_queue import QueueWorker, QUEUE_LEASE_SECONDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lead Agent Queue-Worker")
+    parser.add_argument("--concurrency", type=int, default=4, help="Anzahl paralleler Worker-Threads")
+    parser.add_argument("--lease-seconds", type=int, default=QUEUE_LEASE_SECONDS, help="Sichtbarkeits-Timeout je Eintrag")
+    args = parser.parse_args()
+
+    print(f"📊 Queue-Status: {work_queue.stats()}")
+    worker = QueueWorker(work_queue, handle_work_item, concurrency=args.concurrency, lease_seconds=args.lease_seconds,
+                         on_dead_letter=handle_dead_letter)
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()